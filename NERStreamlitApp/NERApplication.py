@@ -3,18 +3,76 @@
 # NER Application: Named Entity Recognition (NER) Tool
 
 import streamlit as st  # For building the app UI
-import spacy  # Natural Language Processing
-from spacy.pipeline import EntityRuler  # For custom entity patterns
-from spacy import displacy  # For visualizing entities
-import pandas as pd  # For working with tables and CSV
 import json  # For exporting JSON pattern files
-from collections import Counter  # For entity frequency counting
+import tempfile  # Streaming bulk results to disk
+import os  # Locating the entity store next to the app
+import sys  # Finding the shared helpers folder
+from concurrent.futures import ThreadPoolExecutor  # Loading spaCy in the background
 
-# --- Load NLP Model ---
-nlp = spacy.load("en_core_web_sm")  # Load the default small English model
+BULK_DOWNLOAD_LIMIT_MB = 200  # Largest bulk result offered as an in-app download (held in server memory)
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+import instrumentation  # Per-stage timers and the optional performance panel (?perf=1)
 
 # --- Streamlit Config ---
 st.set_page_config(page_title='NER Analyzer', layout='wide')
+perf = instrumentation.session_profiler()  # No-op unless profiling is switched on
+
+
+# --- Start Loading the NLP Model (once per server process, in a background thread) ---
+# spaCy and en_core_web_sm take a few seconds to import and load, so they load while
+# the title and inputs below are drawn instead of before anything appears.
+def load_model():
+    from nlp_pipeline import load_entity_pipeline  # Imports spaCy
+    import entity_view  # Imports displaCy
+    return load_entity_pipeline("en_core_web_sm")  # Small English model without parser/lemmatizer
+
+
+@st.cache_resource(show_spinner=False)
+def start_model_load():
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="spacy-load")
+    future = executor.submit(load_model)
+    executor.shutdown(wait=False)  # The worker thread exits once the model is loaded
+    return future
+
+
+# --- Load NLP Model (shared by every session and rerun; waits for the background load) ---
+def get_nlp():
+    future = start_model_load()
+    if not future.done():
+        with st.spinner("Loading spaCy model..."):
+            future.exception()  # Wait without raising yet
+    if future.exception() is not None:
+        start_model_load.clear()  # Try again on the next rerun instead of caching the failure
+    return future.result()
+
+
+start_model_load()
+
+
+# --- Load Stock Gazetteer (compiled index loads from disk, recompiles if the TSV changes) ---
+@st.cache_resource(show_spinner="Loading stock gazetteer...")
+def get_gazetteer():
+    from gazetteer import StockGazetteer  # Compiled stock symbol/company matcher
+    return StockGazetteer(get_nlp())  # Defaults to ../EntityRuler in spaCy/stocks-1.tsv
+
+
+# --- Open Entity Store (one SQLite connection per server process) ---
+@st.cache_resource
+def get_store():
+    from entity_store import EntityStore  # Persistent, searchable entity index
+    return EntityStore(os.path.join(os.path.dirname(os.path.abspath(__file__)), "entities.db"))
+
+
+# --- Bulk Pipeline for Worker Processes (nlp.pipe pickles the pipeline, so the session's patterns
+#     and the gazetteer are built into a separate copy; the last two pattern sets are kept) ---
+@st.cache_resource(max_entries=2, show_spinner="Building a pipeline for the worker processes...")
+def get_bulk_pipeline(patterns_key, gazetteer_hash, _patterns):
+    from bulk_ner import build_bulk_pipeline  # Pipeline with the ruler (and gazetteer) added as real pipes
+    from gazetteer import DEFAULT_TSV
+    return build_bulk_pipeline(_patterns, gazetteer_tsv=DEFAULT_TSV if gazetteer_hash else None)
+
+
 st.title("🧠 Named Entity Recognition (NER) App")
 st.write("Customize, visualize, and export named entities using spaCy + Streamlit.")
 
@@ -43,11 +101,22 @@ if st.session_state.patterns:
     st.sidebar.markdown("### Current Patterns")
     st.sidebar.json(st.session_state.patterns)
 
-# --- EntityRuler Setup ---
-ruler = EntityRuler(nlp, overwrite_ents=True)
-ruler.add_patterns(st.session_state.patterns)
-nlp.add_pipe("entity_ruler", before="ner", config={"overwrite_ents": True})  # Insert before built-in NER
-nlp.get_pipe("entity_ruler").add_patterns(st.session_state.patterns)
+# --- spaCy-backed Helpers (already imported by the background load once get_nlp returns) ---
+with perf.stage("model_wait"):  # Only slow on the first run(s) after the server starts
+    nlp = get_nlp()
+from nlp_pipeline import IncrementalRuler, annotate  # Cached entity-only pipeline
+from entity_view import PAGE_CHARS, EntityIndex  # Cached spans, counts and paged displaCy
+
+# Optional stock symbol/company tagging from stocks-1.tsv
+use_gazetteer = st.sidebar.checkbox("Tag stock symbols and companies (stocks-1.tsv)")
+with perf.stage("gazetteer_load"):
+    gazetteer = get_gazetteer() if use_gazetteer else None
+
+# --- EntityRuler Setup (kept per session, only new patterns are added on each rerun) ---
+if "ruler" not in st.session_state:
+    st.session_state.ruler = IncrementalRuler(nlp)
+with perf.stage("ruler_sync"):
+    ruler = st.session_state.ruler.sync(st.session_state.patterns)
 
 # --- Load Text ---
 if uploaded_file:
@@ -58,46 +127,143 @@ else:
     # Default sample text
     text = "On April 25, 2025, Microsoft announced its Q1 earnings, reporting a net income of $18.3 billion. CEO Satya Nadella emphasized growth in Azure and cloud services. Meanwhile, JPMorgan Chase analysts raised their price target for the stock to $360. In related news, Nvidia's recent GPU launch boosted its share price by 4.5%. The Federal Reserve is expected to hold interest rates steady in the upcoming May meeting, citing inflationary pressures."
 
-# --- NLP Processing ---
-doc = nlp(text)  # Apply NLP pipeline to input text
+# --- NLP Processing (reuse the last doc when neither the text, the patterns nor the gazetteer changed) ---
+perf.count("characters", len(text))
+with perf.stage("annotate"):
+    if gazetteer:
+        with perf.stage("gazetteer_refresh"):
+            gazetteer.refresh()  # Hot reload: picks up edits to stocks-1.tsv without restarting the app
+    doc_key = (hash(text), ruler.key, gazetteer.source_hash if gazetteer else None)  # TSV content the index came from
+    if st.session_state.get("doc_key") != doc_key:
+        with perf.stage("nlp"):
+            st.session_state.doc = annotate(nlp, text, ruler, gazetteer)  # Gazetteer and ruler run just before the built-in NER
+        st.session_state.doc_key = doc_key
+    doc = st.session_state.doc
 
 # --- Display Input Text ---
 st.subheader("Input Text")
 st.code(text, language="text")
 
+# --- Entity Index (spans, label counts and pages computed once per doc) ---
+with perf.stage("entity_index"):
+    if st.session_state.get("index_key") != doc_key:
+        st.session_state.entity_index = EntityIndex(doc)
+        st.session_state.index_key = doc_key
+    index = st.session_state.entity_index
+perf.count("entities", len(index))
+
 # --- Filter Entities ---
-unique_labels = sorted(set([ent.label_ for ent in doc.ents]))  # List of unique entity types found
+unique_labels = index.labels  # List of unique entity types found
 selected_labels = st.multiselect("Filter entities by label:", unique_labels, default=unique_labels)  # Allow filtering
-filtered_ents = [ent for ent in doc.ents if ent.label_ in selected_labels]  # Apply filter
+filtered_rows = index.select(selected_labels)  # Apply filter (lookup in the per-label index)
+
+# --- Page Selection (only the visible page is listed and rendered) ---
+page = 0
+if index.n_pages > 1:
+    page = st.number_input(f"Page (of {index.n_pages}, ~{PAGE_CHARS:,} characters each)",
+                           min_value=1, max_value=index.n_pages, value=1) - 1
+page_rows = index.page_rows(page, selected_labels)
 
 # --- Named Entities Display ---
 st.subheader("Named Entities")
-if filtered_ents:
-    for ent in filtered_ents:
-        st.markdown(f"- **{ent.text}** — *{ent.label_}*")  # Show entity and label
-else:
-    st.write("No named entities found for the selected labels.")
+st.caption(f"{len(filtered_rows):,} of {len(index):,} entities selected; {len(page_rows):,} on this page.")
+with perf.stage("entity_list"):
+    if len(page_rows):
+        st.markdown("\n".join(f"- **{index.texts[i]}** — *{index.labels[index.label_ids[i]]}*" for i in page_rows))  # Show entity and label
+    else:
+        st.write("No named entities found for the selected labels on this page.")
 
 # --- Entity Frequency Chart ---
 st.subheader("Entity Frequency")
-ent_counts = Counter([ent.label_ for ent in filtered_ents])  # Count each entity label
-if ent_counts:
-    st.bar_chart(pd.Series(ent_counts))  # Display as bar chart
+with perf.stage("frequency_chart"):
+    ent_counts = index.label_counts(selected_labels)  # Precomputed count of each entity label
+    if not ent_counts.empty:
+        st.bar_chart(ent_counts)  # Display as bar chart
 
 # --- Entity Visualization ---
 st.subheader("Entity Visualization")
-html = displacy.render(doc, style="ent", jupyter=False)  # Create HTML visualization
-st.components.v1.html(html, scrolling=True, height=400)  # Render inside app
+with perf.stage("displacy"):
+    html = index.render_page(page, selected_labels)  # HTML for the visible page only
+    st.components.v1.html(html, scrolling=True, height=400)  # Render inside app
 
 # --- Export Entities as CSV ---
-entity_data = [{"Text": ent.text, "Label": ent.label_} for ent in filtered_ents]  # Prepare export data
-
-df = pd.DataFrame(entity_data)
-if not df.empty:
-    csv = df.to_csv(index=False)
-    st.download_button("📥 Download Entities as CSV", data=csv, file_name="named_entities.csv", mime="text/csv")
+with perf.stage("csv_export"):
+    df = index.records(selected_labels)  # Prepare export data (every page)
+    if not df.empty:
+        csv = df.to_csv(index=False)
+        st.download_button("📥 Download Entities as CSV", data=csv, file_name="named_entities.csv", mime="text/csv")
 
 # --- Export Custom Patterns as JSON ---
 if st.button("📤 Export Patterns as JSON"):
     st.download_button("Download JSON", data=json.dumps(st.session_state.patterns), file_name="custom_patterns.json")
-    st.success("Download started!")
\ No newline at end of file
+    st.success("Download started!")
+
+# --- Persistent Entity Store ---
+st.subheader("🗂️ Entity Store")
+with perf.stage("store_open"):
+    store = get_store()
+with st.expander("Save documents and search every stored entity"), perf.stage("entity_store"):
+    store_col1, store_col2 = st.columns(2)
+    replace_stored = store_col2.checkbox("Replace if already stored (e.g. after changing patterns)")
+    if store_col1.button("💾 Save This Document"):
+        from entity_store import content_hash  # Same hash the store deduplicates on
+        already_stored = store.doc_id(content_hash(text)) is not None
+        store.add_doc(doc, uploaded_file.name if uploaded_file else "typed text", replace=replace_stored)
+        if already_stored and not replace_stored:
+            st.info("This exact text is already in the store, so it was not added again.")
+        else:
+            st.success(f"Saved {len(doc.ents):,} entities.")
+
+    counts = store.stats()
+    st.caption(f"{counts['documents']:,} documents, {counts['entities']:,} entities, {counts['terms']:,} distinct entity texts.")
+    search_col1, search_col2 = st.columns(2)
+    search_text = search_col1.text_input("Entity text (e.g. NVDA)")
+    search_label = search_col2.selectbox("Entity label", ["(any)"] + store.labels())
+    search_label = None if search_label == "(any)" else search_label
+    if search_text or search_label:
+        st.dataframe(store.search(search_text, search_label), hide_index=True)  # Documents with the most mentions first
+    else:
+        st.dataframe(store.top_entities(), hide_index=True)  # Most frequent entities across the store
+
+# --- Bulk Mode for Large Files ---
+st.subheader("📦 Bulk Mode (Large Files)")
+with st.expander("Stream a large .txt file through the pipeline and download every entity"):
+    bulk_file = st.file_uploader("Upload a large .txt file", type=["txt"], key="bulk_file")
+    bulk_col1, bulk_col2, bulk_col3, bulk_col4 = st.columns(4)
+    bulk_split = bulk_col1.radio("Split input by", ["paragraph", "line"], horizontal=True)
+    bulk_batch = bulk_col2.number_input("Batch size", min_value=1, max_value=1024, value=64)
+    bulk_workers = bulk_col3.number_input("Worker processes", min_value=1, max_value=os.cpu_count() or 1, value=1,
+                                          help="More than 1 loads a copy of the model with your patterns in each worker "
+                                               "(a few seconds each), so it only pays off for large files.")
+    bulk_format = bulk_col4.radio("Output format", ["csv", "jsonl"], horizontal=True)
+
+    if bulk_file and st.button("Run Bulk Extraction"):
+        from bulk_ner import iter_chunks, iter_entities, text_lines, write_entities  # Streaming bulk mode
+        status = st.empty()
+        chunks = iter_chunks(text_lines(bulk_file), bulk_split)  # Decoded line by line, never read whole
+        if bulk_workers > 1:
+            with perf.stage("bulk_pipeline"):
+                bulk_nlp = get_bulk_pipeline(ruler.key, gazetteer.source_hash if gazetteer else None, st.session_state.patterns)
+            entities = iter_entities(bulk_nlp, chunks, int(bulk_batch), int(bulk_workers))
+        else:
+            entities = iter_entities(nlp, chunks, int(bulk_batch), ruler=ruler, gazetteer=gazetteer)  # In-process, cached model
+        # An anonymous temp file: the OS deletes it as soon as it is closed, even if the run stops early.
+        with tempfile.TemporaryFile("w+", encoding="utf-8", newline="") as out:
+            with perf.stage("bulk_extraction"):
+                count = write_entities(entities, out, bulk_format,
+                                       progress=lambda n: status.write(f"Extracted {n:,} entities..."))
+            perf.count("bulk_entities", count)
+            out.flush()
+            size_mb = os.fstat(out.fileno()).st_size / 1e6
+            status.success(f"Extracted {count:,} entities ({size_mb:,.1f} MB).")
+            # st.download_button does not stream: Streamlit keeps the whole result in server memory
+            # for this session, so very large outputs are left to the command-line tool instead.
+            if size_mb <= BULK_DOWNLOAD_LIMIT_MB:
+                out.seek(0)
+                st.download_button("📥 Download Bulk Entities", data=out.read(), file_name=f"bulk_entities.{bulk_format}",
+                                   mime="text/csv" if bulk_format == "csv" else "application/json")
+            else:
+                st.warning(f"The result is larger than {BULK_DOWNLOAD_LIMIT_MB} MB, too large to download from the app. "
+                           f"Run `python bulk_ner.py <file> --out entities.{bulk_format}` instead, which writes straight to disk.")
+
+instrumentation.debug_panel(perf)
@@ -0,0 +1,170 @@
+# Passion Hood
+# CSE 10102: Elements of Computing II, Spring 2025
+# NER Application: Streaming bulk entity extraction for large text files
+#
+# Usage:
+#   python bulk_ner.py filings.txt --out entities.csv --n-process 4
+#   python bulk_ner.py news.txt --out entities.jsonl --split line --patterns custom_patterns.json
+#   python bulk_ner.py filings.txt --out entities.csv --gazetteer "../EntityRuler in spaCy/stocks-1.tsv"
+#
+# The input is read one line or paragraph at a time, pushed through
+# nlp.pipe in batches, and every entity is written out as soon as its
+# chunk is processed, so memory stays flat regardless of file size.
+
+import argparse  # Command-line options
+import csv  # CSV output
+import io  # Text decoding for binary uploads
+import json  # JSONL output and pattern files
+from collections import deque  # Chunk contexts waiting for their docs
+from nlp_pipeline import DEFAULT_MODEL, annotate_stream, load_entity_pipeline  # Entity-only spaCy pipeline
+
+OUTPUT_FIELDS = ["Chunk", "Start", "End", "Text", "Label"]
+MAX_CHUNK_CHARS = 100_000  # Flush a paragraph early if it grows past this (spaCy's default max_length is 1M)
+
+
+# --- Streaming Input ---
+def iter_chunks(lines, split="paragraph", max_chars=MAX_CHUNK_CHARS):
+    """Yield (text, context) pairs from an iterable of lines.
+
+    `context` is (chunk number, character offset of the chunk in the file),
+    which `nlp.pipe(as_tuples=True)` carries through so entity offsets can
+    be reported against the original file. With split="paragraph" chunks
+    end at blank lines; with split="line" every non-empty line is a chunk.
+    """
+    buffer, buffer_start, offset, chunk_id = [], 0, 0, 0
+    buffered = 0
+
+    for line in lines:
+        if split == "line":
+            if line.strip():
+                yield line.rstrip("\r\n"), (chunk_id, offset)
+                chunk_id += 1
+        elif line.strip():
+            if not buffer:
+                buffer_start = offset
+            buffer.append(line)
+            buffered += len(line)
+            if buffered >= max_chars:  # Very long paragraph: flush at a line boundary
+                yield "".join(buffer), (chunk_id, buffer_start)
+                chunk_id, buffer, buffered = chunk_id + 1, [], 0
+        elif buffer:
+            yield "".join(buffer), (chunk_id, buffer_start)
+            chunk_id, buffer, buffered = chunk_id + 1, [], 0
+        offset += len(line)
+
+    if buffer:
+        yield "".join(buffer), (chunk_id, buffer_start)
+
+
+def text_lines(binary_file, encoding="utf-8"):
+    """Decode a binary file (e.g. a Streamlit upload) line by line without reading it all."""
+    return io.TextIOWrapper(binary_file, encoding=encoding, errors="replace", newline="")
+
+
+# --- Pipeline ---
+def build_bulk_pipeline(patterns=None, model=DEFAULT_MODEL, gazetteer_tsv=None):
+    """Entity-only pipeline with the custom patterns added as a real pipe.
+
+    Unlike the app's session ruler, the ruler has to live inside the
+    pipeline here so it is pickled along with it to `n_process` workers.
+    With `gazetteer_tsv` the compiled stock gazetteer is added before the NER too.
+    """
+    nlp = load_entity_pipeline(model)
+    before = "ner" if "ner" in nlp.pipe_names else None  # Models without an NER get them at the end
+    if gazetteer_tsv:
+        import gazetteer  # noqa: F401  Registers the "stock_gazetteer" factory
+        nlp.add_pipe("stock_gazetteer", before=before, config={"tsv_path": gazetteer_tsv})
+    if patterns:
+        ruler = nlp.add_pipe("entity_ruler", before=before, config={"overwrite_ents": True})
+        ruler.add_patterns(patterns)
+    return nlp
+
+
+def iter_entities(nlp, chunks, batch_size=64, n_process=1, ruler=None, gazetteer=None):
+    """Yield one dict per entity as each chunk finishes processing.
+
+    Without `ruler` or `gazetteer` this is `nlp.pipe(..., n_process=n_process)`.
+    With an app session's IncrementalRuler or the app's shared gazetteer the
+    cached pipeline is streamed in-process via `annotate_stream` instead, so
+    neither is added to it.
+    """
+    if ruler is None and gazetteer is None:
+        results = nlp.pipe(chunks, as_tuples=True, batch_size=batch_size, n_process=n_process)
+    else:
+        contexts = deque()
+
+        def texts():
+            for text, context in chunks:
+                contexts.append(context)
+                yield text
+
+        results = ((doc, contexts.popleft()) for doc in annotate_stream(nlp, texts(), ruler, batch_size, gazetteer))
+
+    for doc, (chunk_id, chunk_start) in results:
+        for ent in doc.ents:
+            yield {
+                "Chunk": chunk_id,
+                "Start": chunk_start + ent.start_char,
+                "End": chunk_start + ent.end_char,
+                "Text": ent.text,
+                "Label": ent.label_,
+            }
+
+
+# --- Streaming Output ---
+def write_entities(entities, out_file, fmt="csv", progress=None, every=1000):
+    """Write entities incrementally to an open text file; returns the count.
+
+    `progress(count)` is called every `every` entities.
+    """
+    writer = csv.DictWriter(out_file, fieldnames=OUTPUT_FIELDS) if fmt == "csv" else None
+    if writer:
+        writer.writeheader()
+
+    count = 0
+    for count, row in enumerate(entities, start=1):
+        if writer:
+            writer.writerow(row)
+        else:
+            out_file.write(json.dumps(row) + "\n")
+        if progress and count % every == 0:
+            progress(count)
+    return count
+
+
+def process_file(in_path, out_path, patterns=None, split="paragraph", fmt=None,
+                 batch_size=64, n_process=1, model=DEFAULT_MODEL, nlp=None, gazetteer_tsv=None):
+    """Stream `in_path` through the pipeline into `out_path` (CSV or JSONL by extension)."""
+    fmt = fmt or ("jsonl" if out_path.endswith((".jsonl", ".json")) else "csv")
+    nlp = nlp or build_bulk_pipeline(patterns, model, gazetteer_tsv)
+    with open(in_path, encoding="utf-8", errors="replace", newline="") as src, \
+            open(out_path, "w", encoding="utf-8", newline="") as dst:
+        entities = iter_entities(nlp, iter_chunks(src, split), batch_size, n_process)
+        return write_entities(entities, dst, fmt)
+
+
+# --- Command-Line Entry Point ---
+def main():
+    parser = argparse.ArgumentParser(description="Extract named entities from a large text file.")
+    parser.add_argument("input", help="Input .txt file")
+    parser.add_argument("--out", required=True, help="Output file (.csv or .jsonl)")
+    parser.add_argument("--split", choices=["paragraph", "line"], default="paragraph", help="How to chunk the input")
+    parser.add_argument("--batch-size", type=int, default=64, help="Chunks per nlp.pipe batch")
+    parser.add_argument("--n-process", type=int, default=1, help="Worker processes for nlp.pipe")
+    parser.add_argument("--patterns", help="JSON file of EntityRuler patterns (e.g. custom_patterns.json)")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="spaCy model name")
+    parser.add_argument("--gazetteer", metavar="TSV", help="Tag symbols/companies from a TSV (e.g. stocks-1.tsv)")
+    args = parser.parse_args()
+
+    patterns = None
+    if args.patterns:
+        with open(args.patterns) as f:
+            patterns = json.load(f)
+
+    count = process_file(args.input, args.out, patterns, args.split, None, args.batch_size, args.n_process, args.model,
+                         gazetteer_tsv=args.gazetteer)
+    print(f"Wrote {count:,} entities to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+# Passion Hood
+# CSE 10102: Elements of Computing II, Spring 2025
+# NER Application: Persistent SQLite store and search index for extracted entities
+#
+# Usage:
+#   python entity_store.py add filings/*.txt --db entities.db --gazetteer "../EntityRuler in spaCy/stocks-1.tsv"
+#   python entity_store.py search NVDA --label STOCK --db entities.db
+#   python entity_store.py stats --db entities.db
+#
+# Every document is keyed by the SHA-1 of its content, so adding a corpus
+# again only runs spaCy on files that are new or were edited.
+
+import argparse  # Command-line options
+from contextlib import contextmanager  # Batching many documents into one transaction
+import hashlib  # Content hashes for deduplication
+import json  # Pattern files
+import os  # File names
+import sqlite3  # Embedded database with B-tree indexes
+import threading  # One store (and connection) is shared by every app session
+from datetime import datetime  # When each document was added
+import pandas as pd  # Query results as tables
+
+DEFAULT_DB = "entities.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL UNIQUE,
+    name TEXT,
+    n_chars INTEGER,
+    added TEXT,
+    text TEXT
+);
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS labels (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS entities (
+    doc_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL,
+    term_id INTEGER NOT NULL,
+    label_id INTEGER NOT NULL,
+    PRIMARY KEY (doc_id, start)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS terms_nocase ON terms(text COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS entities_by_term ON entities(term_id, label_id, doc_id);
+CREATE INDEX IF NOT EXISTS entities_by_label ON entities(label_id, doc_id);
+"""
+
+
+def content_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def file_hash(path):
+    """SHA-1 of a file's decoded text, read in blocks (matches `content_hash` of its contents)."""
+    return file_digest(path)[0]
+
+
+def file_digest(path):
+    """(SHA-1, number of characters) of a file's decoded text, in one pass over blocks."""
+    digest = hashlib.sha1()
+    n_chars = 0
+    with open(path, encoding="utf-8", errors="replace", newline="") as f:
+        for block in iter(lambda: f.read(1 << 20), ""):
+            digest.update(block.encode("utf-8"))
+            n_chars += len(block)
+    return digest.hexdigest(), n_chars
+
+
+class EntityStore:
+    """Documents, entity spans and labels in one SQLite file.
+
+    Entity texts and labels are stored once each in `terms` and `labels`,
+    and every span is a small integer row in `entities`. The two secondary
+    indexes act as inverted indexes: (term, label, doc) answers "which
+    documents mention NVDA as STOCK" and (label, doc) answers "which
+    documents have any STOCK", both by walking a B-tree instead of scanning.
+
+    The app shares one store across sessions, so every method holds a
+    re-entrant lock while it uses the connection, and `batch()` holds it
+    for the whole transaction: another thread's statements never land in
+    (or get rolled back with) someone else's batch.
+    """
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")  # Readers are not blocked while a batch is written
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._term_ids = {}
+        self._label_ids = {}
+        self._depth = 0
+        self._lock = threading.RLock()  # Re-entrant: add() opens a batch() that may already be open
+
+    def close(self):
+        with self._lock:
+            self.conn.execute("PRAGMA optimize")  # Refresh planner statistics
+            self.conn.close()
+
+    @contextmanager
+    def batch(self):
+        """Group many `add` calls into one transaction (a commit costs far more than a document's rows)."""
+        with self._lock:
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                if self._depth == 1:
+                    self.conn.rollback()
+                    self._term_ids.clear()  # Ids handed out in the rolled-back transaction no longer exist
+                    self._label_ids.clear()
+                raise
+            finally:
+                self._depth -= 1
+            if self._depth == 0:
+                self.conn.commit()
+
+    # --- Ids for Terms and Labels ---
+    def _ids(self, table, column, cache, values):
+        """Map each value to its row id in `table`, inserting the new ones."""
+        missing = [v for v in set(values) if v not in cache]
+        if missing:
+            self.conn.executemany(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)", [(v,) for v in missing])
+            for start in range(0, len(missing), 500):  # Stay under SQLite's bound-parameter limit
+                part = missing[start:start + 500]
+                rows = self.conn.execute(
+                    f"SELECT {column}, id FROM {table} WHERE {column} IN ({','.join('?' * len(part))})", part)
+                cache.update(rows)
+        return [cache[v] for v in values]
+
+    # --- Adding Documents ---
+    def doc_id(self, digest):
+        with self._lock:
+            row = self.conn.execute("SELECT id FROM documents WHERE content_hash = ?", (digest,)).fetchone()
+        return row[0] if row else None
+
+    def add(self, digest, entities, name=None, n_chars=None, text=None, replace=False):
+        """Store one document's entities, given as (start, end, text, label) tuples.
+
+        Returns the document id. A document whose hash is already stored is
+        left untouched unless `replace` is True (e.g. after changing patterns).
+        """
+        with self._lock:  # Another session must not store the same document between the check and the insert
+            existing = self.doc_id(digest)
+            if existing is not None and not replace:
+                return existing
+            with self.batch():  # Its own transaction unless called inside `batch()`
+                if existing is not None:
+                    self.conn.execute("DELETE FROM documents WHERE id = ?", (existing,))
+                doc_id = self.conn.execute(
+                    "INSERT INTO documents (content_hash, name, n_chars, added, text) VALUES (?, ?, ?, ?, ?)",
+                    (digest, name, n_chars, datetime.now().isoformat(timespec="seconds"), text),
+                ).lastrowid
+                entities = list(entities)
+                term_ids = self._ids("terms", "text", self._term_ids, [e[2] for e in entities])
+                label_ids = self._ids("labels", "name", self._label_ids, [e[3] for e in entities])
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO entities (doc_id, start, end, term_id, label_id) VALUES (?, ?, ?, ?, ?)",
+                    [(doc_id, e[0], e[1], t, lab) for e, t, lab in zip(entities, term_ids, label_ids)],
+                )
+            return doc_id
+
+    def add_doc(self, doc, name=None, keep_text=True, replace=False):
+        """Store a processed spaCy doc (its text is kept for snippets unless `keep_text` is False)."""
+        ents = ((ent.start_char, ent.end_char, ent.text, ent.label_) for ent in doc.ents)
+        return self.add(content_hash(doc.text), ents, name, len(doc.text), doc.text if keep_text else None, replace)
+
+    def add_texts(self, named_texts, process, replace=False):
+        """Add (name, text) pairs, running `process(texts)` -> docs only on unseen content.
+
+        Returns (added, skipped). `process` is e.g.
+        `lambda texts: annotate_stream(nlp, texts, ruler)`.
+        """
+        pending = []
+        skipped = 0
+        for name, text in named_texts:
+            if not replace and self.doc_id(content_hash(text)) is not None:
+                skipped += 1
+            else:
+                pending.append((name, text))
+        with self.batch():
+            for (name, _), doc in zip(pending, process(text for _, text in pending)):
+                self.add_doc(doc, name, replace=replace)
+        return len(pending), skipped
+
+    # --- Queries ---
+    def _term_ids_for(self, text):
+        with self._lock:
+            return [row[0] for row in self.conn.execute("SELECT id FROM terms WHERE text = ? COLLATE NOCASE", (text,))]
+
+    def _label_id(self, label):
+        with self._lock:
+            row = self.conn.execute("SELECT id FROM labels WHERE name = ?", (label,)).fetchone()
+        return row[0] if row else None
+
+    def _query(self, query, params):
+        with self._lock:
+            return pd.read_sql_query(query, self.conn, params=params)
+
+    def search(self, text=None, label=None, limit=100):
+        """Documents mentioning `text` (case-insensitive) and/or `label`, most mentions first."""
+        where, params = [], []
+        if text:
+            term_ids = self._term_ids_for(text)
+            where.append(f"e.term_id IN ({','.join('?' * len(term_ids)) or 'NULL'})")
+            params += term_ids
+        if label:
+            where.append("e.label_id = ?")
+            params.append(self._label_id(label))
+        index = "entities_by_term" if text else "entities_by_label" if label else None
+        query = (
+            "SELECT d.id AS doc_id, d.name AS name, COUNT(*) AS mentions, MIN(e.start) AS first_offset "
+            f"FROM entities e {f'INDEXED BY {index} ' if index else ''}JOIN documents d ON d.id = e.doc_id "
+            + ("WHERE " + " AND ".join(where) + " " if where else "")
+            + "GROUP BY e.doc_id ORDER BY mentions DESC, d.id LIMIT ?"
+        )
+        return self._query(query, params + [limit])
+
+    def mentions(self, doc_id, text=None, label=None):
+        """Every entity span in one document, optionally narrowed to a term and/or label."""
+        where, params = ["e.doc_id = ?"], [doc_id]
+        if text:
+            where.append("t.text = ? COLLATE NOCASE")
+            params.append(text)
+        if label:
+            where.append("l.name = ?")
+            params.append(label)
+        return self._query(
+            "SELECT e.start AS start, e.end AS end, t.text AS text, l.name AS label "
+            "FROM entities e JOIN terms t ON t.id = e.term_id JOIN labels l ON l.id = e.label_id "
+            f"WHERE {' AND '.join(where)} ORDER BY e.start", params)
+
+    def top_entities(self, label=None, limit=20):
+        """Most frequent entity texts overall or for one label."""
+        where, params = "", []
+        if label:
+            where, params = "WHERE e.label_id = ? ", [self._label_id(label)]
+        return self._query(
+            "SELECT t.text AS text, l.name AS label, COUNT(*) AS mentions, COUNT(DISTINCT e.doc_id) AS documents "
+            "FROM entities e JOIN terms t ON t.id = e.term_id JOIN labels l ON l.id = e.label_id "
+            f"{where}GROUP BY e.term_id, e.label_id ORDER BY mentions DESC LIMIT ?",
+            params + [limit])
+
+    def labels(self):
+        with self._lock:
+            return [row[0] for row in self.conn.execute("SELECT name FROM labels ORDER BY name")]
+
+    def stats(self):
+        count = lambda table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]  # noqa: E731
+        with self._lock:
+            return {"documents": count("documents"), "entities": count("entities"),
+                    "terms": count("terms"), "labels": count("labels")}
+
+
+# --- Adding Files from the Command Line ---
+def add_files(store, paths, nlp, split="paragraph", batch_size=64, n_process=1, replace=False):
+    """Stream each new or changed file through `nlp` into the store; returns (added, skipped)."""
+    from bulk_ner import iter_chunks, iter_entities  # Same chunking and file offsets as bulk mode
+
+    added = skipped = 0
+    for path in paths:
+        digest, n_chars = file_digest(path)
+        if not replace and store.doc_id(digest) is not None:
+            skipped += 1
+            continue
+        with open(path, encoding="utf-8", errors="replace", newline="") as f:
+            entities = iter_entities(nlp, iter_chunks(f, split), batch_size, n_process)
+            store.add(digest, ((e["Start"], e["End"], e["Text"], e["Label"]) for e in entities),
+                      os.path.basename(path), n_chars, replace=replace)
+        added += 1
+    return added, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Persistent entity store for processed documents.")
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="Process and store .txt files (unchanged files are skipped)")
+    add.add_argument("files", nargs="+", help="Input .txt files")
+    add.add_argument("--split", choices=["paragraph", "line"], default="paragraph", help="How to chunk each file")
+    add.add_argument("--batch-size", type=int, default=64, help="Chunks per nlp.pipe batch")
+    add.add_argument("--n-process", type=int, default=1, help="Worker processes for nlp.pipe")
+    add.add_argument("--patterns", help="JSON file of EntityRuler patterns (e.g. custom_patterns.json)")
+    add.add_argument("--gazetteer", metavar="TSV", help="Tag symbols/companies from a TSV (e.g. stocks-1.tsv)")
+    add.add_argument("--replace", action="store_true", help="Re-process files that are already stored")
+
+    search = commands.add_parser("search", help="Documents mentioning an entity")
+    search.add_argument("text", nargs="?", help="Entity text (case-insensitive)")
+    search.add_argument("--label", help="Entity label, e.g. STOCK")
+    search.add_argument("--limit", type=int, default=20)
+
+    commands.add_parser("stats", help="Counts of stored documents, entities, terms and labels")
+    args = parser.parse_args()
+
+    store = EntityStore(args.db)
+    if args.command == "add":
+        from bulk_ner import build_bulk_pipeline
+
+        patterns = None
+        if args.patterns:
+            with open(args.patterns) as f:
+                patterns = json.load(f)
+        nlp = build_bulk_pipeline(patterns, gazetteer_tsv=args.gazetteer)
+        added, skipped = add_files(store, args.files, nlp, args.split, args.batch_size, args.n_process, args.replace)
+        print(f"Added {added:,} documents, skipped {skipped:,} unchanged")
+    elif args.command == "search":
+        print(store.search(args.text, args.label, args.limit).to_string(index=False))
+    else:
+        print(store.stats())
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# Passion Hood
+# CSE 10102: Elements of Computing II, Spring 2025
+# NER Application: Entity index and paged visualization for long documents
+
+import numpy as np  # Sorted offset arrays and index lookups
+import pandas as pd  # Entity tables and counts
+from spacy import displacy  # For visualizing entities
+
+PAGE_CHARS = 5_000  # About two printed pages of text per view
+
+
+def page_bounds(text, starts, ends, page_chars=PAGE_CHARS):
+    """Character offsets where each page of `text` begins (plus len(text) at the end).
+
+    Pages hold about `page_chars` characters and end at the last paragraph
+    break before the limit, else the last sentence end ('. '), else the
+    limit itself. A cut never falls inside an entity. The small English model
+    has no sentence boundaries once the parser is excluded, so this cheap
+    text scan stands in for doc.sents.
+    """
+    bounds = [0]
+    while len(text) - bounds[-1] > page_chars:
+        begin = bounds[-1]
+        limit = begin + page_chars
+        cut = text.rfind("\n", begin + 1, limit) + 1
+        if cut <= begin + 1:
+            cut = text.rfind(". ", begin + 1, limit) + 2
+        if cut <= begin + 2:
+            cut = limit
+        j = np.searchsorted(starts, cut) - 1  # Last entity starting before the cut
+        if j >= 0 and ends[j] > cut:
+            cut = int(ends[j])  # Keep the entity whole on this page
+        bounds.append(cut)
+    bounds.append(len(text))
+    return bounds
+
+
+class EntityIndex:
+    """Entity offsets, labels and pages of one doc, computed once.
+
+    Every view of the doc (filtered list, counts, export, a page of the
+    displaCy rendering) is served from these arrays: the label filter is a
+    merge of per-label index arrays, and a page's entities are found by
+    binary search on the start offsets, so nothing re-scans `doc.ents`.
+    """
+
+    def __init__(self, doc, page_chars=PAGE_CHARS):
+        ents = doc.ents
+        self.text = doc.text
+        self.starts = np.array([ent.start_char for ent in ents], dtype=np.int64)
+        self.ends = np.array([ent.end_char for ent in ents], dtype=np.int64)
+        self.texts = [ent.text for ent in ents]
+        label_names = [ent.label_ for ent in ents]
+        self.labels = sorted(set(label_names))  # List of unique entity types found
+        self.label_ids = np.array([self.labels.index(name) for name in label_names] if ents else [], dtype=np.int64)
+        self.by_label = {name: np.flatnonzero(self.label_ids == i) for i, name in enumerate(self.labels)}
+        self.counts = pd.Series({name: len(rows) for name, rows in self.by_label.items()}, dtype=int)
+        self.bounds = page_bounds(self.text, self.starts, self.ends, page_chars)
+        self._selections = {}
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def n_pages(self):
+        return len(self.bounds) - 1
+
+    # --- Label Filter ---
+    def select(self, labels):
+        """Sorted positions of the entities whose label is in `labels` (memoized)."""
+        key = tuple(sorted(labels))
+        if key not in self._selections:
+            parts = [self.by_label[name] for name in key if name in self.by_label]
+            self._selections[key] = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+        return self._selections[key]
+
+    def label_counts(self, labels):
+        return self.counts[[name for name in self.labels if name in set(labels)]]
+
+    def records(self, labels):
+        """Text/Label table of the selected entities, in document order."""
+        rows = self.select(labels)
+        return pd.DataFrame({
+            "Text": [self.texts[i] for i in rows],
+            "Label": [self.labels[i] for i in self.label_ids[rows]],
+        })
+
+    # --- Pages ---
+    def page_rows(self, page, labels):
+        """Positions of the selected entities that fall on `page` (0-based)."""
+        rows = self.select(labels)
+        begin, end = self.bounds[page], self.bounds[page + 1]
+        lo, hi = np.searchsorted(self.starts[rows], [begin, end])
+        return rows[lo:hi]
+
+    def page_of(self, char_offset):
+        return int(np.searchsorted(self.bounds, char_offset, side="right")) - 1
+
+    def render_page(self, page, labels):
+        """displaCy HTML for one page, built from the cached spans."""
+        begin, end = self.bounds[page], self.bounds[page + 1]
+        spans = [
+            {"start": int(self.starts[i]) - begin, "end": int(self.ends[i]) - begin, "label": self.labels[self.label_ids[i]]}
+            for i in self.page_rows(page, labels)
+        ]
+        return displacy.render({"text": self.text[begin:end], "ents": spans, "title": None},
+                               style="ent", manual=True, jupyter=False)
@@ -0,0 +1,231 @@
+# Passion Hood
+# CSE 10102: Elements of Computing II, Spring 2025
+# NER Application: Compiled ticker/company gazetteer with a serialized phrase index
+#
+# Usage (any spaCy pipeline, e.g. spacy.blank("en") in the EntityRuler notebook):
+#   import gazetteer  # Registers the "stock_gazetteer" factory
+#   nlp.add_pipe("stock_gazetteer", config={"tsv_path": "stocks-1.tsv"})
+
+import hashlib  # Detecting real content changes in the TSV
+import json  # Index metadata
+import os  # File paths and modification times
+import csv  # Reading the symbol/company TSV
+import tempfile  # Private temp file per writer, swapped in atomically
+import zipfile  # Raised by np.load for a damaged index file
+import numpy as np  # The index is saved as plain arrays (.npz, no pickle)
+from spacy.attrs import ORTH  # Token text hashes
+from spacy.language import Language  # Registering the pipeline factory
+from spacy.tokens import Span  # Entity spans for matches
+
+DEFAULT_TSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "EntityRuler in spaCy", "stocks-1.tsv")
+INDEX_VERSION = 2
+
+
+def default_index_path(tsv_path):
+    return os.path.splitext(tsv_path)[0] + ".gazetteer.npz"
+
+
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PhraseIndex:
+    """Exact token-sequence lookup table, keyed by each phrase's first token.
+
+    Matches exactly what a PhraseMatcher on ORTH would, but it is saved as
+    a few flat arrays that load in milliseconds, where re-adding thousands
+    of pattern docs to a PhraseMatcher takes most of a second.
+    Matching only tries phrase lengths that start with the current token,
+    so cost grows with document length rather than with the number of
+    listings.
+    """
+
+    def __init__(self, phrases, labels):
+        self.phrases = {}  # tuple(token ORTH hashes) -> label
+        self.lengths = {}  # first token hash -> phrase lengths starting with it (longest first)
+        for tokens, label in zip(phrases, labels):
+            tokens = tuple(tokens)
+            self.phrases.setdefault(tokens, label)  # A term listed twice (e.g. "FIGS") keeps its first label
+            self.lengths.setdefault(tokens[0], set()).add(len(tokens))
+        self.lengths = {first: sorted(lengths, reverse=True) for first, lengths in self.lengths.items()}
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def to_arrays(self):
+        """Flat arrays for `np.savez`: every phrase's token hashes back to back, plus offsets and labels."""
+        names = sorted(set(self.phrases.values()))
+        return {
+            "tokens": np.fromiter((t for phrase in self.phrases for t in phrase), dtype=np.uint64),
+            "offsets": np.cumsum([0] + [len(phrase) for phrase in self.phrases], dtype=np.int64),
+            "labels": np.array([names.index(label) for label in self.phrases.values()], dtype=np.int32),
+            "label_names": np.array(names, dtype=str),
+        }
+
+    @classmethod
+    def from_arrays(cls, tokens, offsets, labels, label_names):
+        tokens = tokens.tolist()
+        offsets = offsets.tolist()
+        names = label_names.tolist()
+        phrases = (tokens[lo:hi] for lo, hi in zip(offsets[:-1], offsets[1:]))
+        return cls(phrases, [names[i] for i in labels.tolist()])
+
+    def __call__(self, words):
+        """All (start, end, label) matches in a list of token ORTH hashes, overlaps included."""
+        matches = []
+        lengths, phrases = self.lengths, self.phrases
+        n_words = len(words)
+        for start, word in enumerate(words):
+            for length in lengths.get(word, ()):
+                if start + length > n_words:
+                    continue  # A shorter slice at the end of the doc could equal a shorter phrase
+                label = phrases.get(tuple(words[start:start + length]))
+                if label is not None:
+                    matches.append((start, start + length, label))
+        return matches
+
+    def longest(self, words):
+        """Non-overlapping matches, preferring longer then earlier ones (like spacy.util.filter_spans)."""
+        taken = bytearray(len(words))
+        kept = []
+        for start, end, label in sorted(self(words), key=lambda m: (m[0] - m[1], m[0])):
+            if not any(taken[start:end]):
+                kept.append((start, end, label))
+                taken[start:end] = b"\x01" * (end - start)
+        return sorted(kept)
+
+
+class StockGazetteer:
+    """Pipeline component tagging company names (COMPANY) and symbols (STOCK).
+
+    The TSV is tokenized once into a PhraseIndex saved next to it as plain
+    arrays (`.npz`, loaded without pickle, so the file cannot run code), so
+    later startups skip the tokenizer entirely. The index records the TSV's
+    SHA-1 with the (mtime, size) it was taken at, so the TSV is only
+    rehashed when those change, and a file that was touched but not edited
+    is re-stamped instead of rebuilt. `refresh()` checks the TSV's size and
+    mtime and reloads if the file has changed (hot reload); call it between
+    batches (the app does once per rerun), not per doc. `source_hash`
+    identifies the TSV content the current index was built from.
+    """
+
+    def __init__(self, nlp, name="stock_gazetteer", tsv_path=None, index_path=None,
+                 symbol_column="Symbol", company_column="CompanyName", overwrite_ents=False):
+        self.nlp = nlp
+        self.name = name
+        self.tsv_path = tsv_path or DEFAULT_TSV
+        self.index_path = index_path or default_index_path(self.tsv_path)
+        self.columns = {"COMPANY": company_column, "STOCK": symbol_column}  # Names win over symbols
+        self.overwrite_ents = overwrite_ents
+        self.index = None
+        self.source_hash = None
+        self._source_state = None
+        self.load()
+
+    # --- Index Building and Loading ---
+    def _current_state(self):
+        stat = os.stat(self.tsv_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_terms(self):
+        terms = {}  # label -> unique terms in file order
+        with open(self.tsv_path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f, delimiter="\t"):
+                for label, column in self.columns.items():
+                    value = (row.get(column) or "").strip()
+                    if value:
+                        terms.setdefault(label, {})[value] = None
+        return {label: list(values) for label, values in terms.items()}
+
+    def compile(self, source_hash=None):
+        """Tokenize the TSV into a PhraseIndex and save it to disk."""
+        state = self._current_state()
+        phrases, labels = [], []
+        for label, values in self._read_terms().items():
+            for doc in self.nlp.tokenizer.pipe(values):
+                phrases.append(doc.to_array(ORTH).tolist())  # Hashes are stable across vocabularies
+                labels.append(label)
+
+        self.index = PhraseIndex(phrases, labels)
+        self._save(state, source_hash or _file_hash(self.tsv_path))
+
+    def _save(self, state, source_hash):
+        """Write the index with the TSV state and hash it matches."""
+        self._source_state, self.source_hash = state, source_hash
+        meta = {"version": INDEX_VERSION, "source_state": list(state), "source_hash": source_hash,
+                "columns": self.columns}
+        folder = os.path.dirname(os.path.abspath(self.index_path))
+        fd, tmp = tempfile.mkstemp(dir=folder, prefix=".gazetteer-", suffix=".tmp")  # Unique per writer
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, meta=np.array(json.dumps(meta)), **self.index.to_arrays())
+            os.replace(tmp, self.index_path)  # Never leave a half-written index behind
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    def load(self):
+        """Load the saved index if it matches the TSV, otherwise compile it."""
+        state = self._current_state()
+        try:
+            with np.load(self.index_path, allow_pickle=False) as saved:
+                arrays = {name: saved[name] for name in saved.files}
+            meta = json.loads(arrays.pop("meta").item())
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return self.compile()  # Missing or damaged
+        if meta.get("version") != INDEX_VERSION or meta.get("columns") != self.columns:
+            return self.compile()
+
+        source_hash = meta["source_hash"]
+        if tuple(meta["source_state"]) != state:
+            current_hash = _file_hash(self.tsv_path)
+            if current_hash != source_hash:
+                return self.compile(current_hash)  # Edited: rebuild
+            self.index = PhraseIndex.from_arrays(**arrays)
+            return self._save(state, source_hash)  # Only touched: remember the new state so it is not rehashed again
+
+        self.index = PhraseIndex.from_arrays(**arrays)
+        self._source_state, self.source_hash = state, source_hash
+
+    def refresh(self):
+        """Recompile if the TSV changed on disk; returns True when it reloaded."""
+        if self._current_state() != self._source_state:
+            self.load()
+            return True
+        return False
+
+    # --- Pipeline Component ---
+    def __call__(self, doc):
+        matches = self.index.longest(doc.to_array(ORTH).tolist())
+        if not matches:
+            return doc
+        existing = [(ent.start, ent.end, ent.label_) for ent in doc.ents]
+        first, second = (matches, existing) if self.overwrite_ents else (existing, matches)
+
+        taken = bytearray(len(doc))
+        kept = []
+        for start, end, label in first:
+            kept.append((start, end, label))
+            taken[start:end] = b"\x01" * (end - start)
+        for start, end, label in second:
+            if not any(taken[start:end]):
+                kept.append((start, end, label))
+        doc.ents = [Span(doc, start, end, label=label) for start, end, label in sorted(kept)]
+        return doc
+
+    def pipe(self, docs, batch_size=128):
+        for doc in docs:
+            yield self(doc)
+
+
+@Language.factory(
+    "stock_gazetteer",
+    default_config={"tsv_path": None, "index_path": None, "symbol_column": "Symbol",
+                    "company_column": "CompanyName", "overwrite_ents": False},
+)
+def make_stock_gazetteer(nlp, name, tsv_path, index_path, symbol_column, company_column, overwrite_ents):
+    return StockGazetteer(nlp, name, tsv_path, index_path, symbol_column, company_column, overwrite_ents)
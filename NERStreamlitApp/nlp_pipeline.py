@@ -0,0 +1,108 @@
+# Passion Hood
+# CSE 10102: Elements of Computing II, Spring 2025
+# NER Application: Entity-only spaCy pipeline and incremental EntityRuler
+
+import hashlib  # Stable keys for pattern lists
+import json  # Serializing patterns before hashing
+import spacy  # Natural Language Processing
+from spacy.pipeline import EntityRuler  # For custom entity patterns
+
+DEFAULT_MODEL = "en_core_web_sm"
+
+# Components the NER app never reads (dependencies, POS tags, lemmas)
+ENTITY_ONLY_EXCLUDE = ["parser", "tagger", "attribute_ruler", "lemmatizer"]
+
+
+# --- Pipeline Loading ---
+def load_entity_pipeline(model=DEFAULT_MODEL):
+    """Load `model` with only the components needed for named entities.
+
+    The parser, tagger, attribute ruler and lemmatizer are excluded at load
+    time, and the shared tok2vec layer is dropped too when nothing left in
+    the pipeline listens to it (the small English model's NER has its own).
+    """
+    nlp = spacy.load(model, exclude=ENTITY_ONLY_EXCLUDE)
+    if "tok2vec" in nlp.pipe_names and not nlp.get_pipe("tok2vec").listening_components:
+        nlp.remove_pipe("tok2vec")
+    return nlp
+
+
+def patterns_key(patterns):
+    """Hash of a pattern list, used to tell whether a ruler is up to date."""
+    return hashlib.sha1(json.dumps(patterns, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# --- Incremental Ruler ---
+class IncrementalRuler:
+    """An EntityRuler that tracks which patterns it already holds.
+
+    `sync` is cheap to call on every Streamlit rerun: if the pattern hash is
+    unchanged nothing happens, if the new list only appends to the old one
+    just the new patterns are added, and only an edit or removal rebuilds
+    the ruler. The ruler is kept outside the shared pipeline, so one cached
+    model can serve many sessions with different patterns.
+    """
+
+    def __init__(self, nlp):
+        self.ruler = EntityRuler(nlp, overwrite_ents=True)
+        self.patterns = []
+        self.key = patterns_key([])
+
+    def sync(self, patterns):
+        key = patterns_key(patterns)
+        if key == self.key:
+            return self
+        if patterns[:len(self.patterns)] == self.patterns:
+            self.ruler.add_patterns(patterns[len(self.patterns):])  # Only the new ones
+        else:
+            self.ruler.clear()
+            self.ruler.add_patterns(patterns)
+        self.patterns = list(patterns)
+        self.key = key
+        return self
+
+    def __call__(self, doc):
+        return self.ruler(doc) if self.patterns else doc
+
+    def pipe(self, docs, batch_size=64):
+        return self.ruler.pipe(docs, batch_size=batch_size) if self.patterns else docs
+
+
+# --- Running the Pipeline ---
+def with_custom_components(nlp, ruler=None, gazetteer=None):
+    """`nlp.pipeline` with `gazetteer` and then `ruler` inserted just before "ner".
+
+    A pipeline without "ner" (e.g. `spacy.blank("en")` or a custom model)
+    gets them at the end, like `nlp.add_pipe(...)` without `before=`.
+    """
+    custom = [(name, component) for name, component in (("stock_gazetteer", gazetteer), ("entity_ruler", ruler))
+              if component is not None]
+    steps = list(nlp.pipeline)
+    at = nlp.pipe_names.index("ner") if "ner" in nlp.pipe_names else len(steps)
+    return steps[:at] + custom + steps[at:]
+
+
+def annotate(nlp, text, ruler=None, gazetteer=None):
+    """Run `nlp` on `text` with `gazetteer` and `ruler` applied just before the built-in NER.
+
+    Equivalent to adding them with `nlp.add_pipe(..., before="ner")` (or at
+    the end when there is no NER) and calling `nlp(text)`, but without
+    mutating the shared cached pipeline. The ruler runs last of the two, so
+    custom patterns win over gazetteer matches.
+    """
+    doc = nlp.make_doc(text)
+    for _, component in with_custom_components(nlp, ruler, gazetteer):
+        doc = component(doc)
+    return doc
+
+
+def annotate_stream(nlp, texts, ruler=None, batch_size=64, gazetteer=None):
+    """Streaming version of `annotate` for many texts in one process.
+
+    Each component's `pipe` is chained lazily, so docs come out in order as
+    batches finish and only about one batch is held in memory at a time.
+    """
+    docs = (nlp.make_doc(text) for text in texts)
+    for _, component in with_custom_components(nlp, ruler, gazetteer):
+        docs = component.pipe(docs, batch_size=batch_size) if hasattr(component, "pipe") else map(component, docs)
+    return docs
@@ -0,0 +1,59 @@
+# Tests for the shared SQLite entity store
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from entity_store import EntityStore, add_files, content_hash  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = EntityStore(str(tmp_path / "entities.db"))
+    yield store
+    store.close()
+
+
+def test_concurrent_sessions_share_one_store(store):
+    # Like several app sessions using the one cached store: writes, batches and reads at once.
+    errors = []
+
+    def session(n):
+        try:
+            with store.batch():
+                for i in range(25):
+                    text = f"session {n} document {i}"
+                    store.add(content_hash(text), [(0, 7, f"NVDA{i % 5}", "STOCK"), (8, 9, str(n), "CARDINAL")],
+                              name=text, n_chars=len(text))
+            for i in range(25):
+                store.add(content_hash(f"shared document {i}"), [(0, 4, "AAPL", "STOCK")])  # Same docs in every thread
+                store.search("nvda1", "STOCK")
+                store.stats()
+        except Exception as error:  # noqa: BLE001 - reported below
+            errors.append(error)
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert store.stats() == {"documents": 8 * 25 + 25, "entities": 8 * 25 * 2 + 25, "terms": 5 + 8 + 1, "labels": 2}
+    assert store.search("NVDA1", "STOCK")["mentions"].sum() == 8 * 5
+
+
+def test_add_files_stores_decoded_length(store, tmp_path):
+    spacy = pytest.importorskip("spacy")
+    nlp = spacy.blank("en")
+    nlp.add_pipe("entity_ruler").add_patterns([{"label": "ORG", "pattern": "Société Générale"}])
+    path = tmp_path / "filing.txt"
+    text = "Société Générale déclare.\n\nÇa monte.\n"
+    path.write_text(text, encoding="utf-8")
+
+    assert add_files(store, [str(path)], nlp) == (1, 0)
+    n_chars = store.conn.execute("SELECT n_chars FROM documents").fetchone()[0]
+    assert n_chars == len(text) < os.path.getsize(path)
+    assert list(store.mentions(1)["text"]) == ["Société Générale"]
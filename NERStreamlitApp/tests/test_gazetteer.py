@@ -0,0 +1,63 @@
+# Regression tests for the stock gazetteer's phrase matching
+import os
+import sys
+
+import numpy as np
+import pytest
+
+spacy = pytest.importorskip("spacy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import gazetteer as gazetteer_module  # noqa: E402
+from gazetteer import StockGazetteer  # noqa: E402
+
+LISTINGS = "Symbol\tCompanyName\nAAPL\tApple\nAPLE\tApple Hospitality REIT\nA\tA Schulman Inc\n"
+
+
+@pytest.fixture
+def nlp(tmp_path):
+    tsv = tmp_path / "stocks.tsv"
+    tsv.write_text(LISTINGS, encoding="utf-8")
+    nlp = spacy.blank("en")
+    nlp.add_pipe("stock_gazetteer", config={"tsv_path": str(tsv)})
+    return nlp
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("I like Apple", [("Apple", "COMPANY")]),  # Prefix of "Apple Hospitality REIT" at the end of the doc
+    ("We bought A", [("A", "STOCK")]),  # Prefix of "A Schulman Inc" at the end of the doc
+    ("Apple Hospitality REIT rose", [("Apple Hospitality REIT", "COMPANY")]),
+])
+def test_phrase_prefix_at_end_of_doc(nlp, text, expected):
+    doc = nlp(text)
+    assert [(ent.text, ent.label_) for ent in doc.ents] == expected
+    assert all(ent.end <= len(doc) for ent in doc.ents)
+
+
+def test_index_is_saved_without_pickle(nlp, tmp_path):
+    gazetteer = nlp.get_pipe("stock_gazetteer")
+    with np.load(gazetteer.index_path, allow_pickle=False) as saved:  # Would raise if any array needed pickle
+        assert {"meta", "tokens", "offsets", "labels", "label_names"} <= set(saved.files)
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
+
+
+def test_touched_tsv_is_hashed_once(nlp, tmp_path, monkeypatch):
+    tsv = tmp_path / "stocks.tsv"
+    calls = []
+    real_hash = gazetteer_module._file_hash
+    monkeypatch.setattr(gazetteer_module, "_file_hash", lambda path: calls.append(path) or real_hash(path))
+    stat = tsv.stat()
+    os.utime(tsv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))  # Touched, not edited
+
+    first = StockGazetteer(spacy.blank("en"), tsv_path=str(tsv))
+    second = StockGazetteer(spacy.blank("en"), tsv_path=str(tsv))
+    assert len(calls) == 1  # The new (mtime, size) was saved with the unchanged hash
+    assert first.source_hash == second.source_hash == nlp.get_pipe("stock_gazetteer").source_hash
+
+
+def test_edited_tsv_is_rebuilt(nlp, tmp_path):
+    tsv = tmp_path / "stocks.tsv"
+    before = nlp.get_pipe("stock_gazetteer").source_hash
+    tsv.write_text(LISTINGS + "NVDA\tNvidia\n", encoding="utf-8")
+    reloaded = StockGazetteer(spacy.blank("en"), tsv_path=str(tsv))
+    assert reloaded.source_hash != before
+    assert [(ent.text, ent.label_) for ent in reloaded(spacy.blank("en")("Nvidia rose")).ents] == [("Nvidia", "COMPANY")]
@@ -0,0 +1,37 @@
+# Tests for running the session ruler and gazetteer alongside a cached pipeline
+import os
+import sys
+
+import pytest
+
+spacy = pytest.importorskip("spacy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nlp_pipeline import IncrementalRuler, annotate, annotate_stream, with_custom_components  # noqa: E402
+
+PATTERNS = [{"label": "STOCK", "pattern": "NVDA"}, {"label": "ORG", "pattern": [{"LOWER": "acme"}, {"LOWER": "corp"}]}]
+
+
+@pytest.fixture
+def nlp():
+    return spacy.blank("en")  # No "ner" component at all
+
+
+def test_ruler_runs_on_a_pipeline_without_ner(nlp):
+    ruler = IncrementalRuler(nlp).sync(PATTERNS)
+    doc = annotate(nlp, "Acme Corp bought NVDA shares", ruler)
+    assert [(ent.text, ent.label_) for ent in doc.ents] == [("Acme Corp", "ORG"), ("NVDA", "STOCK")]
+
+
+def test_stream_matches_single_docs(nlp):
+    ruler = IncrementalRuler(nlp).sync(PATTERNS)
+    texts = ["NVDA rose", "nothing here", "acme corp and NVDA"]
+    streamed = [[(e.text, e.label_) for e in doc.ents] for doc in annotate_stream(nlp, texts, ruler, batch_size=2)]
+    assert streamed == [[(e.text, e.label_) for e in annotate(nlp, text, ruler).ents] for text in texts]
+    assert streamed[0] == [("NVDA", "STOCK")]
+
+
+def test_custom_components_go_before_ner(nlp):
+    nlp.add_pipe("sentencizer", name="ner")  # Stand-in for a trained NER
+    ruler = IncrementalRuler(nlp)
+    assert [name for name, _ in with_custom_components(nlp, ruler)] == ["entity_ruler", "ner"]
+    assert [name for name, _ in with_custom_components(spacy.blank("en"), ruler)] == ["entity_ruler"]
@@ -0,0 +1,212 @@
+# Passion Hood
+# CSE 10102: Elements of Computing II, Spring 2025
+# Final Project: Historical backtest of rebalancing policies with transaction costs
+#
+# Usage:
+#   python backtest.py my_portfolio.csv --costs 0 10 25
+#
+# The analyzer's performance chart applies today's allocation to every past
+# day, which is the same as rebalancing back to it at every close for free.
+# Here the book starts at the target weights and then drifts with prices
+# until a policy trades it back: never (buy-and-hold), on a calendar
+# (daily, monthly, quarterly, annual) or when any weight drifts more than a
+# threshold away from its target. Every trade pays a cost proportional to
+# the value traded.
+
+# --- Import Necessary Libraries ---
+import argparse  # Command-line options
+from datetime import datetime  # For dynamic date handling
+import numpy as np  # All simulation math runs on (policies x dates x tickers) arrays
+import pandas as pd  # Result tables
+from portfolio_engine import RISK_FREE_RATE, TRADING_DAYS, beta, max_drawdown, series_returns, simple_returns
+
+CALENDAR_RULES = ('never', 'daily', 'monthly', 'quarterly', 'annual')
+DEFAULT_RULES = CALENDAR_RULES + (0.02, 0.05, 0.10, 0.20)  # Floats are threshold bands (absolute weight drift)
+DEFAULT_COSTS_BPS = (0, 5, 10, 25)  # Cost per dollar traded, in basis points
+MAX_CHUNK_CELLS = 4_000_000  # Bounds the (schedules x dates x tickers) temporaries to ~32 MB each
+
+
+def rule_name(rule):
+    """Display name of a rebalancing rule, e.g. 'monthly' or 'threshold 5%'."""
+    return rule if isinstance(rule, str) else f'threshold {rule:.0%}'
+
+
+# --- Rebalancing Schedules (True on the closes where the book is traded back to target) ---
+def asset_growth(returns):
+    """Growth of $1 in every asset since the first day; missing returns count as 0."""
+    returns = np.nan_to_num(np.asarray(returns, dtype=float))
+    returns[0] = 0.0  # The book is bought at the first close
+    return np.cumprod(1 + returns, axis=0)
+
+
+def calendar_schedule(dates, rule):
+    """Trade on the first trading day of every new month, quarter or year (or every day / never)."""
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    schedule = np.zeros(len(dates), dtype=bool)
+    if rule == 'daily':
+        schedule[1:] = True
+    elif rule != 'never':
+        months = dates.astype('datetime64[M]').astype(int)  # Months since 1970
+        period = {'monthly': months, 'quarterly': months // 3, 'annual': months // 12}[rule]
+        schedule[1:] = period[1:] != period[:-1]
+    return schedule
+
+
+def threshold_schedule(growth, weights, band):
+    """Trade whenever any holding's weight is more than `band` away from its target.
+
+    Path-dependent, so rebalances are found one at a time, but each search
+    checks every remaining day in one array operation: between trades the
+    drifted weights are w * G[t] / G[start], normalized. The loop runs once
+    per rebalance, not once per day.
+    """
+    weights = np.asarray(weights, dtype=float)
+    schedule = np.zeros(len(growth), dtype=bool)
+    start = 0
+    while start < len(growth) - 1:
+        held = weights * growth[start + 1:] / growth[start]
+        drift = np.abs(held / held.sum(axis=1, keepdims=True) - weights).max(axis=1)
+        breaches = np.flatnonzero(drift > band)
+        if not len(breaches):
+            break
+        start += breaches[0] + 1
+        schedule[start] = True
+    return schedule
+
+
+def rebalance_schedule(rule, dates, growth, weights):
+    """Schedule for a calendar rule name or a float threshold band."""
+    if isinstance(rule, str):
+        if rule not in CALENDAR_RULES:
+            raise ValueError(f'Unknown rebalancing rule {rule!r}; use one of {CALENDAR_RULES} or a threshold like 0.05.')
+        return calendar_schedule(dates, rule)
+    return threshold_schedule(growth, weights, float(rule))
+
+
+# --- Simulation ---
+def simulate_schedules(growth, weights, schedules):
+    """Daily returns and traded fractions for every schedule, before costs.
+
+    `schedules` is (schedules x dates). Over each day the book holds the
+    weights set at the last trade, drifted by prices since then, so with
+    u[t] = last trade on or before t - 1:
+
+        A[t] = sum(w * G[t] / G[u[t]])      B[t] = sum(w * G[t-1] / G[u[t]])
+
+    the day's return is A / B - 1 and a trade at t's close moves
+    sum(|w - w * G[t] / G[u[t]] / A[t]|) of the book's value. Schedules are
+    processed in chunks so the (chunk x dates x tickers) gathers stay small.
+    Returns (returns, turnover), both (schedules x dates).
+    """
+    schedules = np.atleast_2d(schedules)
+    n_schedules, n_days = schedules.shape
+    weights = np.asarray(weights, dtype=float)
+    returns = np.zeros((n_schedules, n_days))
+    turnover = np.zeros((n_schedules, n_days))
+    chunk = max(1, MAX_CHUNK_CELLS // max(1, n_days * growth.shape[1]))
+    days = np.arange(n_days)
+
+    for lo in range(0, n_schedules, chunk):
+        block = schedules[lo:lo + chunk]
+        last_trade = np.maximum.accumulate(np.where(block, days, 0), axis=1)  # Last trade on or before t
+        held_since = np.concatenate([np.zeros((len(block), 1), dtype=int), last_trade[:, :-1]], axis=1)  # ... before t - 1
+        scaled = weights / growth[held_since]  # (chunk x dates x tickers): w / G[u[t]]
+        value_now = np.einsum('ptn,tn->pt', scaled, growth)
+        value_before = np.einsum('ptn,tn->pt', scaled[:, 1:], growth[:-1])
+        returns[lo:lo + chunk, 1:] = value_now[:, 1:] / value_before - 1
+
+        drifted = scaled * growth / value_now[:, :, None]  # Pre-trade weights at each close
+        turnover[lo:lo + chunk] = np.where(block, np.abs(drifted - weights).sum(axis=2), 0.0)
+
+    return returns, turnover
+
+
+def run_backtest(prices, weights, dates, rules=DEFAULT_RULES, costs_bps=DEFAULT_COSTS_BPS, benchmark=None,
+                 risk_free_rate=RISK_FREE_RATE, periods_per_year=TRADING_DAYS):
+    """Backtest every (rule, cost) pair on one (dates x tickers) price matrix.
+
+    Schedules and turnover do not depend on the cost level, so each rule is
+    simulated once and every cost is applied to it afterwards as
+    growth *= (1 - cost * turnover) on trading days. Sweeping dozens of
+    policies over years of daily prices is a handful of array operations.
+
+    Returns a dict with 'summary' (one row per policy), 'growth'
+    (policies x dates, growth of $1 after costs) and, with a `benchmark`
+    price series on the same dates, 'benchmark_growth'.
+    """
+    growth = asset_growth(simple_returns(prices))
+    weights = np.asarray(weights, dtype=float)
+    weights = weights / weights.sum()
+    rules = list(rules)
+    schedules = np.array([rebalance_schedule(rule, dates, growth, weights) for rule in rules])
+    returns, turnover = simulate_schedules(growth, weights, schedules)
+
+    # --- Apply every cost level to every rule (policies ordered rule-major) ---
+    costs = np.asarray(costs_bps, dtype=float) / 10_000
+    n_rules, n_costs = len(rules), len(costs)
+    charged = np.repeat(turnover, n_costs, axis=0) * np.tile(costs, n_rules)[:, None]
+    net = (1 + np.repeat(returns, n_costs, axis=0)) * (1 - charged) - 1
+    policy_growth = np.cumprod(1 + net, axis=1)
+
+    years = (len(dates) - 1) / periods_per_year
+    volatility = net[:, 1:].std(axis=1, ddof=1) * np.sqrt(periods_per_year)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = (net[:, 1:].mean(axis=1) * periods_per_year - risk_free_rate) / volatility
+    # Cost paid on each trade as a fraction of the starting $1 (value before the trade x cost x turnover)
+    cost_paid = (policy_growth / (1 - charged) * charged).sum(axis=1)
+
+    summary = pd.DataFrame({
+        'Policy': [rule_name(rule) for rule in rules for _ in costs],
+        'Cost (bps)': np.tile(np.asarray(costs_bps, dtype=float), n_rules),
+        'Total Return': policy_growth[:, -1] - 1,
+        'Annualized Return': policy_growth[:, -1] ** (1 / years) - 1 if years > 0 else np.nan,
+        'Volatility': volatility,
+        'Sharpe Ratio': sharpe,
+        'Max Drawdown': max_drawdown(policy_growth),
+        'Rebalances': np.repeat(schedules.sum(axis=1), n_costs),
+        'Annual Turnover': np.repeat(turnover.sum(axis=1), n_costs) / years if years > 0 else np.nan,
+        'Costs Paid': cost_paid,
+    })
+    result = {'summary': summary, 'growth': policy_growth}
+
+    if benchmark is not None:
+        bench = series_returns(benchmark)
+        bench_growth = np.cumprod(1 + np.nan_to_num(bench))
+        summary['Beta'] = beta(net, bench)
+        summary['Excess Return vs. S&P 500'] = policy_growth[:, -1] - bench_growth[-1]
+        result['benchmark_growth'] = bench_growth
+    return result
+
+
+# --- Command-Line Entry Point ---
+def main():
+    import portfolio_engine as engine  # Only the CLI needs prices and weights
+    from batch_scoring import DEFAULT_CACHE_DIR, SP500_TICKER, START_DATE, load_portfolio_csv
+    from price_cache import PriceCache
+
+    parser = argparse.ArgumentParser(description='Backtest rebalancing policies for a portfolio CSV.')
+    parser.add_argument('csv', help='Portfolio CSV with Ticker and Shares columns')
+    parser.add_argument('--rules', nargs='+', default=[str(rule) for rule in DEFAULT_RULES],
+                        help=f'Calendar rules ({", ".join(CALENDAR_RULES)}) or threshold bands like 0.05')
+    parser.add_argument('--costs', nargs='+', type=float, default=list(DEFAULT_COSTS_BPS), help='Costs in basis points')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Local price cache folder')
+    args = parser.parse_args()
+
+    name, holdings, error = load_portfolio_csv(args.csv)
+    if error:
+        raise SystemExit(f'{name}: {error}')
+
+    tickers = list(dict.fromkeys(holdings['Ticker']))
+    prices = PriceCache(args.cache_dir).get_prices(tickers + [SP500_TICKER], START_DATE, datetime.today().strftime('%Y-%m-%d'))
+    price_matrix = prices[tickers].to_numpy(dtype=float)
+    shares = holdings.groupby('Ticker')['Shares'].sum().reindex(tickers).to_numpy()
+    _, weights = engine.allocation_weights(shares, engine.latest_prices(price_matrix))
+
+    rules = [rule if rule in CALENDAR_RULES else float(rule) for rule in args.rules]
+    result = run_backtest(price_matrix, np.nan_to_num(weights), prices.index, rules, args.costs,
+                          benchmark=prices[SP500_TICKER].to_numpy(dtype=float))
+    print(result['summary'].sort_values('Sharpe Ratio', ascending=False).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+# Passion Hood
+# CSE 10102: Elements of Computing II, Spring 2025
+# Final Project: Headless batch scoring for many portfolio CSVs
+#
+# Usage:
+#   python batch_scoring.py path/to/portfolios/ --out reports/
+#
+# Every *.csv in the folder is parsed in a process pool, prices for the union
+# of all tickers are loaded once through the local price cache, and every
+# portfolio is scored in a single matrix pass by portfolio_engine.
+
+# --- Import Necessary Libraries ---
+import argparse  # Command-line options
+import glob  # Finding portfolio CSVs
+import os  # File paths
+from concurrent.futures import ProcessPoolExecutor  # Parallel CSV parsing
+from datetime import datetime  # For dynamic date handling
+import numpy as np  # Numeric operations
+import pandas as pd  # Data processing
+import portfolio_engine as engine  # Vectorized return and risk calculations
+from price_cache import PriceCache  # On-disk price history with incremental top-ups
+
+# --- Global Constants (same defaults as the Streamlit app) ---
+START_DATE = '2022-01-01'  # Data start date
+SP500_TICKER = '^GSPC'  # S&P 500 index ticker
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.price_cache')
+
+
+# --- CSV Parsing (runs in worker processes) ---
+def load_portfolio_csv(path):
+    """Read and clean one portfolio CSV the same way the app does.
+
+    Returns (name, DataFrame, error message). Bad files are reported instead
+    of stopping the whole batch.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    try:
+        df = pd.read_csv(path)
+        df.columns = df.columns.str.strip()  # Clean column names
+        if not {'Ticker', 'Shares'}.issubset(df.columns):
+            return name, None, "CSV must include 'Ticker' and 'Shares' columns."
+        df['Ticker'] = df['Ticker'].astype(str).str.upper().str.strip()  # Normalize tickers
+        keep = ['Ticker', 'Shares'] + (['Purchase Price'] if 'Purchase Price' in df.columns else [])
+        return name, df[keep], None
+    except Exception as e:
+        return name, None, str(e)
+
+
+# --- Scoring ---
+def score_portfolios(portfolios, prices, benchmark, risk_free_rate=engine.RISK_FREE_RATE):
+    """Score every portfolio against one shared price matrix.
+
+    `portfolios` maps name -> cleaned holdings DataFrame and `prices` is a
+    (dates x tickers) DataFrame covering the union of their tickers. Returns
+    (holdings, summary): one row per priced holding and one row per
+    portfolio. Tickers without a price are listed in the summary's
+    'Missing Tickers' column; a portfolio with no priced holdings at all
+    gets NaN metrics instead of the scores of an empty (all-zero) book.
+    """
+    names = list(portfolios)
+    tickers = prices.columns
+    latest = engine.latest_prices(prices.to_numpy(dtype=float))
+
+    # --- Stack every holding into one long table ---
+    holdings = pd.concat(portfolios, names=['Portfolio', 'Row']).reset_index(level='Row', drop=True).reset_index()
+    col = tickers.get_indexer(holdings['Ticker'])
+    holdings['Current Price'] = np.where(col >= 0, latest[col], np.nan)  # -1 means no price column
+    unpriced = holdings[holdings['Current Price'].isna()]
+    missing = unpriced.groupby('Portfolio')['Ticker'].agg(lambda t: ', '.join(dict.fromkeys(t)))
+    holdings = holdings.dropna(subset=['Current Price'])
+    holdings['Market Value'] = holdings['Shares'] * holdings['Current Price']
+    totals = holdings.groupby('Portfolio')['Market Value'].transform('sum')
+    holdings['Allocation %'] = holdings['Market Value'] / totals * 100
+    if 'Purchase Price' in holdings.columns:
+        cost = holdings['Purchase Price']
+        holdings['Unrealized Gain ($)'] = (holdings['Current Price'] - cost) * holdings['Shares']
+        holdings['Unrealized Gain (%)'] = (holdings['Current Price'] - cost) / cost * 100
+
+    # --- (portfolios x tickers) weights matrix, built with one scatter-add ---
+    weights = np.zeros((len(names), len(tickers)))
+    rows = pd.Index(names).get_indexer(holdings['Portfolio'])
+    cols = tickers.get_indexer(holdings['Ticker'])
+    np.add.at(weights, (rows, cols), holdings['Allocation %'].to_numpy() / 100)
+
+    metrics = engine.portfolio_metrics(prices.to_numpy(dtype=float), weights, benchmark, risk_free_rate=risk_free_rate)
+
+    summary = pd.DataFrame({
+        'Portfolio': names,
+        'Holdings': holdings.groupby('Portfolio').size().reindex(names, fill_value=0).to_numpy(),
+        'Market Value': holdings.groupby('Portfolio')['Market Value'].sum().reindex(names, fill_value=0.0).to_numpy(),
+        'Cumulative Return': metrics['cumulative_returns'][:, -1] - 1,
+        'Volatility': metrics['volatility'],
+        'Sharpe': metrics['sharpe'],
+        'Beta': metrics['beta'],
+        'Max Drawdown': metrics['max_drawdown'],
+        'Missing Tickers': missing.reindex(names, fill_value='').to_numpy(),
+    })
+    # --- Portfolios with no priced holdings have nothing to score ---
+    unscored = summary['Holdings'].to_numpy() == 0
+    summary.loc[unscored, ['Cumulative Return', 'Volatility', 'Sharpe', 'Beta', 'Max Drawdown']] = np.nan
+    return holdings.reset_index(drop=True), summary
+
+
+def run_batch(folder, out_dir, start=START_DATE, end=None, cache=None, workers=None):
+    """Parse, price and score every CSV in `folder`; write the report to `out_dir`."""
+    end = end or datetime.today().strftime('%Y-%m-%d')
+    cache = cache or PriceCache(DEFAULT_CACHE_DIR)
+    paths = sorted(glob.glob(os.path.join(folder, '*.csv')))
+    os.makedirs(out_dir, exist_ok=True)
+
+    # --- Parse all CSVs in parallel ---
+    portfolios, errors = {}, {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for name, df, error in pool.map(load_portfolio_csv, paths, chunksize=16):
+            if error:
+                errors[name] = error
+            else:
+                portfolios[name] = df
+
+    if not portfolios:
+        return None, None, errors
+
+    # --- Load prices for the union of tickers once ---
+    union = sorted(set().union(*(df['Ticker'] for df in portfolios.values())))
+    prices = cache.get_prices(union + [SP500_TICKER], start, end)
+    benchmark = prices.pop(SP500_TICKER).to_numpy(dtype=float)
+
+    holdings, summary = score_portfolios(portfolios, prices, benchmark)
+
+    # --- Write the consolidated columnar report (in this process: pickling it to a worker costs more than the write) ---
+    holdings.to_parquet(os.path.join(out_dir, 'holdings.parquet'), index=False)
+    summary.to_parquet(os.path.join(out_dir, 'summary.parquet'), index=False)
+
+    return holdings, summary, errors
+
+
+# --- Command-Line Entry Point ---
+def main():
+    parser = argparse.ArgumentParser(description='Score a folder of portfolio CSVs in one batch.')
+    parser.add_argument('folder', help='Folder containing portfolio CSV files')
+    parser.add_argument('--out', default='reports', help='Output folder for holdings.parquet and summary.parquet')
+    parser.add_argument('--start', default=START_DATE, help='History start date (YYYY-MM-DD)')
+    parser.add_argument('--end', default=None, help='History end date, exclusive (default: today)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Local price cache folder')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    holdings, summary, errors = run_batch(args.folder, args.out, args.start, args.end, PriceCache(args.cache_dir), args.workers)
+    for name, error in errors.items():
+        print(f'Skipped {name}: {error}')
+    if summary is None:
+        print('No valid portfolios found.')
+    else:
+        for name, tickers in summary.loc[summary['Missing Tickers'] != '', ['Portfolio', 'Missing Tickers']].to_numpy():
+            print(f'No prices for {tickers} in {name}')
+        print(f'Scored {len(summary)} portfolios ({len(holdings)} holdings) -> {args.out}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+# Passion Hood
+# CSE 10102: Elements of Computing II, Spring 2025
+# Final Project: Incremental correlation matrix, clustered ordering and top correlated pairs
+
+# --- Import Necessary Libraries ---
+import hashlib  # Fingerprint of the history already folded in
+import threading  # One tracker may be shared by several app sessions
+import numpy as np  # Running sums and matrix products
+import pandas as pd  # Result tables
+
+MIN_PERIODS = 20  # Pairs with fewer overlapping days get no correlation (like pandas' min_periods)
+
+
+class RunningCovariance:
+    """Pairwise-complete covariance and correlation, updated as new days arrive.
+
+    Keeps, for every pair of assets (i, j), the number of days both have a
+    return and the sums of x_i, x_i^2 and x_i * x_j over those days. A
+    batch of new days is folded in with four matrix products, so appending
+    a day costs O(n^2) instead of recomputing from the whole history, and
+    the result matches `DataFrame.corr()` / `.cov()` (pairwise-complete).
+    Memory is four n x n matrices.
+
+    When fed a dated history, the tracker also keeps a hash of every row
+    (and date) it has consumed. If a later history disagrees with it on
+    those days (a backfilled ticker, re-adjusted prices, a last row that
+    was partial when first seen) the sums are rebuilt from scratch, so the
+    result always matches the history passed in. One tracker may be shared
+    by several threads; every update and read takes its lock.
+    """
+
+    def __init__(self, n_assets, min_periods=MIN_PERIODS):
+        self.n_assets = n_assets
+        self.min_periods = min_periods
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget every day folded in so far."""
+        n = self.n_assets
+        self.count = np.zeros((n, n))  # Days where both i and j have a return
+        self.sum = np.zeros((n, n))  # sum of x_i over days where j is also present
+        self.sum_sq = np.zeros((n, n))  # sum of x_i^2 over the same days
+        self.sum_prod = np.zeros((n, n))  # sum of x_i * x_j
+        self.n_rows = 0
+        self.last_date = None
+        self.rebuilds = 0
+        self._history_hash = hashlib.sha1()
+
+    def append(self, row, date=None):
+        """Add one day of returns (NaN where an asset has no return)."""
+        self.extend(np.asarray(row, dtype=float)[None, :], None if date is None else [date])
+
+    def extend(self, returns, dates=None):
+        """Add a (days x assets) block of returns.
+
+        With `dates`, only rows after the last date already added are used,
+        so the same growing history can be passed on every app rerun and
+        only the new days are folded in. If the days already folded in no
+        longer match (checked by hash), everything is rebuilt from `returns`.
+        """
+        returns = np.ascontiguousarray(returns, dtype=float)
+        with self._lock:
+            if dates is None:
+                self._fold(returns)  # Undated rows are trusted as new (a later dated call rebuilds)
+                return
+            dates = np.ascontiguousarray(dates, dtype='datetime64[ns]')
+            seen = dates <= self.last_date if self.last_date is not None else np.zeros(len(dates), dtype=bool)
+            history_hash = hashlib.sha1(_row_bytes(returns[seen], dates[seen]))
+            if seen.sum() != self.n_rows or history_hash.digest() != self._history_hash.digest():
+                rebuilds = self.rebuilds + (self.n_rows > 0)
+                self.reset()  # Earlier days changed: fold the whole history in again
+                self.rebuilds = rebuilds
+                seen[:] = False
+                history_hash = hashlib.sha1()
+            new_returns, new_dates = returns[~seen], dates[~seen]
+            history_hash.update(_row_bytes(new_returns, new_dates))
+            self._history_hash = history_hash
+            if len(new_dates):
+                self.last_date = new_dates.max()
+            self._fold(new_returns)
+
+    def _fold(self, returns):
+        """Add a block of rows to the running sums (caller holds the lock)."""
+        self.n_rows += len(returns)
+        if len(returns):
+            present = (~np.isnan(returns)).astype(float)
+            values = np.nan_to_num(returns)
+            self.count += present.T @ present
+            self.sum += values.T @ present
+            self.sum_sq += (values * values).T @ present
+            self.sum_prod += values.T @ values
+
+    def overlap(self):
+        """Copy of the shared-days count matrix."""
+        with self._lock:
+            return self.count.copy()
+
+    def covariance(self):
+        """Sample covariance matrix (NaN for pairs with fewer than `min_periods` shared days)."""
+        with self._lock, np.errstate(divide='ignore', invalid='ignore'):
+            cov = (self.sum_prod - self.sum * self.sum.T / self.count) / (self.count - 1)
+            cov[self.count < max(self.min_periods, 2)] = np.nan
+        return cov
+
+    def correlation(self):
+        """Pearson correlation matrix over each pair's overlapping days."""
+        with self._lock, np.errstate(divide='ignore', invalid='ignore'):
+            n = self.count.copy()
+            centered_sq = np.maximum(n * self.sum_sq - self.sum * self.sum, 0.0)  # n^2 x variance of x_i on the pair's days
+            corr = (n * self.sum_prod - self.sum * self.sum.T) / np.sqrt(centered_sq * centered_sq.T)
+        corr[n < max(self.min_periods, 2)] = np.nan
+        np.clip(corr, -1.0, 1.0, out=corr)
+        np.fill_diagonal(corr, np.where(np.diag(n) >= max(self.min_periods, 2), 1.0, np.nan))
+        return corr
+
+
+def _row_bytes(returns, dates):
+    """Each row's date followed by its returns, so hashing blocks in turn equals hashing them at once."""
+    return np.hstack([dates.view('int64')[:, None], returns.view('int64')]).tobytes()
+
+
+# --- Hierarchical Clustering ---
+def cluster_order(corr):
+    """Asset order from average-linkage clustering on distance sqrt((1 - rho) / 2).
+
+    Uses the nearest-neighbour chain algorithm: follow nearest neighbours
+    until two clusters are each other's nearest, merge them and update the
+    merged row with the Lance-Williams average. That is O(n^2) distance
+    updates overall instead of an O(n^2) search per merge. Leaves are read
+    off the dendrogram left to right, so correlated assets end up next to
+    each other. Pairs without a correlation count as uncorrelated.
+    """
+    n = len(corr)
+    if n <= 2:
+        return np.arange(n)
+    dist = np.sqrt(np.clip((1 - np.nan_to_num(np.asarray(corr, dtype=float))) / 2, 0, None))
+    np.fill_diagonal(dist, np.inf)
+    size = np.ones(n)
+    node = np.arange(n)  # Dendrogram node currently stored in each row
+    children = []
+    chain = []
+    active = list(range(n))  # Rows not yet merged away (only used to restart the chain)
+
+    while len(children) < n - 1:
+        if not chain:
+            while size[active[-1]] == 0:
+                active.pop()
+            chain.append(active[-1])
+        a = chain[-1]
+        b = int(np.argmin(dist[a]))
+        if len(chain) > 1 and dist[a, chain[-2]] <= dist[a, b]:
+            b = chain[-2]  # Prefer the previous link on ties so the chain always terminates
+        if len(chain) > 1 and b == chain[-2]:
+            chain.pop()
+            chain.pop()
+            merged = (size[a] * dist[a] + size[b] * dist[b]) / (size[a] + size[b])
+            dist[a], dist[:, a] = merged, merged
+            dist[b], dist[:, b] = np.inf, np.inf
+            dist[a, a] = np.inf
+            children.append((node[a], node[b]))
+            node[a] = n + len(children) - 1
+            size[a], size[b] = size[a] + size[b], 0
+        else:
+            chain.append(b)
+
+    # --- Leaves of the dendrogram, left to right ---
+    order = []
+    stack = [2 * n - 2]
+    while stack:
+        current = stack.pop()
+        if current < n:
+            order.append(current)
+        else:
+            left, right = children[current - n]
+            stack.extend([right, left])
+    return np.array(order)
+
+
+def binned_matrix(corr, labels, n_bins):
+    """Average correlation between consecutive blocks of (already ordered) assets.
+
+    Returns an (n_bins x n_bins) DataFrame labelled "first–last (size)".
+    Used for universes too large to draw one cell per pair; with a
+    clustered order the blocks follow the clusters.
+    """
+    n = len(corr)
+    edges = np.linspace(0, n, min(n_bins, n) + 1).astype(int)
+    starts = edges[:-1]
+    valid = ~np.isnan(corr)
+    sums = np.add.reduceat(np.add.reduceat(np.where(valid, corr, 0.0), starts, axis=0), starts, axis=1)
+    counts = np.add.reduceat(np.add.reduceat(valid.astype(float), starts, axis=0), starts, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = sums / counts
+    labels = list(labels)
+    names = [f'{labels[lo]}–{labels[hi - 1]} ({hi - lo})' if hi - lo > 1 else labels[lo] for lo, hi in zip(starts, edges[1:])]
+    return pd.DataFrame(means, index=names, columns=names)
+
+
+# --- Ranked Pairs ---
+def top_pairs(corr, labels, k=10, count=None):
+    """The k most correlated and k most anti-correlated pairs, without sorting every pair.
+
+    Only the upper triangle is considered, and `np.argpartition` picks the
+    top and bottom k in linear time before the few winners are sorted.
+    Returns (most correlated, most anti-correlated) DataFrames; with the
+    `count` matrix of a RunningCovariance the overlapping days are included.
+    """
+    corr = np.asarray(corr, dtype=float)
+    rows, cols = np.triu_indices(len(corr), 1)
+    values = corr[rows, cols]
+    keep = ~np.isnan(values)
+    rows, cols, values = rows[keep], cols[keep], values[keep]
+    k = min(k, len(values))
+    labels = np.asarray(list(labels), dtype=object)
+
+    def table(picks):
+        frame = pd.DataFrame({'Asset A': labels[rows[picks]], 'Asset B': labels[cols[picks]], 'Correlation': values[picks]})
+        if count is not None:
+            frame['Overlap (Days)'] = np.asarray(count)[rows[picks], cols[picks]].astype(int)
+        return frame
+
+    if k == 0:
+        return table(np.array([], dtype=int)), table(np.array([], dtype=int))
+    highest = np.argpartition(-values, k - 1)[:k]
+    lowest = np.argpartition(values, k - 1)[:k]
+    highest = highest[np.argsort(-values[highest], kind='stable')]
+    lowest = lowest[np.argsort(values[lowest], kind='stable')]
+    return table(highest), table(lowest)
@@ -0,0 +1,158 @@
+# Passion Hood
+# CSE 10102: Elements of Computing II, Spring 2025
+# Final Project: Monte Carlo simulation of forward portfolio risk
+#
+# Usage:
+#   python monte_carlo.py my_portfolio.csv --paths 100000 --years 5 --workers 8
+#
+# Paths are generated in fixed-size chunks, each with its own child seed from
+# one SeedSequence, so results are identical no matter how many worker
+# processes run the chunks.
+
+# --- Import Necessary Libraries ---
+import argparse  # Command-line options
+from concurrent.futures import ProcessPoolExecutor  # Multi-core chunk execution
+from datetime import datetime  # For dynamic date handling
+import numpy as np  # Batched path generation
+import pandas as pd  # Result tables
+from portfolio_engine import TRADING_DAYS  # Trading days per year
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)  # Bands for the fan chart
+CHECKPOINT_STEP = 21  # Keep growth roughly once a month per path to bound memory
+
+
+# --- Input Reduction ---
+def portfolio_return_model(returns, weights=None):
+    """Reduce asset returns to what the simulation needs.
+
+    With fixed weights the portfolio's daily return is all that matters, so
+    a (days x tickers) matrix is collapsed once up front: bootstrap samples
+    whole historical days (keeping cross-asset correlation) and the normal
+    model uses w.mu and w'.Cov.w from the empirical covariance matrix.
+    Returns (historical portfolio returns, daily mean, daily std).
+    """
+    returns = np.asarray(returns, dtype=float)
+    if weights is None:
+        port = returns[~np.isnan(returns)]
+        return port, port.mean(), port.std(ddof=1)
+
+    returns = returns[~np.isnan(returns).all(axis=1)]  # Drop days with no prices at all
+    returns = np.nan_to_num(returns)
+    weights = np.asarray(weights, dtype=float)
+    cov = np.cov(returns, rowvar=False)
+    return returns @ weights, returns.mean(axis=0) @ weights, np.sqrt(weights @ np.atleast_2d(cov) @ weights)
+
+
+# --- Path Generation (runs in worker processes) ---
+def _simulate_chunk(args):
+    """Simulate one chunk of paths and return growth of $1 at each checkpoint."""
+    seed, n_paths, horizon, method, history, mean, std, checkpoints = args
+    rng = np.random.default_rng(seed)
+    if method == 'bootstrap':
+        draws = history[rng.integers(0, len(history), size=(n_paths, horizon))]
+    else:
+        draws = rng.normal(mean, std, size=(n_paths, horizon))
+    np.log1p(draws, out=draws)  # Sum of log returns == log of compounded growth
+    np.cumsum(draws, axis=1, out=draws)
+    return np.exp(draws[:, checkpoints - 1])
+
+
+def simulate_paths(returns, weights=None, years=5, n_paths=100_000, method='bootstrap',
+                   chunk_size=5_000, workers=None, seed=42, step=CHECKPOINT_STEP):
+    """Simulate `n_paths` future paths of the portfolio's growth of $1.
+
+    `method` is 'bootstrap' (resample historical days) or 'normal' (draw
+    from the empirical mean and covariance). Chunks of `chunk_size` paths
+    are spread across a process pool when `workers` > 1, which keeps peak
+    memory at about chunk_size x horizon floats per worker.
+
+    Returns a dict with 'days' (checkpoint day numbers) and 'growth'
+    (paths x checkpoints).
+    """
+    history, mean, std = portfolio_return_model(returns, weights)
+    horizon = int(years * TRADING_DAYS)
+    checkpoints = np.unique(np.append(np.arange(step, horizon + 1, step), horizon))
+
+    # --- One child seed per chunk, so results do not depend on the worker count ---
+    sizes = [chunk_size] * (n_paths // chunk_size) + ([n_paths % chunk_size] if n_paths % chunk_size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(s, size, horizon, method, history, mean, std, checkpoints) for s, size in zip(seeds, sizes)]
+
+    if workers == 1 or len(jobs) == 1:
+        chunks = [_simulate_chunk(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_simulate_chunk, jobs))
+
+    return {'days': checkpoints, 'growth': np.vstack(chunks)}
+
+
+# --- Summaries ---
+def percentile_fan(simulation, percentiles=DEFAULT_PERCENTILES):
+    """Growth-of-$1 percentiles at every checkpoint, indexed by trading day."""
+    bands = np.percentile(simulation['growth'], percentiles, axis=0)
+    return pd.DataFrame(bands.T, index=pd.Index(simulation['days'], name='Trading Day'),
+                        columns=[f'P{p}' for p in percentiles])
+
+
+def risk_summary(simulation, confidence=0.95, years=(1, 2, 3, 4, 5)):
+    """Value-at-Risk, CVaR and return percentiles at each yearly horizon.
+
+    VaR and CVaR are reported as positive loss fractions of the starting
+    value (e.g. 0.18 = an 18% loss).
+    """
+    rows = []
+    for year in years:
+        day = year * TRADING_DAYS
+        col = np.searchsorted(simulation['days'], day)
+        if col >= len(simulation['days']):
+            continue
+        total_return = simulation['growth'][:, col] - 1
+        cutoff = np.percentile(total_return, (1 - confidence) * 100)
+        rows.append({
+            'Horizon (Years)': year,
+            'Expected Return': total_return.mean(),
+            f'VaR {confidence:.0%}': -cutoff,
+            f'CVaR {confidence:.0%}': -total_return[total_return <= cutoff].mean(),
+            'P5 Return': np.percentile(total_return, 5),
+            'Median Return': np.median(total_return),
+            'P95 Return': np.percentile(total_return, 95),
+            'Probability of Loss': (total_return < 0).mean(),
+        })
+    return pd.DataFrame(rows)
+
+
+# --- Command-Line Entry Point ---
+def main():
+    import portfolio_engine as engine  # Only the CLI needs prices and weights
+    from batch_scoring import DEFAULT_CACHE_DIR, START_DATE, load_portfolio_csv
+    from price_cache import PriceCache
+
+    parser = argparse.ArgumentParser(description='Monte Carlo VaR/CVaR for a portfolio CSV.')
+    parser.add_argument('csv', help='Portfolio CSV with Ticker and Shares columns')
+    parser.add_argument('--paths', type=int, default=100_000, help='Number of simulated paths')
+    parser.add_argument('--years', type=int, default=5, help='Simulation horizon in years (1-5)')
+    parser.add_argument('--method', choices=['bootstrap', 'normal'], default='bootstrap')
+    parser.add_argument('--confidence', type=float, default=0.95, help='VaR/CVaR confidence level')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for reproducible paths')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Local price cache folder')
+    args = parser.parse_args()
+
+    name, holdings, error = load_portfolio_csv(args.csv)
+    if error:
+        raise SystemExit(f'{name}: {error}')
+
+    tickers = list(dict.fromkeys(holdings['Ticker']))
+    prices = PriceCache(args.cache_dir).get_prices(tickers, START_DATE, datetime.today().strftime('%Y-%m-%d'))
+    price_matrix = prices.to_numpy(dtype=float)
+    shares = holdings.groupby('Ticker')['Shares'].sum().reindex(tickers).to_numpy()
+    _, weights = engine.allocation_weights(shares, engine.latest_prices(price_matrix))
+
+    simulation = simulate_paths(engine.simple_returns(price_matrix)[1:], weights, args.years, args.paths,
+                                args.method, workers=args.workers, seed=args.seed)
+    print(risk_summary(simulation, args.confidence, range(1, args.years + 1)).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
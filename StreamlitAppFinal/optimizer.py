@@ -0,0 +1,199 @@
+# Passion Hood
+# CSE 10102: Elements of Computing II, Spring 2025
+# Final Project: Mean-variance efficient frontier and weight optimizer
+
+# --- Import Necessary Libraries ---
+import threading  # One optimizer may be shared by several app sessions
+import numpy as np  # Linear algebra
+import pandas as pd  # Result tables
+from portfolio_engine import RISK_FREE_RATE, TRADING_DAYS  # Same defaults as the engine
+
+
+# --- Constraint Projection ---
+def project_capped_simplex(v, lower, upper):
+    """Closest point to `v` with weights in [lower, upper] that sum to 1.
+
+    f(tau) = sum(clip(v - tau, lower, upper)) is piecewise linear and
+    decreasing, with kinks at v - upper and v - lower. All kinks are
+    evaluated at once from one sort and prefix sums, then the root is
+    interpolated on the segment where f crosses 1, so the projection is
+    exact in O(n log n) with a handful of NumPy calls.
+    """
+    vs = np.sort(v)
+    prefix = np.concatenate([[0.0], np.cumsum(vs)])
+    n = len(vs)
+
+    def total(tau):
+        n_low = np.searchsorted(vs, tau + lower, side='right')  # Clipped to the lower bound
+        n_mid_end = np.searchsorted(vs, tau + upper, side='left')  # Start of the clipped-to-upper block
+        middle = prefix[n_mid_end] - prefix[n_low] - (n_mid_end - n_low) * tau
+        return lower * n_low + middle + upper * (n - n_mid_end)
+
+    kinks = np.sort(np.concatenate([vs - upper, vs - lower]))
+    values = total(kinks)  # Decreasing in tau
+    i = np.searchsorted(-values, -1.0)  # First kink with f(kink) <= 1
+    if i == 0:
+        tau = kinks[0]
+    elif i == len(kinks):
+        tau = kinks[-1]
+    else:
+        t0, t1, f0, f1 = kinks[i - 1], kinks[i], values[i - 1], values[i]
+        tau = t0 if f0 == f1 else t0 + (f0 - 1) * (t1 - t0) / (f0 - f1)
+    return np.clip(v - tau, lower, upper)
+
+
+class PortfolioOptimizer:
+    """Long-only / position-capped mean-variance optimizer.
+
+    The covariance matrix is factored once as Cov = X'X, where X is the
+    demeaned return history scaled to annual units. When there are fewer
+    days than assets (the usual case at 500+ tickers) Cov @ w is computed
+    as X' (X w) without ever forming the n x n matrix. Every frontier point
+    is solved with accelerated projected gradient descent warm-started from
+    its neighbour, and the last frontier is remembered so nudging a
+    constraint starts from the previous answer instead of from scratch.
+    That warm start is the only mutable state; it is read and replaced
+    under a lock, so sessions sharing one optimizer can solve concurrently.
+    """
+
+    def __init__(self, returns, risk_free_rate=RISK_FREE_RATE, periods_per_year=TRADING_DAYS):
+        returns = np.asarray(returns, dtype=float)
+        returns = np.nan_to_num(returns[~np.isnan(returns).all(axis=1)])  # Drop days with no prices at all
+        n_days, n_assets = returns.shape
+
+        self.risk_free_rate = risk_free_rate
+        self.n_assets = n_assets
+        self.mu = returns.mean(axis=0) * periods_per_year
+
+        # --- Covariance factorization (computed once, reused everywhere) ---
+        factor = (returns - returns.mean(axis=0)) * np.sqrt(periods_per_year / (n_days - 1))
+        if n_days < n_assets:
+            self._factor, self._cov = factor, None
+        else:
+            self._factor, self._cov = None, factor.T @ factor
+        self.lipschitz = self._largest_eigenvalue()
+        self._last_frontier = None  # Warm start for the next frontier call
+        self._lock = threading.Lock()  # Guards _last_frontier
+
+    # --- Linear Algebra Helpers ---
+    def cov_dot(self, w):
+        if self._cov is not None:
+            return self._cov @ w
+        return self._factor.T @ (self._factor @ w)
+
+    def _largest_eigenvalue(self, iterations=100):
+        v = np.random.default_rng(0).normal(size=self.n_assets)
+        value = 0.0
+        for _ in range(iterations):
+            w = self.cov_dot(v)
+            value = np.linalg.norm(w)
+            if value == 0:
+                return 1.0
+            v = w / value
+        return value
+
+    def _bounds(self, max_weight, long_only):
+        upper = max(max_weight, 1.0 / self.n_assets)  # A cap below 1/n cannot sum to 100%
+        return (0.0 if long_only else -upper), upper
+
+    def stats(self, w):
+        """Annualized expected return, volatility and Sharpe ratio of weights `w`."""
+        ret = float(self.mu @ w)
+        vol = float(np.sqrt(max(w @ self.cov_dot(w), 0.0)))
+        return ret, vol, (ret - self.risk_free_rate) / vol if vol > 0 else np.nan
+
+    # --- Core Solver ---
+    def solve(self, risk_tolerance, max_weight=1.0, long_only=True, w0=None, tol=1e-8, max_iter=5000):
+        """Minimize 0.5 * w'Cov w - risk_tolerance * mu'w under the weight constraints.
+
+        risk_tolerance=0 gives the minimum-variance portfolio; larger values
+        move along the frontier toward the highest-return corner.
+        """
+        lower, upper = self._bounds(max_weight, long_only)
+        if w0 is None:
+            w0 = np.full(self.n_assets, 1.0 / self.n_assets)
+        w = project_capped_simplex(np.asarray(w0, dtype=float), lower, upper)
+        y, t = w.copy(), 1.0
+        step = 1.0 / self.lipschitz
+
+        for _ in range(max_iter):
+            grad = self.cov_dot(y) - risk_tolerance * self.mu
+            w_next = project_capped_simplex(y - step * grad, lower, upper)
+            if np.max(np.abs(w_next - w)) < tol:
+                return w_next
+            if grad @ (w_next - w) > 0:  # Momentum is pointing uphill: restart it
+                t = 1.0
+            t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+            y = w_next + ((t - 1) / t_next) * (w_next - w)  # Nesterov momentum
+            w, t = w_next, t_next
+        return w
+
+    def min_variance(self, max_weight=1.0, long_only=True, w0=None):
+        with self._lock:
+            last = self._last_frontier
+        if w0 is None and last is not None:
+            w0 = last[0]  # The frontier already starts at minimum variance
+        return self.solve(0.0, max_weight, long_only, w0)
+
+    def _tolerance_grid(self, n_points):
+        scale = self.lipschitz / (np.abs(self.mu).max() + 1e-12)
+        return np.concatenate([[0.0], scale * np.logspace(-4, 2, n_points - 1)])
+
+    def frontier(self, n_points=25, max_weight=1.0, long_only=True):
+        """Efficient frontier as a DataFrame plus the (points x assets) weights.
+
+        Each point is warm-started from the previous one (and from the last
+        frontier call when it had the same number of points).
+        """
+        grid = self._tolerance_grid(n_points)
+        with self._lock:
+            last = self._last_frontier
+        previous = last if last is not None and len(last) == n_points else None
+
+        weights = np.empty((n_points, self.n_assets))
+        w = None
+        for i, tolerance in enumerate(grid):
+            w0 = previous[i] if previous is not None else w
+            w = self.solve(tolerance, max_weight, long_only, w0)
+            weights[i] = w
+
+        with self._lock:
+            self._last_frontier = weights.copy()  # Callers get their own array to keep or modify
+        stats = np.array([self.stats(w) for w in weights])
+        table = pd.DataFrame(stats, columns=['Expected Return', 'Volatility', 'Sharpe Ratio'])
+        table['Risk Tolerance'] = grid
+        return table, weights
+
+    def max_sharpe(self, max_weight=1.0, long_only=True, n_points=25, refine_steps=12, frontier=None):
+        """Highest-Sharpe frontier portfolio.
+
+        The best frontier point brackets the optimum, which is then refined
+        by golden-section search on the risk tolerance with warm starts.
+        Pass the (table, weights) from `frontier` to avoid solving it twice.
+        """
+        table, weights = frontier if frontier is not None else self.frontier(n_points, max_weight, long_only)
+        n_points = len(table)
+        best = int(np.nanargmax(table['Sharpe Ratio'].to_numpy()))
+        grid = table['Risk Tolerance'].to_numpy()
+        a, b = grid[max(best - 1, 0)], grid[min(best + 1, n_points - 1)]
+        w = weights[best]
+
+        def sharpe_at(tolerance, w0):
+            w_new = self.solve(tolerance, max_weight, long_only, w0)
+            return self.stats(w_new)[2], w_new
+
+        ratio = (np.sqrt(5) - 1) / 2
+        c, d = b - ratio * (b - a), a + ratio * (b - a)
+        (sc, wc), (sd, wd) = sharpe_at(c, w), sharpe_at(d, w)
+        for _ in range(refine_steps):
+            if sc > sd:
+                b, d, sd, wd = d, c, sc, wc
+                c = b - ratio * (b - a)
+                sc, wc = sharpe_at(c, wd)
+            else:
+                a, c, sc, wc = c, d, sd, wd
+                d = a + ratio * (b - a)
+                sd, wd = sharpe_at(d, wc)
+
+        candidate = wc if sc > sd else wd
+        return candidate if self.stats(candidate)[2] >= self.stats(weights[best])[2] else weights[best]
@@ -3,22 +3,60 @@
 # Final Project: Portfolio Analyzer Streamlit App
 
 # --- Import Necessary Libraries ---
+# pandas, the plotting stack, yfinance and the analysis modules are imported where they
+# are first used and prewarmed in a background thread, so the landing page only waits
+# for Streamlit itself.
 import streamlit as st  # Streamlit for web UI
-import pandas as pd  # Data processing
-import numpy as np  # Numeric operations
-import yfinance as yf  # Yahoo Finance API
-import matplotlib.pyplot as plt  # Data visualization
-import seaborn as sns  # Enhanced plotting
+import importlib  # Background imports of the heavy libraries
+import threading  # Prewarm thread
+import os  # Locating the local price cache
+import sys  # Finding the shared helpers folder
 from datetime import datetime  # For dynamic date handling
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+import instrumentation  # Per-stage timers and the optional performance panel (?perf=1)
 
 # --- Global Constants ---
 RISK_FREE_RATE = 0.03  # Assumed 3% risk-free rate for Sharpe Ratio
 START_DATE = '2022-01-01'  # Data start date
 END_DATE = datetime.today().strftime('%Y-%m-%d')  # Today's date
 SP500_TICKER = '^GSPC'  # S&P 500 index ticker
+PRICE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.price_cache')  # Local Parquet store
+HEAVY_MODULES = ['pandas', 'portfolio_engine', 'rolling_metrics', 'price_cache', 'matplotlib.pyplot', 'seaborn',
+                 'yfinance', 'monte_carlo', 'optimizer', 'backtest', 'correlation']  # Imported off the main thread, most needed first
+ANALYSIS_SECTIONS = ['Rolling Risk Metrics', 'Forward-Looking Risk (Monte Carlo)', 'Correlation Heatmap', 'Portfolio Optimizer',
+                     'Rebalancing Backtest']
+HEATMAP_ANNOTATE_LIMIT = 20  # Up to this many assets, every heatmap cell shows its value
+HEATMAP_CELL_LIMIT = 150  # Up to this many assets, one cell per pair; above it, clustered groups are averaged
+HEATMAP_BINS = 50  # Groups per side in the averaged heatmap
 
 # --- Streamlit Configurations ---
 st.set_page_config(page_title='Portfolio Analyzer', layout='wide')
+perf = instrumentation.session_profiler()  # No-op unless profiling is switched on
+
+
+# --- Background Prewarm (once per server process, while the landing page renders) ---
+@st.cache_resource(show_spinner=False)
+def prewarm_imports(modules=tuple(HEAVY_MODULES)):
+    def load():
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass  # Optional here; the code that needs it reports the error
+    thread = threading.Thread(target=load, name='prewarm-imports', daemon=True)
+    thread.start()
+    return thread
+
+
+prewarm_imports()
+
+
+# --- Shared Price Cache (one per server process, reused across reruns) ---
+@st.cache_resource
+def get_price_cache():
+    from price_cache import PriceCache  # On-disk price history with incremental Yahoo Finance top-ups
+    return PriceCache(PRICE_CACHE_DIR)
+
 
 # --- App Introduction ---
 st.title('Investment Portfolio Analyzer')
@@ -31,6 +69,31 @@ Upload a CSV file with your portfolio to analyze:
 We'll compute allocations, performance, and risk metrics.
 """)
 
+# --- Cached Monte Carlo Run (reruns with the same inputs reuse the paths) ---
+@st.cache_data(show_spinner='Simulating portfolio paths...')
+def run_simulation(asset_returns, weights, years, n_paths, method):
+    import monte_carlo  # Forward-looking VaR/CVaR simulation
+    workers = 1 if n_paths <= 10_000 else None  # Small runs finish faster than a process pool can start
+    simulation = monte_carlo.simulate_paths(asset_returns, weights, years, n_paths, method, workers=workers, seed=42)
+    return monte_carlo.percentile_fan(simulation), monte_carlo.risk_summary(simulation, years=range(1, years + 1))
+
+
+# --- Cached Optimizer (covariance factorization and warm starts survive reruns; shared by every session,
+#     so the optimizer locks its warm-start state) ---
+@st.cache_resource
+def get_optimizer(asset_returns, tickers):
+    from optimizer import PortfolioOptimizer  # Efficient frontier and suggested weights
+    return PortfolioOptimizer(asset_returns, risk_free_rate=RISK_FREE_RATE)
+
+
+# --- Cached Correlation Tracker (running sums survive reruns; only new trading days are added,
+#     and the sums are rebuilt if any day already folded in has changed since) ---
+@st.cache_resource
+def get_correlation_tracker(tickers):
+    from correlation import RunningCovariance  # Incremental pairwise covariance and correlation
+    return RunningCovariance(len(tickers))
+
+
 # --- Example Portfolio Downloads ---
 with st.sidebar.expander("Need a sample file?"):
     st.markdown("Download ready-to-use example portfolios:")  # Provides the user with example portfolios
@@ -44,11 +107,18 @@ uploaded_file = st.sidebar.file_uploader("Choose a CSV file", type=["csv"])
 chart_type = st.sidebar.radio("Choose Allocation View", ['Pie Chart', 'Bar Chart'])
 
 if uploaded_file:
+    # Usually already loaded by the prewarm thread while the landing page was shown
+    import pandas as pd  # Data processing
+    import matplotlib.pyplot as plt  # Data visualization
+    import seaborn as sns  # Enhanced plotting
+    import portfolio_engine as engine  # Vectorized return and risk calculations
+    from rolling_metrics import rolling_history  # Rolling 30/90/252-day risk metrics
     try:
         # --- Load and Clean Data ---
-        portfolio_df = pd.read_csv(uploaded_file)
-        portfolio_df.columns = portfolio_df.columns.str.strip()  # Clean column names
-        portfolio_df['Ticker'] = portfolio_df['Ticker'].astype(str).str.upper().str.strip()  # Normalize tickers
+        with perf.stage('load_csv'):
+            portfolio_df = pd.read_csv(uploaded_file)
+            portfolio_df.columns = portfolio_df.columns.str.strip()  # Clean column names
+            portfolio_df['Ticker'] = portfolio_df['Ticker'].astype(str).str.upper().str.strip()  # Normalize tickers
 
         # --- Validate Required Columns ---
         if not {'Ticker', 'Shares'}.issubset(portfolio_df.columns):
@@ -56,25 +126,14 @@ if uploaded_file:
         else:
             tickers = portfolio_df['Ticker'].tolist()
 
-            # --- Download Stock Data ---
-            data = yf.download(tickers, start=START_DATE, end=END_DATE, auto_adjust=True, threads=True)
-
-            # --- Flatten MultiIndex columns (e.g., ('Close', 'AAPL') → 'AAPL_Close') ---
-            if isinstance(data.columns, pd.MultiIndex):
-                data.columns = ['{}_{}'.format(col[1], col[0]) for col in data.columns]
-
-            # --- Fetch Latest Closing Prices ---
-            latest_prices = {}
-            for ticker in tickers:
-                col_name = f"{ticker}_Close"
-                if col_name in data.columns:
-                    series = data[col_name].dropna()
-                    if not series.empty:
-                        latest_prices[ticker] = series.iloc[-1]
-                    else:
-                        st.warning(f"No valid price data for {ticker}. Skipping.")
-                else:
-                    st.warning(f"Column {col_name} not found in data. Skipping.")
+            price_cache = get_price_cache()
+            perf.count('tickers', len(tickers))
+
+            # --- Fetch Latest Closing Prices First (a few recent days, so the overview renders quickly) ---
+            with st.spinner('Fetching latest prices...'), perf.stage('latest_prices'):
+                latest_prices = price_cache.get_latest_prices(tickers, END_DATE)
+            for ticker in latest_prices.index[latest_prices.isna()]:
+                st.warning(f"No valid price data for {ticker}. Skipping.")
 
             # --- Calculate Current Price and Market Value ---
             portfolio_df['Current Price'] = portfolio_df['Ticker'].map(latest_prices)
@@ -94,80 +153,86 @@ if uploaded_file:
                 st.info("Purchase Price column not found. Unrealized gains/losses omitted.")
 
             # --- Portfolio Overview Table ---
-            st.subheader('Portfolio Overview')
-            st.dataframe(portfolio_df.style.format({
-                'Current Price': '${:.2f}',
-                'Market Value': '${:,.2f}',
-                'Allocation %': '{:.2f}%',
-                'Unrealized Gain ($)': '${:,.2f}',
-                'Unrealized Gain (%)': '{:.2f}%'
-            }))
+            with perf.stage('overview_table'):
+                st.subheader('Portfolio Overview')
+                st.dataframe(portfolio_df.style.format({
+                    'Current Price': '${:.2f}',
+                    'Market Value': '${:,.2f}',
+                    'Allocation %': '{:.2f}%',
+                    'Unrealized Gain ($)': '${:,.2f}',
+                    'Unrealized Gain (%)': '{:.2f}%'
+                }))
 
             # --- Allocation Visualization (Pie or Bar Chart) ---
-            st.subheader('Asset Allocation')
-            fig1, ax1 = plt.subplots(figsize=(10, 6))
+            with perf.stage('allocation_chart'):
+                st.subheader('Asset Allocation')
+                fig1, ax1 = plt.subplots(figsize=(10, 6))
 
-            if chart_type == 'Pie Chart':
-                def autopct_format(p):
-                    return f'{p:.1f}%' if p > 3 else ''
+                if chart_type == 'Pie Chart':
+                    def autopct_format(p):
+                        return f'{p:.1f}%' if p > 3 else ''
 
-                def label_format(label, pct):
-                    return label if pct > 3 else ''
+                    def label_format(label, pct):
+                        return label if pct > 3 else ''
 
-                sizes = portfolio_df['Allocation %']
-                labels = portfolio_df['Ticker']
-                formatted_labels = [label_format(label, pct) for label, pct in zip(labels, sizes)]
+                    sizes = portfolio_df['Allocation %']
+                    labels = portfolio_df['Ticker']
+                    formatted_labels = [label_format(label, pct) for label, pct in zip(labels, sizes)]
 
-                ax1.pie(sizes, labels=formatted_labels, autopct=autopct_format, startangle=140, textprops={'fontsize': 9})
-                ax1.axis('equal')
-                ax1.legend(portfolio_df['Ticker'], title="Tickers", bbox_to_anchor=(1, 0.5), loc="center left", fontsize=9)
-            else:
-                sns.barplot(data=portfolio_df.sort_values('Allocation %', ascending=False), x='Ticker', y='Allocation %', palette='pastel', ax=ax1)
-                ax1.set_ylabel('Allocation (%)')
-                ax1.set_title('Portfolio Allocation by Ticker')
+                    ax1.pie(sizes, labels=formatted_labels, autopct=autopct_format, startangle=140, textprops={'fontsize': 9})
+                    ax1.axis('equal')
+                    ax1.legend(portfolio_df['Ticker'], title="Tickers", bbox_to_anchor=(1, 0.5), loc="center left", fontsize=9)
+                else:
+                    sns.barplot(data=portfolio_df.sort_values('Allocation %', ascending=False), x='Ticker', y='Allocation %', palette='pastel', ax=ax1)
+                    ax1.set_ylabel('Allocation (%)')
+                    ax1.set_title('Portfolio Allocation by Ticker')
 
-            st.pyplot(fig1)
+                st.pyplot(fig1)
 
             # --- Portfolio vs. Market Performance ---
             st.subheader('Portfolio Performance vs. S&P 500')
 
-            portfolio_returns = pd.DataFrame()
-            for ticker in tickers:
-                try:
-                    col_name = f"{ticker}_Close"
-                    if col_name in data.columns:
-                        portfolio_returns[ticker] = data[col_name].pct_change()
-                except:
-                    continue
-
-            weighted_returns = (portfolio_returns * (portfolio_df.set_index('Ticker')['Allocation %'] / 100)).sum(axis=1)
-            cumulative_returns = (1 + weighted_returns).cumprod()
-
-            sp500 = yf.download(SP500_TICKER, start=START_DATE, end=END_DATE, auto_adjust=True)
-            sp500_returns = sp500['Close'].pct_change()
-            sp500_cumulative = (1 + sp500_returns).cumprod()
-
-            fig2, ax2 = plt.subplots(figsize=(12, 6))
-            ax2.plot(cumulative_returns.index, cumulative_returns.values, label='Your Portfolio', linewidth=2)
-            ax2.plot(sp500_cumulative.index, sp500_cumulative.values, label='S&P 500', linewidth=2)
-            ax2.set_ylabel('Growth of $1')
-            ax2.set_title('Cumulative Return Since 2022')
-            ax2.legend()
-            st.pyplot(fig2)
+            # --- Load Full Stock and Benchmark History (concurrent batches, only missing days are downloaded) ---
+            with perf.stage('price_history'):
+                history_progress = st.progress(0.0, text='Loading price history...')
+
+                def show_history_progress(done, total):
+                    history_progress.progress(done / total, text=f'Loading price history... ({done}/{total} batches)')
+                    perf.count('download_batches')  # Only missing days are downloaded; 0 when fully cached
+
+                prices = price_cache.get_prices(tickers + [SP500_TICKER], START_DATE, END_DATE, progress=show_history_progress)
+                history_progress.empty()
+                for ticker, error in price_cache.last_errors.items():
+                    st.warning(f"Could not download history for {ticker}: {error}")
+                sp500_close = prices[SP500_TICKER]
+                data = prices[list(dict.fromkeys(tickers))]  # One closing-price column per holding
+                price_matrix = data.to_numpy(dtype=float)
+
+            # --- Weights aligned to the price matrix columns (0 for dropped tickers) ---
+            weights = (portfolio_df.groupby('Ticker')['Allocation %'].sum() / 100).reindex(data.columns, fill_value=0.0)
+
+            # --- All return and risk metrics in one batched pass ---
+            with perf.stage('portfolio_metrics'):
+                metrics = engine.portfolio_metrics(price_matrix, weights.to_numpy(), sp500_close.to_numpy(dtype=float), risk_free_rate=RISK_FREE_RATE)
+                cumulative_returns = pd.Series(metrics['cumulative_returns'], index=data.index)
+                sp500_cumulative = pd.Series(metrics['benchmark_cumulative'], index=data.index)
+
+            with perf.stage('performance_chart'):
+                fig2, ax2 = plt.subplots(figsize=(12, 6))
+                ax2.plot(cumulative_returns.index, cumulative_returns.values, label='Your Portfolio', linewidth=2)
+                ax2.plot(sp500_cumulative.index, sp500_cumulative.values, label='S&P 500', linewidth=2)
+                ax2.set_ylabel('Growth of $1')
+                ax2.set_title('Cumulative Return Since 2022')
+                ax2.legend()
+                st.pyplot(fig2)
 
             # --- Risk Metrics Calculation ---
             st.subheader('Portfolio Risk Metrics')
 
-            volatility = weighted_returns.std() * np.sqrt(252)
-            sharpe = ((weighted_returns.mean() * 252) - RISK_FREE_RATE) / volatility
-
-            aligned = pd.concat([weighted_returns, sp500_returns], axis=1).dropna()
-            aligned.columns = ['Portfolio', 'S&P 500']
-            beta = aligned.cov().iloc[0, 1] / aligned['S&P 500'].var()
-
-            rolling_max = cumulative_returns.cummax()
-            drawdown = cumulative_returns / rolling_max - 1
-            max_drawdown = drawdown.min()
+            volatility = metrics['volatility']
+            sharpe = metrics['sharpe']
+            beta = metrics['beta']
+            max_drawdown = metrics['max_drawdown']
 
             st.markdown(f"""
             - **Portfolio Volatility (Annualized)**: `{volatility:.2%}`
@@ -176,26 +241,185 @@ if uploaded_file:
             - **Maximum Drawdown**: `{max_drawdown:.2%}`
             """)
 
-            # --- Asset Correlation Matrix ---
-            st.subheader('Correlation Heatmap')
-            fig3, ax3 = plt.subplots(figsize=(12, 10))
-            sns.heatmap(portfolio_returns.corr(), annot=True, fmt='.2f', cmap='coolwarm', center=0, annot_kws={'size': 7}, ax=ax3)
-            ax3.set_title('Correlation Between Assets')
-            st.pyplot(fig3)
+            # --- Further Analysis (only the selected section is computed and drawn) ---
+            section = st.radio("Analysis Section", ANALYSIS_SECTIONS, horizontal=True)
+
+            if section == 'Rolling Risk Metrics':
+                # --- Rolling Risk Metrics (one O(n) pass over running sums) ---
+                st.subheader('Rolling Risk Metrics')
+                with perf.stage('rolling_history'):
+                    rolling = rolling_history(metrics['weighted_returns'], metrics['benchmark_returns'], index=data.index, risk_free_rate=RISK_FREE_RATE)
+                window = st.radio("Rolling Window (trading days)", [30, 90, 252], index=1, horizontal=True)
+                with perf.stage('rolling_charts'):
+                    rolling_view = pd.DataFrame({
+                        'Volatility': rolling['volatility'][window],
+                        'Sharpe Ratio': rolling['sharpe'][window],
+                        'Beta': rolling['beta'][window],
+                        'Correlation to S&P 500': rolling['correlation'][window],
+                        'Drawdown': rolling['drawdown'][window],
+                    }).dropna(how='all')
+                    roll_col1, roll_col2 = st.columns(2)
+                    with roll_col1:
+                        st.line_chart(rolling_view[['Volatility', 'Drawdown']])
+                        st.line_chart(rolling_view[['Sharpe Ratio']])
+                    with roll_col2:
+                        st.line_chart(rolling_view[['Beta', 'Correlation to S&P 500']])
+
+            elif section == 'Forward-Looking Risk (Monte Carlo)':
+                # --- Forward-Looking Risk (Monte Carlo) ---
+                st.subheader('Forward-Looking Risk (Monte Carlo)')
+                mc_col1, mc_col2, mc_col3 = st.columns(3)
+                mc_years = mc_col1.slider("Horizon (Years)", 1, 5, 5)
+                mc_paths = mc_col2.select_slider("Simulated Paths", [1_000, 10_000, 50_000, 100_000], value=10_000)
+                mc_method = mc_col3.radio("Sampling Method", ['bootstrap', 'normal'], horizontal=True)
+                with perf.stage('monte_carlo'):
+                    fan, mc_summary = run_simulation(metrics['returns'][1:], weights.to_numpy(), mc_years, mc_paths, mc_method)
+
+                with perf.stage('fan_chart'):
+                    fig_mc, ax_mc = plt.subplots(figsize=(12, 6))
+                    ax_mc.fill_between(fan.index, fan['P5'], fan['P95'], alpha=0.2, label='5th-95th Percentile')
+                    ax_mc.fill_between(fan.index, fan['P25'], fan['P75'], alpha=0.4, label='25th-75th Percentile')
+                    ax_mc.plot(fan.index, fan['P50'], linewidth=2, label='Median')
+                    ax_mc.set_xlabel('Trading Days Ahead')
+                    ax_mc.set_ylabel('Growth of $1')
+                    ax_mc.set_title(f'Simulated Portfolio Growth ({mc_paths:,} Paths)')
+                    ax_mc.legend()
+                    st.pyplot(fig_mc)
+                    st.dataframe(mc_summary.style.format({col: '{:.2%}' for col in mc_summary.columns if col != 'Horizon (Years)'}))
+
+            elif section == 'Correlation Heatmap':
+                # --- Asset Correlation Matrix ---
+                st.subheader('Correlation Heatmap')
+                from correlation import binned_matrix, cluster_order, top_pairs  # Clustered ordering and ranked pairs
+                with perf.stage('correlation'):
+                    tracker = get_correlation_tracker(tuple(data.columns))
+                    tracker.extend(metrics['returns'], data.index)  # New days only, unless earlier days changed
+                    correlation = tracker.correlation()
+                    order = cluster_order(correlation)  # Correlated assets next to each other
+                    clustered = pd.DataFrame(correlation[order][:, order], index=data.columns[order], columns=data.columns[order])
+
+                with perf.stage('heatmap'):
+                    n_assets = len(clustered)
+                    fig3, ax3 = plt.subplots(figsize=(12, 10))
+                    heatmap_style = {'cmap': 'coolwarm', 'center': 0, 'vmin': -1, 'vmax': 1, 'ax': ax3}
+                    if n_assets <= HEATMAP_ANNOTATE_LIMIT:
+                        sns.heatmap(clustered, annot=True, fmt='.2f', annot_kws={'size': 7}, **heatmap_style)
+                        ax3.set_title('Correlation Between Assets (Clustered Order)')
+                    elif n_assets <= HEATMAP_CELL_LIMIT:
+                        sns.heatmap(clustered, xticklabels=n_assets <= 60, yticklabels=n_assets <= 60, **heatmap_style)
+                        ax3.set_title('Correlation Between Assets (Clustered Order)')
+                    else:
+                        groups = binned_matrix(clustered.to_numpy(), clustered.index, HEATMAP_BINS)
+                        sns.heatmap(groups, xticklabels=False, yticklabels=True, **heatmap_style)
+                        ax3.tick_params(axis='y', labelsize=6)
+                        ax3.set_title(f'Average Correlation Between {len(groups)} Clustered Groups of Assets')
+                    st.pyplot(fig3)
+
+                # --- Most Correlated and Anti-Correlated Pairs ---
+                top_k = st.slider("Pairs to List", 5, 50, 10)
+                with perf.stage('top_pairs'):
+                    most, least = top_pairs(correlation, data.columns, top_k, count=tracker.overlap())
+                pair_col1, pair_col2 = st.columns(2)
+                pair_col1.write('**Most Correlated Pairs**')
+                pair_col1.dataframe(most.style.format({'Correlation': '{:.2f}'}), hide_index=True)
+                pair_col2.write('**Most Anti-Correlated Pairs**')
+                pair_col2.dataframe(least.style.format({'Correlation': '{:.2f}'}), hide_index=True)
+
+            elif section == 'Portfolio Optimizer':
+                # --- Portfolio Optimizer (Efficient Frontier) ---
+                st.subheader('Portfolio Optimizer')
+                with st.expander("Suggest allocations from the efficient frontier"):
+                    opt_col1, opt_col2 = st.columns(2)
+                    long_only = opt_col1.checkbox("Long-only (no short positions)", value=True)
+                    max_weight = opt_col2.slider("Maximum Weight per Position (%)", 1, 100, 40) / 100
+                    if st.checkbox("Run optimizer"):
+                        with perf.stage('optimizer'):
+                            optimizer = get_optimizer(metrics['returns'][1:], tuple(data.columns))
+                            frontier, frontier_weights = optimizer.frontier(max_weight=max_weight, long_only=long_only)
+                            min_var = optimizer.min_variance(max_weight, long_only)
+                            max_sharpe = optimizer.max_sharpe(max_weight, long_only, frontier=(frontier, frontier_weights))
+                            min_var_ret, min_var_vol, _ = optimizer.stats(min_var)
+                            max_sharpe_ret, max_sharpe_vol, _ = optimizer.stats(max_sharpe)
+                            current_ret, current_vol, _ = optimizer.stats(weights.to_numpy())
+
+                        with perf.stage('frontier_chart'):
+                            fig_opt, ax_opt = plt.subplots(figsize=(10, 6))
+                            ax_opt.plot(frontier['Volatility'], frontier['Expected Return'], marker='o', markersize=3, label='Efficient Frontier')
+                            ax_opt.scatter(min_var_vol, min_var_ret, s=80, marker='s', label='Minimum Variance', zorder=3)
+                            ax_opt.scatter(max_sharpe_vol, max_sharpe_ret, s=80, marker='*', label='Maximum Sharpe', zorder=3)
+                            ax_opt.scatter(current_vol, current_ret, s=80, marker='X', label='Your Portfolio', zorder=3)
+                            ax_opt.set_xlabel('Volatility (Annualized)')
+                            ax_opt.set_ylabel('Expected Return (Annualized)')
+                            ax_opt.set_title('Mean-Variance Efficient Frontier')
+                            ax_opt.legend()
+                            st.pyplot(fig_opt)
+
+                        suggested = pd.DataFrame({
+                            'Current %': weights.to_numpy() * 100,
+                            'Minimum Variance %': min_var * 100,
+                            'Maximum Sharpe %': max_sharpe * 100,
+                        }, index=data.columns)
+                        st.dataframe(suggested.style.format('{:.2f}%'))
+
+            elif section == 'Rebalancing Backtest':
+                # --- Historical Backtest (weights drift with prices until a policy trades them back) ---
+                import backtest  # Vectorized rebalancing simulation with transaction costs
+                st.subheader('Rebalancing Backtest')
+                st.caption("Starts at today's allocation on the first day and lets the weights drift with prices. "
+                           "The performance chart above is the 'daily' policy with no costs.")
+                rule_names = {backtest.rule_name(rule): rule for rule in backtest.DEFAULT_RULES}
+                bt_col1, bt_col2 = st.columns(2)
+                chosen = bt_col1.multiselect("Rebalancing Policies", list(rule_names),
+                                             default=['never', 'monthly', 'quarterly', 'threshold 5%'])
+                cost_bps = bt_col2.slider("Transaction Cost (bps of value traded)", 0, 100, 10)
+                if chosen:
+                    with perf.stage('backtest'):
+                        result = backtest.run_backtest(price_matrix, weights.to_numpy(), data.index, [rule_names[name] for name in chosen],
+                                                       [cost_bps], benchmark=sp500_close.to_numpy(dtype=float), risk_free_rate=RISK_FREE_RATE)
+
+                    with perf.stage('backtest_chart'):
+                        fig_bt, ax_bt = plt.subplots(figsize=(12, 6))
+                        for name, growth in zip(chosen, result['growth']):
+                            ax_bt.plot(data.index, growth, label=name, linewidth=1.5)
+                        ax_bt.plot(data.index, result['benchmark_growth'], label='S&P 500', linewidth=2, color='black', linestyle='--')
+                        ax_bt.set_ylabel('Growth of $1 (after costs)')
+                        ax_bt.set_title(f'Rebalancing Policies vs. S&P 500 ({cost_bps} bps per trade)')
+                        ax_bt.legend()
+                        st.pyplot(fig_bt)
+
+                    percent_columns = ['Total Return', 'Annualized Return', 'Volatility', 'Max Drawdown', 'Annual Turnover',
+                                       'Costs Paid', 'Excess Return vs. S&P 500']
+                    st.dataframe(result['summary'].style.format({**{col: '{:.2%}' for col in percent_columns},
+                                                                 'Sharpe Ratio': '{:.2f}', 'Beta': '{:.2f}', 'Cost (bps)': '{:.0f}'}),
+                                 hide_index=True)
+
+                with st.expander("Sweep every policy and cost level"):
+                    if st.checkbox("Run sweep"):  # Expander bodies run even when collapsed, so the sweep waits for this
+                        with perf.stage('backtest_sweep'):
+                            sweep = backtest.run_backtest(price_matrix, weights.to_numpy(), data.index,
+                                                          costs_bps=sorted(set(backtest.DEFAULT_COSTS_BPS) | {cost_bps}),
+                                                          benchmark=sp500_close.to_numpy(dtype=float), risk_free_rate=RISK_FREE_RATE)
+                        st.dataframe(sweep['summary'].pivot(index='Policy', columns='Cost (bps)', values='Annualized Return')
+                                     .reindex(list(rule_names)).style.format('{:.2%}'))
+                        st.caption('Annualized return after costs; columns are the cost per trade in basis points.')
 
             # --- Export Summary ---
             st.subheader('Download Summary Report')
-            report = portfolio_df[['Ticker', 'Shares', 'Current Price', 'Market Value', 'Allocation %']]
-            st.download_button(
-                label="Download Portfolio Report (CSV)",
-                data=report.to_csv(index=False),
-                file_name='portfolio_summary.csv',
-                mime='text/csv'
-            )
+            with perf.stage('export'):
+                report = portfolio_df[['Ticker', 'Shares', 'Current Price', 'Market Value', 'Allocation %']]
+                st.download_button(
+                    label="Download Portfolio Report (CSV)",
+                    data=report.to_csv(index=False),
+                    file_name='portfolio_summary.csv',
+                    mime='text/csv'
+                )
 
     except Exception as e:
         st.error(f"An error occurred: {e}")
         st.warning("Please check your CSV file format and try again.")
 
 else:
-    st.info('👈 Upload a CSV file to get started!')
\ No newline at end of file
+    st.info('👈 Upload a CSV file to get started!')
+
+# --- Performance Panel (sidebar; only with ?perf=1 or PERF_PANEL=1) ---
+instrumentation.debug_panel(perf)
@@ -0,0 +1,128 @@
+# Passion Hood
+# CSE 10102: Elements of Computing II, Spring 2025
+# Final Project: Vectorized portfolio analytics engine
+
+# --- Import Necessary Libraries ---
+import numpy as np  # All math runs on plain (dates x tickers) arrays
+
+# --- Defaults (match the Streamlit app) ---
+RISK_FREE_RATE = 0.03  # Assumed 3% risk-free rate for Sharpe Ratio
+TRADING_DAYS = 252  # Trading days per year for annualizing
+
+
+# --- Price Matrix Helpers ---
+def forward_fill(prices):
+    """Carry the last valid price forward down each column (NaN before the first price)."""
+    prices = np.asarray(prices, dtype=float)
+    valid = ~np.isnan(prices)
+    rows = np.where(valid, np.arange(prices.shape[0])[:, None], 0)
+    np.maximum.accumulate(rows, axis=0, out=rows)  # Index of the last valid row so far
+    filled = prices[rows, np.arange(prices.shape[1])]
+    filled[~np.maximum.accumulate(valid, axis=0)] = np.nan  # Nothing to carry yet
+    return filled
+
+
+def latest_prices(prices):
+    """Last valid price in every column (NaN for tickers with no data)."""
+    return forward_fill(prices)[-1] if len(prices) else np.full(np.shape(prices)[1], np.nan)
+
+
+def simple_returns(prices):
+    """Daily simple returns of a forward-filled price matrix; the first row is NaN."""
+    filled = forward_fill(prices)
+    returns = np.full_like(filled, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = filled[1:] / filled[:-1] - 1
+    return returns
+
+
+def series_returns(prices):
+    """Returns of a single price series measured between its own valid days.
+
+    Used for the benchmark so a day the index did not trade is NaN rather
+    than a 0% return followed by a two-day jump.
+    """
+    prices = np.asarray(prices, dtype=float)
+    returns = np.full(prices.shape, np.nan)
+    valid = np.flatnonzero(~np.isnan(prices))
+    if len(valid) > 1:
+        returns[valid[1:]] = prices[valid[1:]] / prices[valid[:-1]] - 1
+    return returns
+
+
+def allocation_weights(shares, prices_now):
+    """Market values and allocation weights (fractions summing to 1) per holding."""
+    market_value = np.asarray(shares, dtype=float) * np.asarray(prices_now, dtype=float)
+    total = np.nansum(market_value, axis=-1, keepdims=True)
+    return market_value, np.nan_to_num(market_value / total)
+
+
+# --- Portfolio Metrics ---
+def weighted_returns(returns, weights):
+    """Daily portfolio returns for one weights vector or a (portfolios x tickers) matrix.
+
+    Missing asset returns count as 0, matching pandas' skipna weighted sum.
+    The result is (dates,) for a vector and (portfolios x dates) for a matrix.
+    """
+    weights = np.asarray(weights, dtype=float)
+    returns = np.nan_to_num(returns)
+    if weights.ndim > 1:
+        return weights @ returns.T
+    return returns @ weights
+
+
+def max_drawdown(cumulative):
+    """Largest peak-to-trough decline along the last axis."""
+    return np.min(cumulative / np.maximum.accumulate(cumulative, axis=-1) - 1, axis=-1)
+
+
+def beta(port_returns, bench_returns):
+    """Beta of each portfolio to the benchmark over the days both have returns."""
+    port_returns = np.atleast_2d(port_returns)
+    both = ~np.isnan(bench_returns) & ~np.isnan(port_returns).any(axis=0)
+    p, b = port_returns[:, both], bench_returns[both]
+    if len(b) < 2:
+        return np.full(len(port_returns), np.nan)
+    b_dev = b - b.mean()
+    cov = (p - p.mean(axis=1, keepdims=True)) @ b_dev / (len(b) - 1)
+    return cov / b.var(ddof=1)
+
+
+def portfolio_metrics(prices, weights, benchmark=None, risk_free_rate=RISK_FREE_RATE, periods_per_year=TRADING_DAYS):
+    """Compute every analyzer metric in one batched pass.
+
+    `prices` is a (dates x tickers) price matrix and `weights` is either one
+    weights vector or a (portfolios x tickers) matrix of fractions. The
+    return matrix is built once and shared by every portfolio, so scoring
+    thousands of books costs one matrix multiply rather than thousands of
+    DataFrame builds. `benchmark` is an optional price series on the same
+    dates used for beta.
+    """
+    returns = simple_returns(prices)
+    weights = np.asarray(weights, dtype=float)
+    port = weighted_returns(returns, weights)  # First day is 0, same as the skipna sum
+    cumulative = np.cumprod(1 + port, axis=-1)
+    volatility = port.std(axis=-1, ddof=1) * np.sqrt(periods_per_year)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = (port.mean(axis=-1) * periods_per_year - risk_free_rate) / volatility
+
+    metrics = {
+        'returns': returns,
+        'weighted_returns': port,
+        'cumulative_returns': cumulative,
+        'volatility': volatility,
+        'sharpe': sharpe,
+        'max_drawdown': max_drawdown(cumulative),
+        'beta': None,
+        'benchmark_returns': None,
+        'benchmark_cumulative': None,
+    }
+
+    if benchmark is not None:
+        bench = series_returns(benchmark)
+        metrics['benchmark_returns'] = bench
+        metrics['benchmark_cumulative'] = np.cumprod(1 + np.nan_to_num(bench))
+        port_beta = beta(port, bench)
+        metrics['beta'] = port_beta if weights.ndim > 1 else port_beta[0]
+
+    return metrics
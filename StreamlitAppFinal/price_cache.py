@@ -0,0 +1,357 @@
+# Passion Hood
+# CSE 10102: Elements of Computing II, Spring 2025
+# Final Project: Local price history cache for the Portfolio Analyzer
+
+# --- Import Necessary Libraries ---
+import json  # Coverage manifest on disk
+import os  # File paths for the cache directory
+import re  # Making tickers safe to use as file names
+import time  # Backoff between retries and when failed tickers may be asked for again
+from concurrent.futures import ThreadPoolExecutor, as_completed  # Concurrent ticker batches
+import numpy as np  # Comparing overlapping closes
+import pandas as pd  # Data processing (Parquet read/write)
+
+OVERLAP_DAYS = 7  # Top-ups re-download this many calendar days of cached history to check the adjustment basis
+BASIS_TOLERANCE = 1e-4  # Relative change in an already-cached close that means prices were re-adjusted
+MISSING_RETRY_SECONDS = 6 * 3600  # A ticker that returned no prices (delisted, mistyped) is not asked for again for this long
+ERROR_RETRY_SECONDS = 5 * 60  # ... and one whose download raised (network errors usually clear up sooner)
+
+
+class MissingPricesError(Exception):
+    """Raised by a fetcher when some requested tickers came back empty.
+
+    `partial` holds the prices that did arrive and `missing` the tickers to
+    ask for again, so a retry only repeats the failed ones.
+    """
+
+    def __init__(self, missing, partial):
+        super().__init__(f"No prices returned for {', '.join(missing)}")
+        self.missing = list(missing)
+        self.partial = partial
+
+
+# --- Default Fetcher (Yahoo Finance) ---
+def yfinance_fetcher(tickers, start, end):
+    """Download adjusted closing prices as a (dates x tickers) DataFrame.
+
+    Any callable with this signature can be passed to PriceCache, which is
+    how tests and offline runs swap Yahoo out for a local stand-in.
+    Each ticker is requested through its own `yf.Ticker` because
+    `yf.download` keeps module-level state and is not safe to call from
+    several of the cache's worker threads at once. `Ticker.history` returns
+    an empty frame instead of raising when a download fails, so empty
+    tickers are raised as MissingPricesError to trigger the cache's retry.
+    """
+    import yfinance as yf  # Imported here so the cache works without yfinance installed
+
+    closes, missing = {}, []
+    for ticker in tickers:
+        history = yf.Ticker(ticker).history(start=start, end=end, auto_adjust=True)
+        if history.empty or history['Close'].isna().all():
+            missing.append(ticker)
+            continue
+        index = history.index.tz_localize(None).normalize()  # Exchange-local dates, no timezone
+        closes[ticker] = pd.Series(history['Close'].to_numpy(), index=index)
+    found = pd.DataFrame(closes, dtype=float)
+    if missing:
+        raise MissingPricesError(missing, found)
+    return found.reindex(columns=list(tickers))
+
+
+class PriceCache:
+    """Persistent per-ticker closing price store with incremental top-up.
+
+    Each ticker is kept in its own Parquet file (Date index, Close column).
+    A small JSON manifest records the date range that has already been
+    requested for every ticker, so days with no trading (weekends, holidays)
+    are not fetched again on the next rerun. Only the missing leading or
+    trailing days are requested from the fetcher. A range is only marked
+    covered for tickers that actually returned prices, so a failed or empty
+    download is retried later instead of leaving a permanent hole.
+
+    Failed tickers are also remembered in the manifest with the time they
+    may be asked for again (`MISSING_RETRY_SECONDS` after an empty result,
+    `ERROR_RETRY_SECONDS` after an error). Until then they are skipped and
+    listed in `last_errors`, so one delisted or mistyped symbol costs one
+    round of retries instead of one on every app rerun.
+
+    Adjusted closes are rebased by the provider after every split or
+    dividend, so each top-up also re-downloads the `OVERLAP_DAYS` next to
+    the cached rows. If those closes no longer match the cached ones, the
+    ticker's cache is dropped and its full range is downloaded again rather
+    than splicing two adjustment bases together.
+
+    Downloads are split into batches of `batch_size` tickers that run on a
+    bounded thread pool, each retried with exponential backoff. Results are
+    merged on the calling thread as batches finish, so a failed batch only
+    leaves its own tickers empty (listed in `last_errors`).
+    """
+
+    MANIFEST_NAME = '_manifest.json'
+
+    def __init__(self, cache_dir, fetcher=None, batch_size=10, max_workers=8, retries=3, backoff=0.5):
+        self.cache_dir = cache_dir
+        self.fetcher = fetcher or yfinance_fetcher
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.last_errors = {}  # ticker -> error message from the most recent call
+        self._frames = {}  # In-memory copy of every ticker loaded so far
+        os.makedirs(cache_dir, exist_ok=True)
+        manifest = self._load_manifest()
+        self._manifest = manifest['coverage']  # ticker -> [first, last) date requested
+        self._failed = manifest['failed']  # ticker -> epoch seconds after which it may be fetched again
+
+    # --- File Helpers ---
+    def _path(self, ticker):
+        safe = re.sub(r'[^A-Za-z0-9._-]', '_', ticker)  # e.g. '^GSPC' -> '_GSPC'
+        return os.path.join(self.cache_dir, f'{safe}.parquet')
+
+    def _load_manifest(self):
+        path = os.path.join(self.cache_dir, self.MANIFEST_NAME)
+        manifest = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                manifest = json.load(f)
+        if 'coverage' not in manifest:
+            manifest = {'coverage': manifest}  # Older caches stored only the coverage map
+        manifest.setdefault('failed', {})
+        return manifest
+
+    def _save_manifest(self):
+        path = os.path.join(self.cache_dir, self.MANIFEST_NAME)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'coverage': self._manifest, 'failed': self._failed}, f)
+        os.replace(tmp, path)  # Atomic swap so a crash never leaves a half-written manifest
+
+    def _load(self, ticker):
+        if ticker not in self._frames:
+            path = self._path(ticker)
+            if os.path.exists(path):
+                self._frames[ticker] = pd.read_parquet(path)['Close']
+            else:
+                empty_index = pd.DatetimeIndex([], name='Date')
+                self._frames[ticker] = pd.Series(index=empty_index, dtype=float, name='Close')
+        return self._frames[ticker]
+
+    def _reset(self, ticker):
+        """Forget everything cached for one ticker (e.g. after its prices were re-adjusted)."""
+        self._frames.pop(ticker, None)
+        self._manifest.pop(ticker, None)
+        if os.path.exists(self._path(ticker)):
+            os.remove(self._path(ticker))
+
+    def _basis_changed(self, ticker, new_rows):
+        """True when downloaded closes disagree with cached closes on the same days."""
+        cached = self._load(ticker)
+        both = cached.index.intersection(new_rows.dropna().index)
+        if not len(both):
+            return False
+        return not np.allclose(new_rows.loc[both].to_numpy(dtype=float), cached.loc[both].to_numpy(dtype=float),
+                               rtol=BASIS_TOLERANCE, atol=0.0)
+
+    def _last_cached_day(self, ticker, end):
+        """Latest cached date before `end` (Timestamp.min when nothing is cached)."""
+        index = self._load(ticker).index
+        index = index[index < end]
+        return index.max() if len(index) else pd.Timestamp.min
+
+    def _store(self, ticker, new_rows):
+        series = pd.concat([self._load(ticker), new_rows.dropna()])
+        series = series[~series.index.duplicated(keep='last')].sort_index()  # Newer downloads win
+        series.index.name = 'Date'
+        series.name = 'Close'
+        series.to_frame().to_parquet(self._path(ticker))
+        self._frames[ticker] = series
+
+    # --- Range Planning ---
+    def _missing_ranges(self, ticker, start, end):
+        """Return the [start, end) windows not yet covered for one ticker."""
+        covered = self._manifest.get(ticker)
+        if covered is None:
+            return [(start, end)]
+
+        cov_start, cov_end = pd.Timestamp(covered[0]), pd.Timestamp(covered[1])
+        overlap = pd.Timedelta(days=OVERLAP_DAYS)  # Includes some cached days so the basis can be checked
+        missing = []
+        if start < cov_start:
+            missing.append((start, min(cov_start + overlap, cov_end)))
+        if end > cov_end:
+            missing.append((max(cov_end - overlap, cov_start), end))
+        return missing
+
+    def _skip_failed(self, tickers):
+        """Tickers not waiting out a recent failure; the others are listed in `last_errors`."""
+        now = time.time()
+        ready = []
+        for ticker in tickers:
+            retry_at = self._failed.get(ticker, 0)
+            if retry_at > now:
+                self.last_errors[ticker] = (f"No prices on the last attempt; not retried until "
+                                            f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(retry_at))}")
+            else:
+                ready.append(ticker)
+        return ready
+
+    def _mark_failed(self, ticker, seconds):
+        self._failed[ticker] = time.time() + seconds
+
+    def _mark_covered(self, ticker, start, end):
+        covered = self._manifest.get(ticker)
+        if covered is not None:
+            start = min(start, pd.Timestamp(covered[0]))
+            end = max(end, pd.Timestamp(covered[1]))
+        self._manifest[ticker] = [start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')]
+
+    # --- Concurrent Fetching ---
+    def _fetch_with_retry(self, tickers, start, end):
+        """Call the fetcher with backoff; after a MissingPricesError only the missing tickers are retried.
+
+        Tickers still missing after the last attempt are simply absent from
+        the result, and the merge step reports them in `last_errors`.
+        """
+        parts = []
+        for attempt in range(self.retries):
+            try:
+                parts.append(self.fetcher(tickers, start, end))
+                break
+            except MissingPricesError as e:
+                parts.append(e.partial)
+                tickers = e.missing
+            except Exception:
+                if attempt == self.retries - 1:
+                    raise
+            if attempt < self.retries - 1:
+                time.sleep(self.backoff * 2 ** attempt)  # 0.5s, 1s, 2s, ...
+        return pd.concat(parts, axis=1) if len(parts) > 1 else parts[0]
+
+    def _fetch_windows(self, pending, progress=None):
+        """Fetch every (window -> tickers) group in concurrent batches.
+
+        Yields (tickers, window, DataFrame or None) on the calling thread as
+        each batch finishes; `progress(done, total)` is called after each.
+        """
+        jobs = []
+        for (win_start, win_end), group in pending.items():
+            for i in range(0, len(group), self.batch_size):
+                jobs.append((group[i:i + self.batch_size], win_start, win_end))
+        if not jobs:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as pool:
+            futures = {
+                pool.submit(self._fetch_with_retry, batch, s.strftime('%Y-%m-%d'), e.strftime('%Y-%m-%d')): (batch, s, e)
+                for batch, s, e in jobs
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                batch, win_start, win_end = futures[future]
+                try:
+                    fetched = future.result()
+                except Exception as e:
+                    for ticker in batch:
+                        self.last_errors[ticker] = str(e)
+                    fetched = None
+                yield batch, (win_start, win_end), fetched
+                if progress:
+                    progress(done, len(jobs))
+
+    # --- Public API ---
+    def get_prices(self, tickers, start, end, progress=None):
+        """Return closing prices for `tickers` over [start, end) as a DataFrame.
+
+        Tickers that need the same missing window are downloaded together,
+        so a nightly top-up of a 200-ticker book is a handful of requests
+        for the last few days rather than 200 full-history requests.
+        `progress(done, total)` is called as each download batch finishes.
+        """
+        start = pd.Timestamp(start).normalize()
+        end = pd.Timestamp(end).normalize()
+        tickers = list(dict.fromkeys(tickers))  # De-duplicate but keep order
+        self.last_errors = {}
+
+        # --- Group tickers by the window they are missing ---
+        pending = {}
+        for ticker in self._skip_failed(tickers):
+            for window in self._missing_ranges(ticker, start, end):
+                pending.setdefault(window, []).append(ticker)
+
+        # --- Fetch concurrently and merge into the store as batches finish ---
+        rebased = self._merge(self._fetch_windows(pending, progress), mark_covered=True)
+
+        # --- Tickers whose cached closes were re-adjusted: download their full range again ---
+        for ticker in rebased:
+            self._reset(ticker)
+        if rebased:
+            self._merge(self._fetch_windows({(start, end): rebased}), mark_covered=True)
+
+        if pending:
+            self._save_manifest()
+
+        return self._assemble(tickers, start, end)
+
+    def _merge(self, fetched_batches, mark_covered):
+        """Store fetched batches; returns tickers whose adjustment basis changed (not stored).
+
+        A ticker counts as fetched only if it returned at least one price;
+        the others are listed in `last_errors`, their range is left
+        uncovered and they are skipped until their retry time.
+        """
+        rebased = []
+        for batch, (win_start, win_end), fetched in fetched_batches:
+            if fetched is None:
+                for ticker in batch:  # Errors already recorded; coverage unmarked so a later call retries
+                    self._mark_failed(ticker, ERROR_RETRY_SECONDS)
+                continue
+            for ticker in batch:
+                rows = fetched[ticker].dropna() if ticker in fetched.columns else pd.Series(dtype=float)
+                if rows.empty:
+                    self.last_errors.setdefault(
+                        ticker, f"No prices returned for {win_start:%Y-%m-%d} to {win_end:%Y-%m-%d}")
+                    self._mark_failed(ticker, MISSING_RETRY_SECONDS)
+                    continue
+                self._failed.pop(ticker, None)
+                if self._basis_changed(ticker, rows):
+                    rebased.append(ticker)
+                    continue
+                self._store(ticker, rows)
+                if mark_covered:
+                    self._mark_covered(ticker, win_start, win_end)
+        return rebased
+
+    def get_latest_prices(self, tickers, end, lookback_days=10, progress=None):
+        """Most recent closing price per ticker, fetching only a short recent window.
+
+        Tickers whose cache already holds the last weekday before `end` are
+        answered from memory; the rest download just the last
+        `lookback_days` calendar days, which is far quicker than full
+        history and lets the app show holdings first. (On an exchange
+        holiday that weekday has no close, so those tickers are asked again
+        on every call, which is one short request.) Tickers that failed
+        recently are skipped, as in `get_prices`. The rows are kept but
+        coverage is not marked, so `get_prices` still backfills the full
+        range later.
+        """
+        end = pd.Timestamp(end).normalize()
+        start = end - pd.Timedelta(days=lookback_days)
+        tickers = list(dict.fromkeys(tickers))
+        self.last_errors = {}
+
+        last_trading_day = pd.bdate_range(end - pd.Timedelta(days=7), end - pd.Timedelta(days=1))[-1]  # Latest close expected
+        stale = [t for t in self._skip_failed(tickers) if self._last_cached_day(t, end) < last_trading_day]
+        rebased = self._merge(self._fetch_windows({(start, end): stale} if stale else {}, progress), mark_covered=False)
+        for ticker in rebased:
+            self._reset(ticker)  # get_prices downloads the full re-adjusted range
+        if rebased:
+            self._merge(self._fetch_windows({(start, end): rebased}), mark_covered=False)
+        if stale:
+            self._save_manifest()  # Records failures (and resets) so other runs skip them too
+
+        recent = self._assemble(tickers, pd.Timestamp.min, end)
+        return recent.ffill().iloc[-1] if len(recent) else pd.Series(float('nan'), index=tickers)
+
+    def _assemble(self, tickers, start, end):
+        prices = pd.DataFrame({ticker: self._load(ticker) for ticker in tickers})
+        prices = prices.reindex(columns=tickers)  # Keep empty tickers as all-NaN columns
+        return prices.loc[(prices.index >= start) & (prices.index < end)]
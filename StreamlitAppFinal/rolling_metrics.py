@@ -0,0 +1,155 @@
+# Passion Hood
+# CSE 10102: Elements of Computing II, Spring 2025
+# Final Project: Rolling-window risk metrics with O(1) daily updates
+
+# --- Import Necessary Libraries ---
+import math  # Square roots for volatility and correlation
+from collections import deque  # Sliding windows and monotonic peak queues
+import numpy as np  # Numeric operations
+import pandas as pd  # Packaging history as a DataFrame
+from portfolio_engine import RISK_FREE_RATE, TRADING_DAYS  # Same defaults as the engine
+
+DEFAULT_WINDOWS = (30, 90, 252)  # Roughly 1.5 months, a quarter and a trading year
+
+
+class RollingWindow:
+    """Running moments for one window length, updated in O(1) per new day.
+
+    Keeps the mean and sum of squared deviations (M2) of portfolio returns,
+    and the means, M2s and co-moment of the (portfolio, benchmark) pairs on
+    days where the benchmark also has a return, so volatility, Sharpe, beta
+    and correlation never need the full history. Days enter and leave with
+    Welford's add/remove updates rather than raw sums of x^2 and xy, so a
+    long-running tracker fed live bars does not lose precision to
+    cancellation (e.g. a calm window after a volatile one). Growth of $1
+    goes through a monotonic queue so the window peak (and the drawdown
+    from it) is also amortized O(1).
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.values = deque()  # (day, portfolio return, benchmark return or NaN, growth of $1)
+        self.n = 0
+        self.mean = self.m2 = 0.0  # Portfolio returns: mean and sum of squared deviations
+        self.pn = 0
+        self.mx = self.my = 0.0  # Paired days: means of portfolio and benchmark returns
+        self.cxx = self.cyy = self.cxy = 0.0  # ... and their sums of squared deviations and co-deviations
+        self.peaks = deque()  # (day, growth) with decreasing growth, front is the window peak
+
+    def _add(self, x, y):
+        self.n += 1
+        dx = x - self.mean
+        self.mean += dx / self.n
+        self.m2 += dx * (x - self.mean)
+        if not math.isnan(y):
+            self.pn += 1
+            dx, dy = x - self.mx, y - self.my
+            self.mx += dx / self.pn
+            self.my += dy / self.pn
+            self.cxx += dx * (x - self.mx)
+            self.cyy += dy * (y - self.my)
+            self.cxy += dx * (y - self.my)
+
+    def _remove(self, x, y):
+        """Inverse of `_add` for the day leaving the window."""
+        self.n -= 1
+        if self.n == 0:
+            self.mean = self.m2 = 0.0
+        else:
+            dx = x - self.mean
+            self.mean -= dx / self.n
+            self.m2 -= dx * (x - self.mean)
+        if not math.isnan(y):
+            self.pn -= 1
+            if self.pn == 0:
+                self.mx = self.my = self.cxx = self.cyy = self.cxy = 0.0
+            else:
+                dx, dy = x - self.mx, y - self.my
+                self.mx -= dx / self.pn
+                self.my -= dy / self.pn
+                self.cxx -= dx * (x - self.mx)
+                self.cyy -= dy * (y - self.my)
+                self.cxy -= dx * (y - self.my)
+
+    def append(self, day, x, y, growth):
+        self.values.append((day, x, y, growth))
+        self._add(x, y)
+        if len(self.values) > self.size:
+            self._remove(*self.values.popleft()[1:3])
+
+        # --- Monotonic queue for the rolling peak of growth ---
+        while self.peaks and self.peaks[-1][1] <= growth:
+            self.peaks.pop()
+        self.peaks.append((day, growth))
+        while self.peaks[0][0] <= day - self.size:
+            self.peaks.popleft()
+
+    def metrics(self, risk_free_rate=RISK_FREE_RATE, periods_per_year=TRADING_DAYS):
+        nan = float('nan')
+        if self.n < self.size:
+            return {'volatility': nan, 'sharpe': nan, 'beta': nan, 'correlation': nan, 'drawdown': nan}
+
+        var = self.m2 / (self.n - 1)
+        vol = math.sqrt(var * periods_per_year) if var > 0 else 0.0  # A flat window can round to -0
+        sharpe = (self.mean * periods_per_year - risk_free_rate) / vol if vol > 0 else nan
+
+        beta = corr = nan
+        if self.pn > 1 and self.cyy > 0:
+            beta = self.cxy / self.cyy  # The (pn - 1) divisors cancel
+            if self.cxx > 0:
+                corr = max(min(self.cxy / math.sqrt(self.cxx * self.cyy), 1.0), -1.0)
+
+        drawdown = self.values[-1][3] / self.peaks[0][1] - 1
+        return {'volatility': vol, 'sharpe': sharpe, 'beta': beta, 'correlation': corr, 'drawdown': drawdown}
+
+
+class RollingRiskTracker:
+    """Rolling volatility, Sharpe, beta, correlation and drawdown for several windows.
+
+    Feed it one trading day at a time with `append` (e.g. live end-of-day
+    bars in a long-running process) or seed it with history via `extend`.
+    Each append updates every window in O(1) instead of recomputing the
+    series from `START_DATE`.
+    """
+
+    def __init__(self, windows=DEFAULT_WINDOWS, risk_free_rate=RISK_FREE_RATE, periods_per_year=TRADING_DAYS):
+        self.windows = {w: RollingWindow(w) for w in windows}
+        self.risk_free_rate = risk_free_rate
+        self.periods_per_year = periods_per_year
+        self.day = 0
+        self.growth = 1.0  # Growth of $1 since the first appended day
+
+    def append(self, port_return, bench_return=float('nan')):
+        """Add one day and return the latest metrics keyed by window length."""
+        port_return = 0.0 if math.isnan(port_return) else float(port_return)
+        self.growth *= 1 + port_return
+        for window in self.windows.values():
+            window.append(self.day, port_return, float(bench_return), self.growth)
+        self.day += 1
+        return self.latest()
+
+    def extend(self, port_returns, bench_returns=None):
+        if bench_returns is None:
+            bench_returns = np.full(len(port_returns), np.nan)
+        for x, y in zip(port_returns, bench_returns):
+            self.append(x, y)
+
+    def latest(self):
+        return {w: window.metrics(self.risk_free_rate, self.periods_per_year) for w, window in self.windows.items()}
+
+
+def rolling_history(port_returns, bench_returns=None, windows=DEFAULT_WINDOWS, index=None,
+                    risk_free_rate=RISK_FREE_RATE, periods_per_year=TRADING_DAYS):
+    """Full rolling-metric history in one O(n) pass.
+
+    Returns a DataFrame with (metric, window) MultiIndex columns, e.g.
+    history['volatility'][90]. Windows that have not filled yet are NaN.
+    """
+    tracker = RollingRiskTracker(windows, risk_free_rate, periods_per_year)
+    if bench_returns is None:
+        bench_returns = np.full(len(port_returns), np.nan)
+
+    rows = [tracker.append(x, y) for x, y in zip(port_returns, bench_returns)]
+    columns = pd.MultiIndex.from_product([['volatility', 'sharpe', 'beta', 'correlation', 'drawdown'], list(windows)])
+    data = {(metric, w): [row[w][metric] for row in rows] for metric, w in columns}
+    return pd.DataFrame(data, index=index, columns=columns)
@@ -0,0 +1,39 @@
+# Tests for headless batch scoring
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from batch_scoring import SP500_TICKER, run_batch  # noqa: E402
+
+
+class FakeCache:
+    """Stands in for PriceCache: random-walk closes for every ticker except 'GONE'."""
+
+    def get_prices(self, tickers, start, end):
+        dates = pd.bdate_range('2024-01-01', periods=60)
+        rng = np.random.default_rng(0)
+        priced = [t for t in tickers if t != 'GONE']
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(dates), len(priced))), axis=0))
+        return pd.DataFrame(closes, index=dates, columns=priced)
+
+
+def test_unpriced_tickers_are_reported(tmp_path):
+    folder = tmp_path / 'portfolios'
+    folder.mkdir()
+    (folder / 'mixed.csv').write_text('Ticker,Shares\nAAPL,10\nGONE,5\n')
+    (folder / 'delisted.csv').write_text('Ticker,Shares\nGONE,5\n')
+
+    holdings, summary, errors = run_batch(str(folder), str(tmp_path / 'out'), cache=FakeCache(), workers=1)
+    summary = summary.set_index('Portfolio')
+
+    assert errors == {}
+    assert summary.loc['mixed', 'Missing Tickers'] == 'GONE'
+    assert summary.loc['mixed', 'Holdings'] == 1 and summary.loc['mixed', 'Volatility'] > 0
+    assert summary.loc['delisted', 'Missing Tickers'] == 'GONE'
+    assert summary.loc['delisted', ['Cumulative Return', 'Volatility', 'Sharpe', 'Beta', 'Max Drawdown']].isna().all()
+    assert list(holdings['Ticker']) == ['AAPL']
+    assert pd.read_parquet(tmp_path / 'out' / 'summary.parquet')['Missing Tickers'].tolist() == ['GONE', 'GONE']
+    assert SP500_TICKER not in holdings['Ticker'].to_numpy()
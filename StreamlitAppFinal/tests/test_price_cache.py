@@ -0,0 +1,67 @@
+# Tests for the local price cache, with a fake fetcher standing in for Yahoo
+import os
+import sys
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from price_cache import MissingPricesError, PriceCache  # noqa: E402
+
+
+class FakeFetcher:
+    """Random-walk closes for every ticker except 'GONE', which returns nothing (like a delisted symbol)."""
+
+    def __init__(self):
+        self.requests = Counter()
+
+    def __call__(self, tickers, start, end):
+        self.requests.update(tickers)
+        dates = pd.bdate_range(start, end, inclusive='left')
+        found = [t for t in tickers if t != 'GONE']
+        closes = pd.DataFrame(100 + np.arange(len(dates))[:, None] * np.ones(len(found)), index=dates, columns=found)
+        if len(found) < len(tickers):
+            raise MissingPricesError([t for t in tickers if t not in found], closes)
+        return closes
+
+
+def test_missing_symbol_is_fetched_once_not_once_per_call(tmp_path):
+    fetcher = FakeFetcher()
+    cache = PriceCache(str(tmp_path), fetcher=fetcher, backoff=0)
+
+    first = cache.get_prices(['AAPL', 'GONE'], '2024-01-01', '2024-03-01')
+    attempts = fetcher.requests['GONE']
+    assert attempts == cache.retries  # One round of retries on the first call
+    assert first['GONE'].isna().all() and first['AAPL'].notna().all()
+    assert 'GONE' in cache.last_errors
+
+    for _ in range(3):
+        cache.get_prices(['AAPL', 'GONE'], '2024-01-01', '2024-03-01')
+        cache.get_latest_prices(['AAPL', 'GONE'], '2024-03-01')
+        assert 'GONE' in cache.last_errors  # Still reported, just not fetched again
+    assert fetcher.requests['GONE'] == attempts
+
+    # The failure is kept in the manifest, so a new cache (another app process) skips it too
+    reopened = PriceCache(str(tmp_path), fetcher=fetcher, backoff=0)
+    reopened.get_prices(['GONE'], '2024-01-01', '2024-03-01')
+    assert fetcher.requests['GONE'] == attempts
+
+    # Once its retry time has passed it is asked for again
+    reopened._failed['GONE'] = 0
+    reopened.get_prices(['GONE'], '2024-01-01', '2024-03-01')
+    assert fetcher.requests['GONE'] == 2 * attempts
+
+
+def test_fetch_errors_are_skipped_until_retry_time(tmp_path):
+    calls = []
+
+    def failing(tickers, start, end):
+        calls.append(list(tickers))
+        raise ConnectionError('offline')
+
+    cache = PriceCache(str(tmp_path), fetcher=failing, backoff=0)
+    cache.get_prices(['AAPL'], '2024-01-01', '2024-03-01')
+    cache.get_prices(['AAPL'], '2024-01-01', '2024-03-01')
+    assert len(calls) == cache.retries
+    assert 'not retried until' in cache.last_errors['AAPL']
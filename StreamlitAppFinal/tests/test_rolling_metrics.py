@@ -0,0 +1,46 @@
+# Tests for the O(1) rolling risk metrics
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rolling_metrics import RollingRiskTracker  # noqa: E402
+
+
+def test_long_running_tracker_matches_pandas():
+    # 10^5 live bars: volatile stretches (and a large drift) followed by calm ones, the worst case for raw sums.
+    rng = np.random.default_rng(7)
+    n, window = 100_000, 30
+    scale = np.where((np.arange(n) // 5_000) % 2 == 0, 0.5, 1e-4)
+    bench = rng.normal(0, 1, n) * scale + np.where(scale > 0.1, 0.3, 0.0)
+    port = 0.8 * bench + rng.normal(0, 1, n) * scale * 0.5
+
+    tracker = RollingRiskTracker(windows=(window,), periods_per_year=1)
+    rows = [tracker.append(x, y)[window] for x, y in zip(port, bench)]
+
+    x, y = pd.Series(port), pd.Series(bench)
+    expected_vol = x.rolling(window).std()
+    expected_beta = x.rolling(window).cov(y) / y.rolling(window).var()
+    expected_corr = x.rolling(window).corr(y)
+    # Compare at the end of every calm stretch, after tens of thousands of adds and removes
+    for day in range(2 * 5_000 - 1, n, 2 * 5_000):
+        assert rows[day]['volatility'] == pytest.approx(expected_vol[day], rel=1e-6)
+        assert rows[day]['beta'] == pytest.approx(expected_beta[day], rel=1e-6)
+        assert rows[day]['correlation'] == pytest.approx(expected_corr[day], rel=1e-6)
+
+
+def test_missing_benchmark_days_are_skipped_in_pairs():
+    rng = np.random.default_rng(1)
+    port, bench = rng.normal(0, 0.01, 500), rng.normal(0, 0.01, 500)
+    bench[::7] = np.nan
+    tracker = RollingRiskTracker(windows=(90,), periods_per_year=1)
+    for x, y in zip(port, bench):
+        latest = tracker.append(x, y)[90]
+
+    x, y = pd.Series(port[-90:]), pd.Series(bench[-90:])
+    assert latest['volatility'] == pytest.approx(x.std(), rel=1e-9)
+    assert latest['beta'] == pytest.approx(x.cov(y) / y.var(), rel=1e-9)
+    assert latest['correlation'] == pytest.approx(x.corr(y), rel=1e-9)
@@ -0,0 +1,187 @@
+# Tidy-transform pipeline for the Federal R&D budget files
+#
+# Stages (each one lazy and cached):
+#   parse -> read one wide CSV and parse its "1976_gdp1790000000000.0" headers
+#   melt  -> wide to long: one row per (department, header) with its Budget
+#   split -> Year and GDP looked up from the parsed headers, missing budgets dropped
+#   tidy  -> every file's split result stacked into one table
+#   pivot -> pivot_table of the tidy table (e.g. department x Year)
+#
+# A stage only runs the first time its result is asked for, and is keyed by
+# its inputs: per-file stages by the file's path, size and modification
+# time, combined stages by the keys of the files they use. Re-running after
+# editing one file of many recomputes that file's stages plus the combined
+# ones, and nothing else. Each stage keeps one result per file (or per pivot
+# layout), replaced when its key changes, so edits never pile up old results;
+# results for files a glob no longer matches are dropped on the next tidy/pivot.
+#
+# Cached results are shared between calls: treat what tidy() and pivot()
+# return as read-only (take a .copy() before modifying it).
+#
+# Usage:
+#   pipeline = TidyPipeline(["fed_rd_year&gdp.csv"])
+#   tidy = pipeline.tidy()                                    # department, Year, GDP, Budget
+#   table = pipeline.pivot(index="department", columns="Year", values="Budget")
+
+import glob  # Expanding folder patterns into budget files
+import os  # File sizes and modification times
+import numpy as np
+import pandas as pd
+
+ID_COLUMN = "department"
+HEADER_PATTERN = r"^(?P<Year>\d{4})_gdp(?P<GDP>[0-9.eE+-]+)$"
+
+
+# --- Vectorized Header Parsing ---
+def parse_headers(columns):
+    """Year and GDP for every wide-format header, parsed once per column (not per row).
+
+    Returns a DataFrame indexed by the header text. Raises ValueError for
+    headers that do not look like "<year>_gdp<value>".
+    """
+    headers = pd.Index(columns, dtype=object)
+    parts = headers.str.extract(HEADER_PATTERN)
+    bad = headers[parts["Year"].isna().to_numpy()]
+    if len(bad):
+        raise ValueError(f"Unrecognised year/GDP headers: {list(bad)[:5]}")
+    return pd.DataFrame({"Year": parts["Year"].astype(int).to_numpy(),
+                         "GDP": pd.to_numeric(parts["GDP"]).to_numpy()}, index=headers)
+
+
+# --- Stage Functions ---
+def parse(path, id_column=ID_COLUMN):
+    """Read one wide CSV; returns (wide frame, parsed headers)."""
+    wide = pd.read_csv(path)
+    return wide, parse_headers([c for c in wide.columns if c != id_column])
+
+
+def melt(parsed, id_column=ID_COLUMN):
+    """Wide to long. Year_GDP is categorical, so each header string is stored once."""
+    wide, headers = parsed
+    long = wide.melt(id_vars=[id_column], value_vars=list(headers.index), var_name="Year_GDP", value_name="Budget")
+    long["Year_GDP"] = pd.Categorical(long["Year_GDP"], categories=headers.index)
+    return long
+
+
+def split(long, headers, id_column=ID_COLUMN):
+    """Replace Year_GDP with Year and GDP columns and drop rows without a budget.
+
+    The split is a lookup by category code into the parsed header table,
+    instead of running string operations on every melted row.
+    """
+    codes = long["Year_GDP"].cat.codes.to_numpy()
+    tidy = pd.DataFrame({
+        id_column: long[id_column].to_numpy(),
+        "Year": headers["Year"].to_numpy()[codes],
+        "GDP": headers["GDP"].to_numpy()[codes],
+        "Budget": pd.to_numeric(long["Budget"], errors="coerce").to_numpy(),
+    })
+    return tidy[~np.isnan(tidy["Budget"].to_numpy())].reset_index(drop=True)
+
+
+# --- Lazy, Cached Pipeline ---
+class TidyPipeline:
+    """Lazily evaluated parse -> melt -> split -> tidy -> pivot stages over one or more files.
+
+    `paths` may contain glob patterns (e.g. "budgets/*.csv"); a pattern
+    that matches no files raises FileNotFoundError. When two files report
+    the same department and year, the file listed later wins. Results are
+    cached in memory for the life of the object, one per stage and file
+    (per stage and layout for pivots), and returned as is on later calls,
+    so treat them as read-only; `runs` counts how often each stage
+    actually computed.
+    """
+
+    FILE_STAGES = ("parse", "melt", "split")
+
+    def __init__(self, paths, id_column=ID_COLUMN):
+        self.patterns = [paths] if isinstance(paths, str) else list(paths)
+        self.id_column = id_column
+        self._cache = {}
+        self.runs = {"parse": 0, "melt": 0, "split": 0, "tidy": 0, "pivot": 0}
+
+    @property
+    def paths(self):
+        found = []
+        for pattern in self.patterns:
+            matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+            if not matches:
+                raise FileNotFoundError(f"No files match {pattern!r}")
+            found += matches
+        if not found:
+            raise FileNotFoundError("No budget files given")
+        return found
+
+    @staticmethod
+    def file_key(path):
+        stat = os.stat(path)
+        return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+    def _stage(self, name, slot, key, compute):
+        """Return the cached result of stage `name` for `key`, computing it on first use.
+
+        `slot` is what the result is for (a file, or a pivot layout) and
+        `key` the inputs it was computed from; each slot holds one result,
+        replaced when the key changes.
+        """
+        cached = self._cache.get((name, slot))
+        if cached is None or cached[0] != key:
+            cached = (key, compute())
+            self._cache[(name, slot)] = cached
+            self.runs[name] += 1
+        return cached[1]
+
+    def _prune(self, keys):
+        """Drop per-file results for files no longer among `keys` (e.g. removed from a glob's folder)."""
+        current = {key[0] for key in keys}
+        for name, slot in list(self._cache):
+            if name in self.FILE_STAGES and slot not in current:
+                del self._cache[(name, slot)]
+
+    # --- Per-file stages ---
+    def parsed(self, path):
+        key = self.file_key(path)
+        return self._stage("parse", key[0], key, lambda: parse(path, self.id_column))
+
+    def melted(self, path):
+        key = self.file_key(path)
+        return self._stage("melt", key[0], key, lambda: melt(self.parsed(path), self.id_column))
+
+    def split(self, path):
+        key = self.file_key(path)
+        return self._stage("split", key[0], key, lambda: split(self.melted(path), self.parsed(path)[1], self.id_column))
+
+    # --- Combined stages ---
+    def tidy(self):
+        """One long table (department, Year, GDP, Budget) across every file."""
+        paths = self.paths
+        key = tuple(self.file_key(p) for p in paths)
+        self._prune(key)
+
+        def combine():
+            parts = [self.split(p) for p in paths]
+            # A single file's split result is copied so the tidy table never aliases a per-file stage.
+            combined = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0].copy()
+            if len(parts) > 1:
+                combined = combined.drop_duplicates([self.id_column, "Year"], keep="last")
+                combined = combined.sort_values(["Year", self.id_column], kind="stable", ignore_index=True)
+            return combined
+
+        return self._stage("tidy", None, key, combine)
+
+    def pivot(self, index=ID_COLUMN, columns="Year", values="Budget", aggfunc="sum"):
+        """pivot_table of the tidy data, cached per (index, columns, values, aggfunc) until a file changes."""
+        layout = (index, columns, values, aggfunc)
+        key = tuple(self.file_key(p) for p in self.paths)
+        self._prune(key)
+        return self._stage("pivot", layout, key, lambda: self.tidy().pivot_table(index=index, columns=columns,
+                                                                                 values=values, aggfunc=aggfunc))
+
+    def clear(self):
+        self._cache.clear()
+
+
+def transform_data(df, id_column=ID_COLUMN):
+    """One-shot version of melt -> split for a wide DataFrame already in memory."""
+    headers = parse_headers([c for c in df.columns if c != id_column])
+    return split(melt((df, headers), id_column), headers, id_column)
@@ -1,31 +1,19 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+import threading  # Importing matplotlib in the background
+from crypto_loader import load_crypto_data  # Typed columns + Parquet cache
+
+
+# Start importing matplotlib (once per server process) while the tables below are drawn;
+# the charts further down import it again, which is instant once this has finished.
+@st.cache_resource(show_spinner=False)
+def prewarm_matplotlib():
+    thread = threading.Thread(target=lambda: __import__("matplotlib.pyplot"), name="prewarm-matplotlib", daemon=True)
+    thread.start()
+    return thread
 
-# Load the cryptocurrency data
-csv_path = "data/CryptocurrencyData.csv"
-df = pd.read_csv(csv_path)
-
-# Clean column names (strip spaces)
-df.columns = df.columns.str.strip()
-
-# Convert numerical columns to float (removing "$" and ",")
-def clean_currency(value):
-    if isinstance(value, str):
-        # Remove the "$" and "," symbols, and check for invalid values like ' - '
-        value = value.replace("$", "").replace(",", "")
-        # If the value is empty or invalid, return NaN
-        if value == '' or value == ' - ':
-            return float('nan')
-    # Attempt to convert the value to a float, returning NaN if not possible
-    try:
-        return float(value)
-    except ValueError:
-        return float('nan')
-
-numeric_cols = ["Price", "24h Volume", "Market Cap"]
-for col in numeric_cols:
-    df[col] = df[col].apply(clean_currency)
+
+prewarm_matplotlib()
 
 # Streamlit app title
 st.title("📊 Cryptocurrency Dashboard")
@@ -33,6 +21,12 @@ st.title("📊 Cryptocurrency Dashboard")
 # App description
 st.write("This app allows users to explore and filter cryptocurrency data.")
 
+# Load the cryptocurrency data
+csv_path = "data/CryptocurrencyData.csv"
+# Headers are stripped and "$", ",", "%" and "21 Million"-style values are parsed
+# into numbers; later starts read the cleaned Parquet copy instead of re-parsing.
+df = load_crypto_data(csv_path)
+
 # Display the dataset
 st.subheader("🔍 Sample Data")
 st.write(df.head())
@@ -56,6 +50,7 @@ st.subheader("📜 Filtered Data")
 st.write(df_filtered)
 
 # --- Visualization Section ---
+import matplotlib.pyplot as plt  # Usually already imported by the prewarm thread
 
 # 1️⃣ **Bar Chart - Top 10 Cryptos by Market Cap**
 st.subheader("🏆 Top 10 Cryptocurrencies by Market Cap")
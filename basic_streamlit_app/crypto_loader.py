@@ -0,0 +1,141 @@
+# ------------------------
+# CRYPTOCURRENCY DATA LOADER
+# ------------------------
+
+# Reads data/CryptocurrencyData.csv into typed columns:
+#   " Price " -> Price (float64)       "$22,801,222,945.00 " -> 22801222945.0
+#   "0.40%"   -> 1h (float64, percent) "21 Million"          -> 21000000.0
+#   " - " / " $-   " -> NaN            "∞"                   -> inf
+# Every column is parsed with vectorized string operations (no row-by-row
+# apply), and the cleaned table is saved as Parquet next to the CSV so the
+# next app start just reads the binary file.
+#
+# Usage:
+#   from crypto_loader import load_crypto_data
+#   df = load_crypto_data("data/CryptocurrencyData.csv")
+
+import hashlib  # Detecting real content changes in the CSV
+import json  # Cache manifest
+import os  # File paths and modification times
+import numpy as np
+import pandas as pd
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "CryptocurrencyData.csv")
+CACHE_VERSION = 1  # Bump when the parsing rules change
+
+CURRENCY_COLUMNS = ["Price", "24h Volume", "Market Cap"]
+PERCENT_COLUMNS = ["1h", "24h", "7d", "30d"]  # Kept in percent (0.40% -> 0.4)
+SUPPLY_COLUMNS = ["Circulating Supply", "Total Supply"]
+INTEGER_COLUMNS = ["Rank", "Circulating Supply"]
+
+# Word suffixes used in the Total Supply column ("21 Million", "88.3 Billion")
+MULTIPLIERS = {
+    "": 1.0, "thousand": 1e3, "k": 1e3, "million": 1e6, "m": 1e6, "billion": 1e9, "b": 1e9,
+    "trillion": 1e12, "t": 1e12, "quadrillion": 1e15, "q": 1e15,
+}
+NUMBER_PATTERN = r"^([-+]?(?:\d+\.?\d*|\.\d+))\s*([A-Za-z]*)$"
+
+
+# ------------------------
+# VECTORIZED PARSING
+# ------------------------
+
+def normalize_headers(columns):
+    """Strip the padding from headers like " Price " and " Market Cap "."""
+    return pd.Index(columns).str.strip().str.replace(r"\s+", " ", regex=True)
+
+
+def parse_numbers(series):
+    """Convert strings like "$1,234.50 ", "-1.70%", "21 Million" or "∞" to float64.
+
+    Placeholders such as " - " or " $-   " and anything unrecognised become NaN.
+    """
+    text = series.astype("string").str.strip()
+    infinite = text.isin(["∞", "inf", "Infinity"])
+    cleaned = text.str.replace(r"[$,%\s]", "", regex=True)  # Currency signs, thousands separators, percent, spaces
+    cleaned = cleaned.str.replace(r"(?<=\d)(?=[A-Za-z])", " ", regex=True)  # "21Million" -> "21 Million"
+    parts = cleaned.str.extract(NUMBER_PATTERN)
+    number = pd.to_numeric(parts[0], errors="coerce").astype("float64")
+    scale = parts[1].str.lower().map(MULTIPLIERS).astype("float64")  # Unknown suffix -> NaN
+    values = (number * scale).to_numpy(dtype="float64", na_value=np.nan, copy=True)
+    values[infinite.to_numpy(dtype=bool, na_value=False)] = np.inf
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def to_integer(series):
+    """int64 when every value is a whole number, nullable Int64 when some are missing."""
+    finite = series[np.isfinite(series)]
+    if len(finite) != series.notna().sum() or not (finite == np.floor(finite)).all():
+        return series  # Fractions or infinities: keep float64
+    return series.astype("int64") if series.notna().all() else series.astype("Int64")
+
+
+def parse_crypto_frame(raw):
+    """Clean a raw (all-string) crypto table: normalized headers and typed numeric columns."""
+    df = raw.copy()
+    df.columns = normalize_headers(df.columns)
+    for column in ["Rank"] + CURRENCY_COLUMNS + PERCENT_COLUMNS + SUPPLY_COLUMNS:
+        if column in df.columns:
+            df[column] = parse_numbers(df[column])
+    for column in INTEGER_COLUMNS:
+        if column in df.columns:
+            df[column] = to_integer(df[column])
+    return df
+
+
+# ------------------------
+# COLUMNAR CACHE
+# ------------------------
+
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_paths(csv_path):
+    folder = os.path.join(os.path.dirname(os.path.abspath(csv_path)), ".cache")
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(folder, f"{stem}.parquet"), os.path.join(folder, f"{stem}.json")
+
+
+def load_crypto_data(csv_path=CSV_PATH, use_cache=True):
+    """Typed crypto DataFrame, from the Parquet cache when it matches the CSV.
+
+    The cache is valid when the CSV's size and modification time are
+    unchanged, or, if they changed, when its SHA-1 still matches (e.g. the
+    file was only touched or copied). Otherwise the CSV is parsed again and
+    the cache rewritten. Without pyarrow the CSV is simply parsed each time.
+    """
+    stat = os.stat(csv_path)
+    state = {"version": CACHE_VERSION, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    parquet_path, manifest_path = cache_paths(csv_path)
+
+    if use_cache and os.path.exists(parquet_path) and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        unchanged = {k: manifest.get(k) for k in state} == state
+        if not unchanged and manifest.get("version") == CACHE_VERSION and manifest.get("sha1") == _file_hash(csv_path):
+            unchanged = True
+            manifest.update(state)  # Same content, new timestamp: remember it so the hash is skipped next time
+            with open(manifest_path, "w") as f:
+                json.dump(manifest, f)
+        if unchanged:
+            try:
+                return pd.read_parquet(parquet_path)
+            except ImportError:
+                pass
+
+    df = parse_crypto_frame(pd.read_csv(csv_path, dtype=str, keep_default_na=False, na_values=[""]))
+    if use_cache:
+        try:
+            os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+            df.to_parquet(parquet_path + ".tmp", index=False)
+            os.replace(parquet_path + ".tmp", parquet_path)
+            with open(manifest_path, "w") as f:
+                json.dump({**state, "sha1": _file_hash(csv_path)}, f)
+        except ImportError:
+            pass  # pyarrow is not installed: skip the cache
+    return df
@@ -1,5 +1,6 @@
 # Import the Streamlit library
 import streamlit as st
+import os  # File modification time for the data cache
 
 #ls lists everything in the directory to view in current directory python folder
 #cd navagiates in and out of folders 
@@ -40,35 +41,50 @@ st.write(f"You picked: {color}")
 
 # Import pandas for handling tabular data
 import pandas as pd
+# Typed loader (with a Parquet cache) and the sorted-index screener
+from crypto_loader import CSV_PATH, load_crypto_data
+from screener import SCREEN_COLUMNS, Screener
 
 # Display a section title
-st.subheader("Now, let's look at some data!")
+st.subheader("Now, let's screen the crypto market!")
 
-# Create a simple Pandas DataFrame with sample data
-df = pd.DataFrame({
-    'Name': ['Alice', 'Bob', 'Charlie', 'David'],  # Column of names
-    'Age': [25, 30, 35, 40],  # Column of ages
-    'City': ['New York', 'Los Angeles', 'Chicago', 'Houston']  # Column of cities
-})
 
-# Display a descriptive message
-st.write("Here's a simple table:")
+# Load the coins and build the sorted indexes once per server process.
+# Passing the file's modification time rebuilds them when the CSV changes.
+@st.cache_resource(show_spinner="Indexing coins...")
+def get_screener(modified):
+    df = load_crypto_data(CSV_PATH)
+    return df, Screener(df, SCREEN_COLUMNS)
 
-# Display the dataframe in an interactive table.
-# Users can scroll and sort the data within the table.
-st.dataframe(df)
+
+df, screener = get_screener(os.path.getmtime(CSV_PATH))
+st.write(f"{len(df):,} coins loaded. Narrow them down with the filters below:")
 
 # ------------------------
 # INTERACTIVE DATA FILTERING
 # ------------------------
 
-# Create a dropdown (selectbox) for filtering the DataFrame by city.
-# The user selects a city from the unique values in the "City" column.
-city = st.selectbox("Select a city", df["City"].unique())
-
-# Create a filtered DataFrame that only includes rows matching the selected city.
-filtered_df = df[df["City"] == city]
-
-# Display the filtered results with an appropriate heading.
-st.write(f"People in {city}:")
-st.dataframe(filtered_df)  # Show the filtered table
\ No newline at end of file
+# One min/max pair per column. Defaults span the whole column, which means "no filter".
+# Each change is answered with binary searches on the precomputed sort orders.
+ranges = {}
+filter_columns = st.columns(4)
+for i, column in enumerate(SCREEN_COLUMNS):
+    low, high = screener.limits(column)
+    with filter_columns[i % 4]:
+        label = f"{column} (%)" if column in ["1h", "24h", "7d", "30d"] else column
+        ranges[column] = (st.number_input(f"Min {label}", value=low, format="%g"),
+                          st.number_input(f"Max {label}", value=high, format="%g"))
+
+# Top-N sorting: choose the column, the direction and how many coins to show.
+sort_col1, sort_col2, sort_col3 = st.columns(3)
+sort_by = sort_col1.selectbox("Sort by", SCREEN_COLUMNS, index=SCREEN_COLUMNS.index("Market Cap"))
+descending = sort_col2.radio("Order", ["Highest first", "Lowest first"], horizontal=True) == "Highest first"
+top_n = sort_col3.slider("Show top", min_value=10, max_value=500, value=50, step=10)
+
+# Filter (index intersection), then take the top rows in sorted order.
+rows = screener.filter(ranges)
+top_rows = screener.top(rows, sort_by, top_n, descending)
+
+# Display the screened results with an appropriate heading.
+st.write(f"{len(rows):,} coins match; showing the top {len(top_rows):,} by {sort_by}:")
+st.dataframe(df.iloc[top_rows], hide_index=True)  # Show the screened table
@@ -0,0 +1,109 @@
+# ------------------------
+# CRYPTO MARKET SCREENER
+# ------------------------
+
+# Range filters and top-N sorting over a table of coins, answered from
+# indexes built once:
+#   order[col] -> row positions sorted by the column (missing values dropped)
+#   values[col] -> the column's values in that order
+#   rank[col] -> where each row sits in that order (-1 if missing)
+# A range filter is two binary searches on values[col]. Several filters are
+# combined by starting from the narrowest one and checking only those
+# candidate rows against the others via rank[col], so no widget change has
+# to scan the whole table.
+#
+# Usage:
+#   screener = Screener(df, ["Price", "24h", "Market Cap"])
+#   rows = screener.filter({"Price": (1, 100), "24h": (0, None)})
+#   df.iloc[screener.top(rows, "Market Cap", 20)]
+
+import numpy as np
+
+SCREEN_COLUMNS = ["Price", "1h", "24h", "7d", "30d", "24h Volume", "Market Cap"]
+
+
+class SortedIndex:
+    """Sort order, sorted values and per-row rank of one numeric column."""
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype="float64")
+        present = np.flatnonzero(~np.isnan(values))
+        self.order = present[np.argsort(values[present], kind="stable")]
+        self.values = values[self.order]
+        self.rank = np.full(len(values), -1, dtype=np.int64)
+        self.rank[self.order] = np.arange(len(self.order))
+        finite = self.values[np.isfinite(self.values)]
+        self.limits = (float(finite[0]), float(finite[-1])) if len(finite) else (0.0, 0.0)
+
+    def bounds(self, low=None, high=None):
+        """[start, stop) positions in the sorted order for low <= value <= high (None = open)."""
+        start = 0 if low is None else int(np.searchsorted(self.values, low, side="left"))
+        stop = len(self.values) if high is None else int(np.searchsorted(self.values, high, side="right"))
+        return start, max(start, stop)
+
+
+class Screener:
+    """Precomputed sorted indexes over the numeric columns of `df`."""
+
+    def __init__(self, df, columns=SCREEN_COLUMNS):
+        self.n_rows = len(df)
+        self.columns = [c for c in columns if c in df.columns]
+        self.indexes = {c: SortedIndex(df[c].to_numpy(dtype="float64", na_value=np.nan)) for c in self.columns}
+
+    def limits(self, column):
+        """Smallest and largest finite value of a column (for default widget ranges)."""
+        return self.indexes[column].limits
+
+    def filter(self, ranges):
+        """Row positions (ascending) matching every {column: (low, high)} range.
+
+        A bound of None is open, and a range spanning the whole column is
+        ignored, so untouched widgets do not exclude rows with missing values.
+        """
+        active = []
+        for column, (low, high) in ranges.items():
+            smallest, largest = self.limits(column)
+            if (low is None or low <= smallest) and (high is None or high >= largest):
+                continue  # Widget left at the column's extremes
+            start, stop = self.indexes[column].bounds(low, high)
+            active.append((stop - start, column, start, stop))
+        if not active:
+            return np.arange(self.n_rows)
+
+        active.sort()
+        _, column, start, stop = active[0]
+        rows = self.indexes[column].order[start:stop]  # Narrowest filter gives the candidates
+        for _, column, start, stop in active[1:]:
+            rank = self.indexes[column].rank[rows]
+            rows = rows[(rank >= start) & (rank < stop)]  # Rank inside the range <=> value inside it
+        return np.sort(rows)
+
+    def top(self, rows, column, n=None, descending=True):
+        """The `n` rows of `rows` with the largest (or smallest) `column`, in that order.
+
+        Rows missing `column` come last.
+        """
+        index = self.indexes[column]
+        if len(rows) == self.n_rows:  # Unfiltered: read straight off the sort order
+            ordered = index.order[::-1] if descending else index.order
+            missing = np.flatnonzero(index.rank < 0)
+            return np.concatenate([ordered, missing])[:n]
+
+        ranks = index.rank[rows]
+        keys = np.where(ranks < 0, -1, ranks) if descending else np.where(ranks < 0, len(index.order), ranks)
+        keys = -keys if descending else keys
+        n = len(rows) if n is None else min(n, len(rows))
+        if n < len(rows):
+            picked = np.argpartition(keys, n - 1)[:n]  # Top n in O(len(rows))
+            return rows[picked[np.argsort(keys[picked], kind="stable")]]
+        return rows[np.argsort(keys, kind="stable")]
+
+    def screen(self, df, ranges, sort_by=None, n=None, descending=True):
+        """Convenience: filter, then sort/limit, returning the matching slice of `df`."""
+        rows = self.filter(ranges)
+        if sort_by:
+            rows = self.top(rows, sort_by, n, descending)
+        elif n is not None:
+            rows = rows[:n]
+        return df.iloc[rows]
+
@@ -0,0 +1,105 @@
+# Passion Hood
+# CSE 10102: Elements of Computing II, Spring 2025
+# Benchmarks: Deterministic synthetic data for the portfolio, NER and data-quality apps
+#
+# Every generator takes a `seed`, so the same arguments always produce the
+# same data and timings can be compared across commits.
+
+import os  # Locating the sample datasets in the repo
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STOCKS_TSV = os.path.join(REPO_ROOT, "EntityRuler in spaCy", "stocks-1.tsv")
+TITANIC_CSV = os.path.join(REPO_ROOT, "handling_missing_data", "titanic.csv")
+
+
+# --- Prices and Portfolios ---
+def tickers(n):
+    """`n` ticker symbols: real ones from stocks-1.tsv first, then synthetic ones."""
+    real = pd.read_csv(STOCKS_TSV, sep="\t", usecols=["Symbol"])["Symbol"].dropna().unique().tolist()
+    return (real + [f"SYN{i:05d}" for i in range(max(0, n - len(real)))])[:n]
+
+
+def price_matrix(n_days, n_tickers, seed=0, start="2020-01-01", missing=0.01):
+    """(business days x tickers) DataFrame of geometric-random-walk closes.
+
+    About `missing` of the cells are NaN and each ticker's first few days
+    may be missing, like late listings in real downloads.
+    """
+    rng = np.random.default_rng(seed)
+    drift = rng.normal(0.0003, 0.0002, n_tickers)
+    vol = rng.uniform(0.01, 0.04, n_tickers)
+    log_returns = rng.normal(drift, vol, size=(n_days, n_tickers))
+    prices = 50 * np.exp(np.cumsum(log_returns, axis=0))
+    prices[rng.random((n_days, n_tickers)) < missing] = np.nan
+    late = rng.integers(0, max(1, n_days // 20), n_tickers)
+    prices[np.arange(n_days)[:, None] < late[None, :]] = np.nan
+    index = pd.bdate_range(start, periods=n_days, name="Date")
+    return pd.DataFrame(prices, index=index, columns=tickers(n_tickers))
+
+
+def benchmark_series(index, seed=1):
+    """S&P 500 stand-in: one random-walk close series on `index`."""
+    rng = np.random.default_rng(seed)
+    return pd.Series(4000 * np.exp(np.cumsum(rng.normal(0.0003, 0.011, len(index)))), index=index, name="^GSPC")
+
+
+def portfolio_csv(path, n_tickers, seed=0):
+    """Write a Ticker/Shares portfolio CSV like the analyzer's upload and return its path."""
+    rng = np.random.default_rng(seed)
+    pd.DataFrame({"Ticker": tickers(n_tickers), "Shares": rng.integers(1, 500, n_tickers)}).to_csv(path, index=False)
+    return path
+
+
+def offline_fetcher(seed=0):
+    """Drop-in for price_cache.yfinance_fetcher (and yf.download) that never touches the network.
+
+    Each ticker's prices depend only on the seed and the ticker, so the
+    same request always returns the same closes.
+    """
+    def fetch(symbols, start, end):
+        index = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1), name="Date")
+        columns = {}
+        for symbol in symbols:
+            rng = np.random.default_rng([seed, *symbol.encode("utf-8")])
+            columns[symbol] = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, len(index))))
+        return pd.DataFrame(columns, index=index)
+
+    return fetch
+
+
+# --- Text ---
+def ner_corpus(n_paragraphs, seed=0):
+    """News-style paragraphs mentioning companies and symbols from stocks-1.tsv."""
+    rng = np.random.default_rng(seed)
+    listings = pd.read_csv(STOCKS_TSV, sep="\t", usecols=["Symbol", "CompanyName"]).dropna()
+    names, symbols = listings["CompanyName"].to_numpy(), listings["Symbol"].to_numpy()
+    templates = [
+        "{0} ({1}) saw its stock rise by {2:.1f}%, fueled by optimistic forecasts.",
+        "In contrast, {0} ({1}) faced a decline of {2:.1f}% after reporting higher costs.",
+        "Analysts at {0} raised their price target on {1} following strong quarterly earnings.",
+        "Meanwhile, shares of {0} were flat as investors waited for guidance, with {1} down {2:.1f}%.",
+    ]
+    paragraphs = []
+    for _ in range(n_paragraphs):
+        picks = rng.integers(0, len(names), 4)
+        sentences = [templates[int(rng.integers(len(templates)))].format(names[i], symbols[i], rng.uniform(0.1, 9.9))
+                     for i in picks]
+        paragraphs.append(" ".join(sentences))
+    return paragraphs
+
+
+# --- Tables ---
+def titanic_like(n_rows, seed=0):
+    """Titanic-shaped DataFrame with `n_rows` rows, resampled from titanic.csv.
+
+    Numeric columns get a little noise so values are not just repeats, and
+    the original missing-value pattern (age, fare, cabin, ...) is preserved.
+    """
+    rng = np.random.default_rng(seed)
+    base = pd.read_csv(TITANIC_CSV)
+    df = base.iloc[rng.integers(0, len(base), n_rows)].reset_index(drop=True)
+    df["age"] = (df["age"] + rng.normal(0, 1, n_rows)).clip(lower=0.1)
+    df["fare"] = (df["fare"] * rng.uniform(0.9, 1.1, n_rows)).round(4)
+    return df
@@ -0,0 +1,299 @@
+# Passion Hood
+# CSE 10102: Elements of Computing II, Spring 2025
+# Benchmarks: Timing the analyzer, NER and data-quality hot paths on synthetic data
+#
+# Usage:
+#   python benchmarks/run_benchmarks.py                   # Full run, saved to benchmarks/results/<commit>.json
+#   python benchmarks/run_benchmarks.py --quick -k ner    # Smaller inputs, only benchmarks matching "ner"
+#   python benchmarks/run_benchmarks.py --compare benchmarks/results/OLD.json benchmarks/results/NEW.json
+#
+# Everything runs offline: prices come from generators.offline_fetcher in
+# place of yf.download, and when the en_core_web_sm model is not installed
+# the NER benchmarks fall back to a blank English pipeline (the model used
+# is recorded in the results, so only like-for-like runs should be compared).
+
+import argparse  # Command-line options
+import json  # Result files
+import os  # Paths
+import platform  # Environment details stored with the results
+import statistics  # Median of the repeats
+import subprocess  # Current git commit
+import sys  # Import paths for the app folders
+import tempfile  # Scratch folders for caches and CSVs
+import time  # High-resolution timer
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import generators as gen
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+for folder in ["StreamlitAppFinal", "NERStreamlitApp", "handling_missing_data"]:
+    sys.path.insert(0, os.path.join(gen.REPO_ROOT, folder))
+
+# Input sizes for the full and --quick runs
+SIZES = {
+    "full": {"days": 756, "tickers": [10, 500, 5000], "paragraphs": 400, "patterns": 200, "rows": 1_000_000},
+    "quick": {"days": 252, "tickers": [10, 500], "paragraphs": 40, "patterns": 50, "rows": 50_000},
+}
+
+
+# --- Registry ---
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """Register `setup(sizes)`, which prepares inputs and yields (case name, timed callable) pairs.
+
+    Only the callables are timed, so data generation and model loading stay
+    out of the measurements. Each callable is timed before the next one is
+    produced, so it may use the setup's loop variables and temporary files.
+    """
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+def time_call(fn, repeat, warmup=1):
+    """Run `fn` `warmup` times untimed, then `repeat` times; returns timing stats in seconds."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": statistics.median(times), "mean": statistics.fmean(times), "repeat": repeat}
+
+
+# --- Portfolio Analyzer ---
+@benchmark("analyzer")
+def analyzer_benchmarks(sizes):
+    import portfolio_engine as engine
+    import backtest
+    import correlation
+    from rolling_metrics import rolling_history
+    from price_cache import PriceCache
+    from batch_scoring import load_portfolio_csv
+
+    for n in sizes["tickers"]:
+        prices = gen.price_matrix(sizes["days"], n, seed=n)
+        bench = gen.benchmark_series(prices.index).to_numpy(dtype=float)
+        shares = np.random.default_rng(n).integers(1, 500, n)
+        _, weights = engine.allocation_weights(shares, engine.latest_prices(prices.to_numpy()))
+        price_matrix = prices.to_numpy()
+
+        # Same call the app makes after downloading prices
+        yield f"portfolio_metrics[{n}]", lambda: engine.portfolio_metrics(price_matrix, weights, bench)
+
+        metrics = engine.portfolio_metrics(price_matrix, weights, bench)
+        yield f"rolling_history[{n}]", lambda: rolling_history(metrics["weighted_returns"], metrics["benchmark_returns"],
+                                                                index=prices.index)
+
+        # Every default rebalancing rule at every default cost level (36 policies)
+        yield f"backtest_sweep[{n}]", lambda: backtest.run_backtest(price_matrix, weights, prices.index, benchmark=bench)
+
+        # Correlation section: pandas' full recompute vs. one new day folded into the running sums
+        if n <= 1000:  # The tracker keeps four n x n matrices
+            returns = metrics["returns"]
+            yield f"pandas_corr[{n}]", lambda: pd.DataFrame(returns).corr()
+            tracker = correlation.RunningCovariance(n)
+            tracker.extend(returns[:-1])
+            corr = tracker.correlation()
+            # Each repeat folds in the same day again; the cost does not depend on the history length
+            yield f"covariance_append[{n}]", lambda: tracker.append(returns[-1])
+            yield f"cluster_order[{n}]", lambda: correlation.cluster_order(corr)
+            yield f"top_pairs[{n}]", lambda: correlation.top_pairs(corr, prices.columns, 10, tracker.overlap())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        n = sizes["tickers"][-1]
+        csv_path = gen.portfolio_csv(os.path.join(tmp, "portfolio.csv"), n)
+        yield f"load_portfolio_csv[{n}]", lambda: load_portfolio_csv(csv_path)
+
+        symbols = gen.tickers(min(n, 500))
+        start, end = "2022-01-01", "2025-01-01"
+        fetcher = gen.offline_fetcher()
+
+        def cold():
+            with tempfile.TemporaryDirectory() as cache_dir:
+                PriceCache(cache_dir, fetcher=fetcher).get_prices(symbols, start, end)
+
+        warm_cache = PriceCache(os.path.join(tmp, "warm"), fetcher=fetcher)
+        warm_cache.get_prices(symbols, start, end)
+        yield f"price_cache_cold[{len(symbols)}]", cold
+        yield f"price_cache_warm[{len(symbols)}]", lambda: warm_cache.get_prices(symbols, start, end)
+
+
+# --- NER ---
+def load_ner_model():
+    """en_core_web_sm with the app's exclusions, or a blank English pipeline with an untrained NER offline."""
+    import spacy
+    from nlp_pipeline import load_entity_pipeline, DEFAULT_MODEL
+    try:
+        return load_entity_pipeline(), DEFAULT_MODEL
+    except OSError:
+        nlp = spacy.blank("en")
+        nlp.add_pipe("ner")
+        nlp.initialize()
+        return nlp, "blank:en"
+
+
+@benchmark("ner")
+def ner_benchmarks(sizes):
+    from nlp_pipeline import IncrementalRuler, annotate, annotate_stream
+    from gazetteer import StockGazetteer
+
+    nlp, model = load_ner_model()
+    RUN_INFO["ner_model"] = model
+    paragraphs = gen.ner_corpus(sizes["paragraphs"])
+    text = "\n\n".join(paragraphs)
+    listings = pd.read_csv(gen.STOCKS_TSV, sep="\t").dropna()
+    patterns = [{"label": "COMPANY", "pattern": name} for name in listings["CompanyName"].head(sizes["patterns"])]
+    ruler = IncrementalRuler(nlp).sync(patterns)
+
+    # The NER app's path: nlp(text) with the EntityRuler before the built-in NER
+    yield "annotate", lambda: annotate(nlp, text)
+    yield f"annotate+ruler[{len(patterns)}]", lambda: annotate(nlp, text, ruler=ruler)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gazetteer = StockGazetteer(nlp, index_path=os.path.join(tmp, "stocks.gazetteer.bin"))
+        yield "annotate+gazetteer", lambda: annotate(nlp, text, ruler=ruler, gazetteer=gazetteer)
+        yield "gazetteer_load", lambda: StockGazetteer(nlp, index_path=os.path.join(tmp, "stocks.gazetteer.bin"))
+    yield f"annotate_stream[{len(paragraphs)}]", lambda: sum(1 for _ in annotate_stream(nlp, paragraphs, ruler=ruler))
+
+
+# --- Data Quality ---
+@benchmark("data_quality")
+def data_quality_benchmarks(sizes):
+    from data_profiler import profile_csv
+    from imputation import impute
+    from missing_plots import missingness_bins
+
+    n = sizes["rows"]
+    df = gen.titanic_like(n)
+
+    # The pandas calls the page originally made on every rerun
+    yield f"describe[{n}]", lambda: df.describe()
+    yield f"isnull_sum[{n}]", lambda: df.isnull().sum()
+    yield f"missingness_bins[{n}]", lambda: missingness_bins(df)
+    yield f"impute_median[{n}]", lambda: impute(df, "median")
+    yield f"impute_median_grouped[{n}]", lambda: impute(df, "median", ["age", "fare"], group_by=["pclass", "sex"])
+    yield f"impute_mode[{n}]", lambda: impute(df, "mode", ["embarked", "home.dest"])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "titanic_like.csv")
+        df.to_csv(csv_path, index=False)
+        yield f"profile_csv[{n}]", lambda: profile_csv(csv_path)
+
+
+# --- Running and Saving ---
+RUN_INFO = {}
+
+
+def git_commit():
+    """(short commit hash, whether the working tree has uncommitted changes), or ("nogit", False)."""
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=gen.REPO_ROOT, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=gen.REPO_ROOT,
+                               capture_output=True, text=True).stdout.strip() != ""
+        return sha, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "nogit", False
+
+
+def environment():
+    packages = {}
+    for name in ["numpy", "pandas", "spacy", "streamlit"]:
+        try:
+            packages[name] = __import__(name).__version__
+        except ImportError:
+            packages[name] = None
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count(), "packages": packages}
+
+
+def run(scale="full", pattern=None, repeat=5):
+    """Time every registered benchmark whose "group.case" name contains `pattern`.
+
+    When `pattern` names a group (e.g. "ner"), the other groups' setups are
+    skipped entirely, so their data is never generated.
+    """
+    sizes = SIZES[scale]
+    selected = [(group, setup) for group, setup in BENCHMARKS if pattern and pattern in group] or BENCHMARKS
+    results = {}
+    for group, setup in selected:
+        for case, fn in setup(sizes):
+            name = f"{group}.{case}"
+            if pattern and pattern not in name:
+                continue
+            results[name] = time_call(fn, repeat)
+            print(f"{name:<48} median {results[name]['median'] * 1000:10.2f} ms   min {results[name]['min'] * 1000:10.2f} ms")
+    sha, dirty = git_commit()
+    return {"commit": sha, "dirty": dirty, "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "scale": scale, "environment": environment(), **RUN_INFO, "results": results}
+
+
+def compare(old_path, new_path, threshold=0.10):
+    """Print new/old median ratios; returns the names slower by more than `threshold`."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    if old.get("scale") != new.get("scale") or old.get("ner_model") != new.get("ner_model"):
+        print("Warning: runs used different input sizes or NER models; ratios are not like-for-like.")
+
+    print(f"{'benchmark':<48} {old['commit']:>10} {new['commit']:>10}   ratio")
+    regressions = []
+    for name in sorted(set(old["results"]) | set(new["results"])):
+        if name not in old["results"] or name not in new["results"]:
+            print(f"{name:<48} {'(only in one run)':>21}")
+            continue
+        before, after = old["results"][name]["median"], new["results"][name]["median"]
+        ratio = after / before if before else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  SLOWER"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:<48} {before * 1000:8.2f}ms {after * 1000:8.2f}ms   {ratio:5.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the portfolio, NER and data-quality apps.")
+    parser.add_argument("--quick", action="store_true", help="Smaller inputs for a fast check")
+    parser.add_argument("-k", "--filter", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark (default: 5)")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<commit>[-quick].json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files instead of running")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Slowdown reported as a regression (default: 0.10)")
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = compare(*args.compare, threshold=args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    report = run("quick" if args.quick else "full", args.filter, args.repeat)
+    output = args.output
+    if not output:
+        suffix = ("-dirty" if report["dirty"] else "") + ("-quick" if args.quick else "")
+        output = os.path.join(RESULTS_DIR, f"{report['commit']}{suffix}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    if args.filter and os.path.exists(output):
+        with open(output) as f:
+            previous = json.load(f)
+        if previous.get("commit") == report["commit"] and previous.get("scale") == report["scale"]:
+            report["results"] = {**previous["results"], **report["results"]}  # Partial run: keep the other results
+            report.setdefault("ner_model", previous.get("ner_model"))
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {len(report['results'])} results to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import hashlib                 # Dataset fingerprints for the memo keys
+from collections import OrderedDict  # LRU order of memoized results
+import pandas as pd            # Vectorized fills and group-wise statistics
+
+# ================================================================================
+# Imputation Pipeline
+# - **Vectorized:** A strategy is applied to any set of columns in one pass
+#   (one statistics call plus one fillna over those columns).
+# - **Group-wise:** With `group_by`, each missing value is filled from its
+#   group's statistic (e.g. median age by pclass and sex); groups with no
+#   values at all fall back to the column-wide statistic.
+# - **Column-level copies:** The result is a shallow copy of the input with
+#   only the filled columns replaced, so untouched columns are shared. pandas
+#   2.2 has no copy-on-write by default, so results are read-only: writing into
+#   a shared column in place would also change the input (and the memo).
+# - **Memoized:** ImputationCache keeps the most recent results keyed by
+#   (dataset key, strategy, columns, groups) and evicts the least recently used.
+# ================================================================================
+
+STRATEGIES = ["mean", "median", "zero", "mode", "drop_rows", "drop_columns"]
+
+
+def dataset_hash(df):
+    """Content fingerprint of a DataFrame (values, index and column names)."""
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update(repr(list(df.columns)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+# ------------------------------------------------------------------------------
+# Fill Values
+# ------------------------------------------------------------------------------
+def _statistic(frame, strategy):
+    if strategy == "mean":
+        return frame.mean(numeric_only=True)
+    if strategy == "median":
+        return frame.median(numeric_only=True)
+    if strategy == "mode":
+        return frame.mode(dropna=True).iloc[0] if len(frame) else pd.Series(dtype=float)
+    raise ValueError(f"Unknown strategy: {strategy}")
+
+
+def fill_values(df, strategy, columns, group_by=None):
+    """Per-column fill values: a Series (one value per column) or, with `group_by`, a frame aligned to df."""
+    if strategy == "zero":
+        return pd.Series(0, index=columns)
+    overall = _statistic(df[columns], strategy)
+    if not group_by:
+        return overall
+    grouped = df.groupby(group_by, dropna=False, observed=True)[columns]
+    if strategy == "mode":
+        by_group = grouped.transform(lambda s: s.mode().iloc[0] if s.notna().any() else None)
+    else:
+        by_group = grouped.transform(strategy)
+    return by_group.fillna(overall)  # Groups with no values at all use the column-wide statistic
+
+
+# ------------------------------------------------------------------------------
+# Applying a Strategy
+# ------------------------------------------------------------------------------
+def impute(df, strategy, columns=None, group_by=None, max_missing=0.5):
+    """Return a copy of `df` with `strategy` applied to `columns` (default: all with missing values).
+
+    `drop_rows` drops rows missing any of `columns`; `drop_columns` drops
+    those of `columns` with more than `max_missing` of their values
+    missing. Every other strategy fills the columns in one vectorized pass.
+    """
+    if columns is None:
+        columns = list(df.columns[df.isna().any()])
+    columns = list(columns)
+    group_by = [g for g in (group_by or []) if g not in columns]
+
+    if strategy == "drop_rows":
+        return df.dropna(subset=columns) if columns else df.copy(deep=False)
+    if strategy == "drop_columns":
+        return df.drop(columns=[c for c in columns if df[c].isna().mean() > max_missing])
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}")
+
+    result = df.copy(deep=False)  # Shares every column; only the filled ones are replaced below
+    if not columns:
+        return result
+    values = fill_values(df, strategy, columns, group_by)
+    filled = df[columns].fillna(values)
+    for column in columns:
+        result[column] = filled[column]
+    return result
+
+
+# ------------------------------------------------------------------------------
+# Memoized Results
+# ------------------------------------------------------------------------------
+class ImputationCache:
+    """LRU memo of `impute` results keyed by (dataset key, strategy, columns, groups).
+
+    `dataset_key` defaults to `dataset_hash(df)`; callers that already
+    know when their data changes (e.g. a file path plus its modification
+    time) can pass that instead and skip hashing the frame.
+    """
+
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self._results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, df, strategy, columns=None, group_by=None, dataset_key=None, **options):
+        key = (dataset_key or dataset_hash(df), strategy, tuple(columns or ()), tuple(group_by or ()),
+               tuple(sorted(options.items())))
+        if key in self._results:
+            self.hits += 1
+            self._results.move_to_end(key)
+            return self._results[key]
+
+        self.misses += 1
+        result = impute(df, strategy, columns, group_by, **options)
+        self._results[key] = result
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)  # Evict the least recently used result
+        return result
+
+    def clear(self):
+        self._results.clear()
+
+    def __len__(self):
+        return len(self._results)
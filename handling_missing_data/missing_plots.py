@@ -0,0 +1,136 @@
+import numpy as np             # Binning, histograms and the KDE
+import pandas as pd            # Binned missingness tables
+# seaborn and matplotlib are imported inside the plot functions, so computing
+# the plot data does not pay for loading the plotting stack.
+
+# ================================================================================
+# Plot Data for Large Datasets
+# - **Missingness Heatmap:** Rows are grouped into at most `n_bins` bins and
+#   each cell is the fraction missing in that bin, so the image has
+#   n_bins x columns cells instead of rows x columns.
+# - **Histograms:** Drawn from pre-binned counts (np.histogram) rather than
+#   from every point.
+# - **KDE:** Fitted on a bounded random sample and scaled to the counts.
+# - **Streamed:** The `*_chunks` versions build the same plot data from a
+#   CSV read in chunks (e.g. pd.read_csv(..., chunksize=...)), so the full
+#   file never has to be in memory.
+# ================================================================================
+
+HEATMAP_BINS = 200            # Row bins in the missingness heatmap
+HIST_BINS = 50                # Histogram bars
+KDE_SAMPLE = 5_000            # Points used to fit the KDE
+KDE_GRID = 200                # Points the KDE curve is evaluated at
+
+
+# ------------------------------------------------------------------------------
+# Missingness Binned by Row
+# ------------------------------------------------------------------------------
+def missingness_bins(df, n_bins=HEATMAP_BINS):
+    """Fraction of missing values per (row bin, column); the index is each bin's first row."""
+    n_bins = max(1, min(n_bins, len(df)))
+    starts = np.linspace(0, len(df), n_bins + 1).astype(int)[:-1]
+    sizes = np.diff(np.append(starts, len(df)))
+    fractions = {
+        column: np.add.reduceat(df[column].isna().to_numpy(dtype=np.int32), starts) / sizes if len(df) else []
+        for column in df.columns
+    }
+    return pd.DataFrame(fractions, index=pd.Index(starts, name="First Row"))
+
+
+def missingness_bins_chunks(chunks, n_rows, n_bins=HEATMAP_BINS):
+    """`missingness_bins` of a table read in chunks; `n_rows` (e.g. from the profile) fixes the bins up front."""
+    n_bins = max(1, min(n_bins, n_rows))
+    starts = np.linspace(0, n_rows, n_bins + 1).astype(int)[:-1]
+    sizes = np.diff(np.append(starts, n_rows))
+    missing = {}
+    offset = 0
+    for chunk in chunks:
+        bins = np.searchsorted(starts, np.arange(offset, offset + len(chunk)), side="right") - 1
+        for column in chunk.columns:
+            counts = np.bincount(bins, weights=chunk[column].isna().to_numpy(dtype=float), minlength=n_bins)
+            missing[column] = missing.get(column, 0) + counts
+        offset += len(chunk)
+    fractions = {column: counts / sizes if n_rows else [] for column, counts in missing.items()}
+    return pd.DataFrame(fractions, index=pd.Index(starts, name="First Row"))
+
+
+def plot_missingness(bins):
+    """Heatmap of `missingness_bins` output (0 = complete, 1 = all missing)."""
+    import seaborn as sns          # Heatmap of the binned missingness
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots()
+    sns.heatmap(bins, cmap="viridis", vmin=0, vmax=1, cbar=True, cbar_kws={"label": "Fraction missing"},
+                yticklabels=max(1, len(bins) // 10), ax=ax)
+    return fig
+
+
+# ------------------------------------------------------------------------------
+# Histogram and KDE
+# ------------------------------------------------------------------------------
+def histogram_data(values, bins=HIST_BINS, kde_sample=KDE_SAMPLE, seed=0):
+    """Counts, bin edges and a KDE curve (scaled to counts) for one numeric column.
+
+    The KDE is a Gaussian kernel with Scott's bandwidth, fitted on at most
+    `kde_sample` randomly chosen values.
+    """
+    values = pd.Series(values).dropna().to_numpy(dtype=float)
+    if len(values) == 0:
+        return _empty_histogram()
+    counts, edges = np.histogram(values, bins=bins)
+
+    sample = values
+    if len(values) > kde_sample:
+        sample = np.random.default_rng(seed).choice(values, kde_sample, replace=False)
+    return _with_kde(counts, edges, sample)
+
+
+def histogram_data_chunks(chunks, low, high, bins=HIST_BINS, kde_sample=KDE_SAMPLE, seed=0):
+    """`histogram_data` of one column read in chunks (Series), given its min and max (e.g. from the profile).
+
+    Counts are accumulated over fixed edges, and the KDE sample is a
+    uniform sample of at most `kde_sample` values: each value gets a random
+    key and the smallest keys seen so far are kept.
+    """
+    if np.isnan(low) or np.isnan(high):
+        return _empty_histogram()
+    edges = np.histogram_bin_edges([low, high], bins=bins)
+    counts = np.zeros(bins, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    sample, keys = np.empty(0), np.empty(0)
+    for chunk in chunks:
+        values = chunk.dropna().to_numpy(dtype=float)
+        counts += np.histogram(values, bins=edges)[0]
+        sample, keys = np.concatenate([sample, values]), np.concatenate([keys, rng.random(len(values))])
+        if len(sample) > kde_sample:
+            keep = np.argpartition(keys, kde_sample)[:kde_sample]
+            sample, keys = sample[keep], keys[keep]
+    return _with_kde(counts, edges, sample)
+
+
+def _empty_histogram():
+    return {"counts": np.zeros(0), "edges": np.zeros(0), "kde_x": np.zeros(0), "kde_y": np.zeros(0)}
+
+
+def _with_kde(counts, edges, sample):
+    """Histogram dict with a Gaussian KDE (Scott's bandwidth) fitted on `sample`, scaled to the counts."""
+    bandwidth = sample.std(ddof=1) * len(sample) ** (-1 / 5) if len(sample) > 1 else 0.0
+    kde_x = np.linspace(edges[0], edges[-1], KDE_GRID)
+    if bandwidth > 0:
+        z = (kde_x[:, None] - sample[None, :]) / bandwidth
+        density = np.exp(-0.5 * z * z).sum(axis=1) / (len(sample) * bandwidth * np.sqrt(2 * np.pi))
+        kde_y = density * counts.sum() * (edges[1] - edges[0])  # Same scale as the bar heights
+    else:
+        kde_y = np.zeros_like(kde_x)  # Constant column: nothing to smooth
+    return {"counts": counts, "edges": edges, "kde_x": kde_x, "kde_y": kde_y}
+
+
+def plot_histogram(hist, title):
+    """Bars from pre-binned counts with the sampled KDE on top (like sns.histplot(kde=True))."""
+    import matplotlib.pyplot as plt  # Histogram figures
+    fig, ax = plt.subplots()
+    if len(hist["counts"]):
+        ax.stairs(hist["counts"], hist["edges"], fill=True, alpha=0.5, edgecolor="white")
+        ax.plot(hist["kde_x"], hist["kde_y"])
+    ax.set_ylabel("Count")
+    plt.title(title)
+    return fig
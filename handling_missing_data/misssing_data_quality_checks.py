@@ -1,7 +1,16 @@
 import pandas as pd            # Data handling
-import seaborn as sns          # Plotting library for statistical data visualization
-import matplotlib.pyplot as plt  # Plotting library for custom graphs
 import streamlit as st         # Framework for creating interactive web apps
+import os                      # File modification times for cache invalidation
+import importlib               # Background import of the plotting libraries
+import threading               # Prewarm thread
+import sys                     # Finding the shared helpers folder
+from data_profiler import DEFAULT_CHUNKSIZE, profile_csv  # Chunked, mergeable data-quality profiler
+from imputation import ImputationCache  # Vectorized, memoized imputation
+from missing_plots import (missingness_bins_chunks, plot_missingness, histogram_data, histogram_data_chunks,
+                           plot_histogram)  # Binned plot data, streamed from the CSV where possible
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+import instrumentation         # Per-stage timers and the optional performance panel (?perf=1)
 
 # ================================================================================
 # Missing Data & Data Quality Checks
@@ -9,6 +18,9 @@ import streamlit as st         # Framework for creating interactive web apps
 # - **Missing Data Handling:** Options to drop or impute missing data.
 # - **Visualization:** Using heatmaps and histograms to understand data distribution.
 # ================================================================================
+
+perf = instrumentation.session_profiler()  # No-op unless profiling is switched on
+
 st.title("Missing Data & Data Quality Checks")
 st.markdown("""
 - **Data Validation:** Checking data types, missing values, and basic consistency.
@@ -16,36 +28,100 @@ st.markdown("""
 - **Visualization:** Using heatmaps and histograms to understand data distribution.
 """)
 
+# ------------------------------------------------------------------------------
+# Background Prewarm
+# ------------------------------------------------------------------------------
+# matplotlib and seaborn are only imported by the plot functions; start importing
+# them now (once per server process) so they are ready by the time the first figure is drawn.
+@st.cache_resource(show_spinner=False)
+def prewarm_plotting():
+    thread = threading.Thread(target=lambda: [importlib.import_module(m) for m in ("matplotlib.pyplot", "seaborn")],
+                              name="prewarm-plotting", daemon=True)
+    thread.start()
+    return thread
+
+
+prewarm_plotting()
+
 # ------------------------------------------------------------------------------
 # Load the Dataset
 # ------------------------------------------------------------------------------
-# Read the Titanic dataset from a CSV file into a pandas DataFrame.
-df = pd.read_csv("titanic.csv")
+DATA_PATH = "titanic.csv"
+# The summary tables, heatmap and original-data histogram are all built by reading the
+# CSV in chunks, so memory stays bounded however large the file is. The full DataFrame
+# is only loaded when a cleaning method is chosen (dropping and imputing need every row).
+
+
+# Profile the file in chunks; the result is cached until the file changes on disk.
+@st.cache_data(show_spinner="Profiling dataset...")
+def load_profile(path, modified):
+    return profile_csv(path)
+
+
+# Read the Titanic dataset from a CSV file into a pandas DataFrame (only for the cleaning methods);
+# the parsed frame is cached until the file changes on disk, so reruns skip the parse.
+@st.cache_data(show_spinner="Loading dataset...")
+def load_data(path, modified):
+    return pd.read_csv(path)
+
+
+# Plot data is cached per (dataset, column, method), so switching the method radio
+# only recomputes the cleaned side.
+@st.cache_data(show_spinner="Binning missing values...")
+def load_missingness(path, modified, n_rows):
+    return missingness_bins_chunks(pd.read_csv(path, chunksize=DEFAULT_CHUNKSIZE), n_rows)
+
+
+@st.cache_data
+def load_original_plot(path, modified, column, low, high):
+    chunks = pd.read_csv(path, usecols=[column], chunksize=DEFAULT_CHUNKSIZE)  # One column at a time
+    return histogram_data_chunks((chunk[column] for chunk in chunks), low, high)
+
+
+# The cleaned DataFrame itself is not hashed (leading underscore).
+@st.cache_data
+def load_column_plot(path, modified, column, method, _values):
+    return histogram_data(_values), _values.describe()
+
+
+modified = os.path.getmtime(DATA_PATH)
+with perf.stage("profile"):
+    profile = load_profile(DATA_PATH, modified)
+perf.count("rows", profile.rows)
 
 # ------------------------------------------------------------------------------
 # Display Summary Statistics
 # ------------------------------------------------------------------------------
 st.write("**Summary Statistics**")
-# Use .describe() to generate statistical summaries (mean, std, count, etc.) and display them.
-st.dataframe(df.describe())
+# Streamed equivalent of df.describe(): count, mean, std, min, quartiles and max per numeric column.
+with perf.stage("summary_tables"):
+    st.dataframe(profile.describe())
 
 # ------------------------------------------------------------------------------
 # Check for Missing Values
 # ------------------------------------------------------------------------------
 st.write("**Number of Missing Values by Column**")
-# Compute the sum of missing values per column and display the result.
-st.dataframe(df.isnull().sum())
+# Missing values per column, counted chunk by chunk (same as df.isnull().sum()).
+with perf.stage("summary_tables"):
+    st.dataframe(profile.null_counts())
+
+# ------------------------------------------------------------------------------
+# Column Profile
+# ------------------------------------------------------------------------------
+st.write("**Column Profile**")
+# Data type, missing share and approximate distinct count for every column.
+with perf.stage("summary_tables"):
+    st.dataframe(profile.summary())
 
 # ------------------------------------------------------------------------------
 # Visualize Missing Data with a Heatmap
 # ------------------------------------------------------------------------------
 st.write("**Heatmap of Missing Values**")
-# Create a matplotlib figure and axis for the heatmap.
-fig, ax = plt.subplots()
-# Plot a heatmap where missing values are highlighted (using the 'viridis' color map, without a color bar).
-sns.heatmap(df.isnull(), cmap="viridis", cbar=False)
-# Render the heatmap in the Streamlit app.
-st.pyplot(fig)
+# Group rows into bins and plot the fraction missing per bin and column (one cell per bin, not per row).
+with perf.stage("missingness_heatmap"):
+    fig = plot_missingness(load_missingness(DATA_PATH, modified, profile.rows))
+    # Render the heatmap in the Streamlit app.
+    st.pyplot(fig)
 
 # ================================================================================
 # Interactive Missing Data Handling Section
@@ -56,7 +132,13 @@ st.subheader("Handle Missing Data")
 # User Input: Select Column and Handling Method
 # ------------------------------------------------------------------------------
 # Let the user select a numeric column to work with.
-column = st.selectbox("Choose a column to fill", df.select_dtypes(include=['number']).columns)
+numeric_columns = [name for name, stats in profile.columns.items() if stats.is_numeric]
+column = st.selectbox("Choose a column to fill", numeric_columns)
+# Impute several columns at once (the selected column is plotted below).
+fill_columns = st.multiselect("Columns to impute", numeric_columns, default=[column])
+# Optionally fill each value from its group's statistic (e.g. median age by pclass and sex).
+group_columns = [name for name, stats in profile.columns.items() if stats.distinct.count() <= 20]
+group_by = st.multiselect("Impute within groups of (optional)", group_columns)
 # Provide options for how to handle missing data.
 method = st.radio("Choose a method", [
     "Original DF", 
@@ -67,32 +149,49 @@ method = st.radio("Choose a method", [
     "Impute Zero"
 ])
 
+
 # ------------------------------------------------------------------------------
-# Prepare a Copy of the DataFrame for Cleaning
+# Memoized Imputation Results
 # ------------------------------------------------------------------------------
-# Create a copy to preserve the original data.
-df_clean = df.copy()
+# One LRU memo per server process: results are keyed by (dataset, strategy, columns, groups),
+# so switching back to a strategy already tried reuses its result instead of recomputing it.
+@st.cache_resource
+def get_imputation_cache():
+    return ImputationCache(maxsize=16)
+
+
+# Map each method to an imputation strategy and the columns it applies to.
+STRATEGY = {
+    "Drop Rows": ("drop_rows", list(profile.columns), []),                # Rows with any missing value
+    "Drop Columns (>50% Missing)": ("drop_columns", list(profile.columns), []),
+    "Impute Mean": ("mean", fill_columns, group_by),
+    "Impute Median": ("median", fill_columns, group_by),
+    "Impute Zero": ("zero", fill_columns, []),
+}
 
 # ------------------------------------------------------------------------------
 # Apply the Selected Missing Data Handling Method
 # ------------------------------------------------------------------------------
+# The original side comes from the profile and a streamed histogram; the full DataFrame is
+# only loaded (and cached) once a cleaning method is chosen.
+original_stats = profile.columns[column]
+with perf.stage("histogram"):
+    original_hist = load_original_plot(DATA_PATH, modified, column, original_stats.min, original_stats.max)
+original_describe = profile.describe()[column]
+
 if method == "Original DF":
-    pass  # Keep the data unchanged.
-elif method == "Drop Rows":
-    # Remove all rows that contain any missing values.
-    df_clean = df_clean.dropna()
-elif method == "Drop Columns (>50% Missing)":
-    # Drop columns where more than 50% of the values are missing.
-    df_clean = df_clean.drop(columns=df_clean.columns[df_clean.isnull().mean() > 0.5])
-elif method == "Impute Mean":
-    # Replace missing values in the selected column with the column's mean.
-    df_clean[column] = df_clean[column].fillna(df[column].mean())
-elif method == "Impute Median":
-    # Replace missing values in the selected column with the column's median.
-    df_clean[column] = df_clean[column].fillna(df[column].median())
-elif method == "Impute Zero":
-    # Replace missing values in the selected column with zero.
-    df_clean[column] = df_clean[column].fillna(0)
+    clean_hist, clean_describe = original_hist, original_describe  # Keep the data unchanged (nothing to load).
+else:
+    with perf.stage("read_csv"):
+        df = load_data(DATA_PATH, modified)
+    # Only the imputed columns are new; every other column is shared with the original DataFrame,
+    # so the page only reads df_clean (pandas 2.2 has no copy-on-write by default).
+    strategy, columns, groups = STRATEGY[method]
+    with perf.stage("imputation"):
+        df_clean = get_imputation_cache().get(df, strategy, columns, groups, dataset_key=f"{DATA_PATH}:{modified}")
+    clean_key = (strategy, tuple(columns), tuple(groups))
+    with perf.stage("histogram"):
+        clean_hist, clean_describe = load_column_plot(DATA_PATH, modified, column, clean_key, df_clean[column])
 
 # ------------------------------------------------------------------------------
 # Side-by-Side Visualization: Original vs. Cleaned Data
@@ -103,23 +202,24 @@ col1, col2 = st.columns(2)
 # --- Original Data Visualization ---
 with col1:
     st.subheader("Original Data Distribution")
-    # Plot a histogram (with a KDE) for the selected column from the original DataFrame.
-    fig, ax = plt.subplots()
-    sns.histplot(df[column].dropna(), kde=True)
-    plt.title(f"Original Distribution of {column}")
-    st.pyplot(fig)
+    # Plot a histogram (with a KDE fitted on a sample) for the selected column from the original DataFrame.
+    with perf.stage("histogram"):
+        st.pyplot(plot_histogram(original_hist, f"Original Distribution of {column}"))
     st.subheader(f"{column}'s Original Stats")
-    # Display statistical summary for the selected column.
-    st.write(df[column].describe())
+    # Display statistical summary for the selected column (from the streamed profile).
+    st.write(original_describe)
 
 # --- Cleaned Data Visualization ---
 with col2:
     st.subheader("Cleaned Data Distribution")
-    # Plot a histogram (with a KDE) for the selected column from the cleaned DataFrame.
-    fig, ax = plt.subplots()
-    sns.histplot(df_clean[column], kde=True)
-    plt.title(f"Distribution of {column} after {method}")
-    st.pyplot(fig)
+    # Plot a histogram (with a KDE fitted on a sample) for the selected column from the cleaned DataFrame.
+    with perf.stage("histogram"):
+        st.pyplot(plot_histogram(clean_hist, f"Distribution of {column} after {method}"))
     st.subheader(f"{column}'s New Stats")
     # Display statistical summary for the cleaned data.
-    st.write(df_clean[column].describe())
\ No newline at end of file
+    st.write(clean_describe)
+
+# ------------------------------------------------------------------------------
+# Performance Panel (only shown with ?perf=1 or PERF_PANEL=1)
+# ------------------------------------------------------------------------------
+instrumentation.debug_panel(perf)
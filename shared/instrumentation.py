@@ -0,0 +1,284 @@
+# Passion Hood
+# CSE 10102: Elements of Computing II, Spring 2025
+# Shared: Per-stage timers, call counts and memory high-water marks for the Streamlit apps
+#
+# Usage (in an app script):
+#   import instrumentation
+#   perf = instrumentation.session_profiler()   # One per browser session, reset on every rerun
+#   with perf.stage("price_history"):
+#       prices = price_cache.get_prices(...)
+#   ...
+#   instrumentation.debug_panel(perf)           # Sidebar panel, only shown when profiling is on
+#
+# Profiling is off unless the page is opened with ?perf=1 or the server runs
+# with PERF_PANEL=1. While it is off, `stage` returns one shared do-nothing
+# context manager, so the calls can stay in production code.
+#
+# Exports: JSON lines (one record per stage call), folded stacks for
+# flamegraph.pl / speedscope ("annotate;nlp 1234" in microseconds of
+# self time) and Chrome trace events (chrome://tracing, Perfetto, speedscope).
+
+import contextlib  # Shared no-op context for the disabled path
+import json  # Structured exports
+import os  # Environment switches
+import sys  # Platform check for RSS units
+import time  # High-resolution wall clock
+import tracemalloc  # Optional per-stage Python allocation peaks
+
+try:
+    import resource  # Process RSS high-water mark (not available on Windows)
+except ImportError:
+    resource = None
+
+ENV_SWITCH = "PERF_PANEL"  # PERF_PANEL=1 turns profiling on for every session
+QUERY_SWITCH = "perf"  # ?perf=1 turns it on for one browser session
+MAX_EVENTS = 10_000  # Per rerun; later calls are still aggregated, just not logged one by one
+_DISABLED = contextlib.nullcontext()
+
+
+def max_rss_kb():
+    """Peak resident memory of the whole process so far, in KB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # macOS reports bytes
+
+
+class _Stage:
+    """Context manager for one timed call of a stage; nested stages form a path."""
+
+    __slots__ = ("profiler", "name", "path", "start", "start_memory", "outer_peak", "child_peak", "child_time")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        profiler = self.profiler
+        parent = profiler._stack[-1] if profiler._stack else None
+        self.path = (parent.path if parent else ()) + (self.name,)
+        profiler._rows(self.path)  # Rows appear in the order stages start, so tables read top-down
+        self.child_time = 0.0
+        self.child_peak = 0
+        self.start_memory = None
+        if profiler.memory and tracemalloc.is_tracing():
+            self.start_memory, self.outer_peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()  # So the peak read at exit belongs to this stage
+        profiler._stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        profiler = self.profiler
+        profiler._stack.pop()
+        elapsed = end - self.start
+        peak = None
+        if self.start_memory is not None and tracemalloc.is_tracing():
+            peak_abs = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            peak = max(0, peak_abs - self.start_memory)
+        parent = profiler._stack[-1] if profiler._stack else None
+        if parent is not None:
+            parent.child_time += elapsed
+            if peak is not None and parent.start_memory is not None:
+                parent.child_peak = max(parent.child_peak, self.start_memory + peak, self.outer_peak)
+        profiler._record(self.path, self.start, elapsed, elapsed - self.child_time, peak, exc[0] is not None)
+        return False
+
+
+class Profiler:
+    """Collects per-stage timings for one script run and totals for the whole session.
+
+    For every stage path (e.g. ("analysis", "monte_carlo")) it keeps the
+    call count, total and self time (time not spent in nested stages),
+    slowest call, allocation peak (with `memory=True`) and the process RSS
+    high-water mark after the call. A profiler is meant to be used by one
+    thread at a time, like a Streamlit session's script run.
+    """
+
+    def __init__(self, enabled=False, memory=False, max_events=MAX_EVENTS):
+        self.enabled = enabled
+        self.memory = False
+        self.max_events = max_events
+        self.run_index = 0
+        self.counters = {}
+        self.session = {}
+        self._stack = []
+        self._begin()
+        self.set_memory(memory)
+
+    # --- Switching ---
+    def set_memory(self, on):
+        """Track Python allocation peaks per stage (tracemalloc slows allocation-heavy code noticeably)."""
+        on = bool(on) and self.enabled
+        if on and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif self.memory and not on and tracemalloc.is_tracing():
+            tracemalloc.stop()  # Turned off here: stop paying for it (other sessions' peaks read as unknown)
+        self.memory = on
+
+    def _begin(self):
+        self.run = {}
+        self.events = []
+        self.dropped = 0
+        self.run_start = time.perf_counter()
+        self.run_counters = {}
+
+    def begin_run(self):
+        """Start a new script run: the per-run table and event log are cleared, session totals kept."""
+        self.run_index += 1
+        self._stack.clear()
+        self._begin()
+
+    # --- Recording ---
+    def stage(self, name):
+        """Context manager timing one call of `name`, nested under any stage already open."""
+        if not self.enabled:
+            return _DISABLED
+        return _Stage(self, name)
+
+    def timed(self, name=None):
+        """Decorator form of `stage`, named after the function by default."""
+        def decorate(func):
+            stage_name = name or func.__name__
+
+            def wrapper(*args, **kwargs):
+                with self.stage(stage_name):
+                    return func(*args, **kwargs)
+            wrapper.__name__ = func.__name__
+            wrapper.__doc__ = func.__doc__
+            return wrapper
+        return decorate
+
+    def count(self, name, n=1):
+        """Add `n` to a plain counter (e.g. tickers downloaded, entities found)."""
+        if self.enabled:
+            self.run_counters[name] = self.run_counters.get(name, 0) + n
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def _rows(self, path):
+        rows = []
+        for table in (self.run, self.session):
+            row = table.get(path)
+            if row is None:
+                row = table[path] = {"calls": 0, "total": 0.0, "self": 0.0, "max": 0.0, "peak_bytes": None,
+                                     "max_rss_kb": None, "errors": 0}
+            rows.append(row)
+        return rows
+
+    def _record(self, path, start, elapsed, self_time, peak, failed):
+        rss = max_rss_kb()
+        for row in self._rows(path):
+            row["calls"] += 1
+            row["total"] += elapsed
+            row["self"] += self_time
+            row["max"] = max(row["max"], elapsed)
+            row["errors"] += failed
+            if peak is not None:
+                row["peak_bytes"] = max(row["peak_bytes"] or 0, peak)
+            if rss is not None:
+                row["max_rss_kb"] = max(row["max_rss_kb"] or 0, rss)
+        if len(self.events) < self.max_events:
+            self.events.append({"run": self.run_index, "stage": "/".join(path), "start_ms": (start - self.run_start) * 1000,
+                                "duration_ms": elapsed * 1000, "self_ms": self_time * 1000,
+                                "peak_bytes": peak, "max_rss_kb": rss, "error": failed})
+        else:
+            self.dropped += 1
+
+    # --- Reports ---
+    def table(self, scope="run"):
+        """One row per stage path, in first-seen order: calls, total/self/mean/max ms, peaks."""
+        rows = []
+        for path, row in (self.run if scope == "run" else self.session).items():
+            if not row["calls"]:
+                continue  # Still running (e.g. the stage that is drawing this table)
+            rows.append({"stage": " / ".join(path), "depth": len(path) - 1, "calls": row["calls"],
+                         "total_ms": row["total"] * 1000, "self_ms": row["self"] * 1000,
+                         "mean_ms": row["total"] * 1000 / row["calls"], "max_ms": row["max"] * 1000,
+                         "peak_kb": None if row["peak_bytes"] is None else row["peak_bytes"] / 1024,
+                         "max_rss_kb": row["max_rss_kb"], "errors": row["errors"]})
+        return rows
+
+    def json_lines(self):
+        """Every recorded stage call of this run as JSON lines (structured logs)."""
+        return "".join(json.dumps(event) + "\n" for event in self.events)
+
+    def folded(self, scope="run"):
+        """Folded stacks ("a;b;c <self microseconds>") for flamegraph.pl or speedscope."""
+        table = self.run if scope == "run" else self.session
+        return "".join(f"{';'.join(path)} {round(row['self'] * 1e6)}\n" for path, row in table.items() if row["self"] > 0)
+
+    def chrome_trace(self):
+        """This run's stage calls as Chrome trace events (complete "X" events, microseconds)."""
+        return {"traceEvents": [{"name": event["stage"].rsplit("/", 1)[-1], "cat": event["stage"], "ph": "X",
+                                 "ts": event["start_ms"] * 1000, "dur": event["duration_ms"] * 1000,
+                                 "pid": os.getpid(), "tid": 1, "args": {"peak_bytes": event["peak_bytes"]}}
+                                for event in self.events],
+                "displayTimeUnit": "ms"}
+
+
+# --- Streamlit Integration ---
+def profiling_requested():
+    """True when PERF_PANEL=1 is set on the server or the page URL has ?perf=1."""
+    import streamlit as st
+    if os.environ.get(ENV_SWITCH, "") not in ("", "0"):
+        return True
+    try:
+        return st.query_params.get(QUERY_SWITCH, "0") not in ("", "0")
+    except AttributeError:  # Streamlit before st.query_params
+        return False
+
+
+def session_profiler(key="_profiler"):
+    """The current session's Profiler, started fresh for this rerun.
+
+    Call once near the top of the script, before the first stage.
+    """
+    import streamlit as st
+    profiler = st.session_state.get(key)
+    if profiler is None:
+        profiler = st.session_state[key] = Profiler()
+    profiler.enabled = profiling_requested()
+    profiler.begin_run()
+    return profiler
+
+
+def debug_panel(profiler, title="⏱️ Performance"):
+    """Sidebar panel with this run's stage table, session totals, counters and exports.
+
+    Call at the end of the script so every stage of the run is included.
+    Does nothing when profiling is off.
+    """
+    if not profiler.enabled:
+        return
+    import streamlit as st
+    import pandas as pd
+
+    with st.sidebar.expander(title, expanded=True):
+        run_ms = (time.perf_counter() - profiler.run_start) * 1000
+        st.caption(f"Rerun {profiler.run_index}: {run_ms:,.0f} ms total, "
+                   f"process peak RSS {(max_rss_kb() or 0) / 1024:,.0f} MB")
+        memory = st.checkbox("Track allocation peaks (slower)", value=profiler.memory, key="_profiler_memory",
+                             help="Uses tracemalloc for the whole server process; takes effect from the next rerun.")
+        profiler.set_memory(memory)
+
+        scope = st.radio("Show", ["This rerun", "Session totals"], horizontal=True, key="_profiler_scope")
+        rows = profiler.table("run" if scope == "This rerun" else "session")
+        if rows:
+            table = pd.DataFrame(rows)
+            table["stage"] = [" " * depth + stage.rsplit(" / ", 1)[-1] for depth, stage in zip(table["depth"], table["stage"])]
+            st.dataframe(table.drop(columns="depth").style.format(
+                {"total_ms": "{:,.1f}", "self_ms": "{:,.1f}", "mean_ms": "{:,.1f}", "max_ms": "{:,.1f}",
+                 "peak_kb": "{:,.0f}", "max_rss_kb": "{:,.0f}"}, na_rep="–"), hide_index=True)
+        counters = profiler.run_counters if scope == "This rerun" else profiler.counters
+        if counters:
+            st.json(counters)
+        if profiler.dropped:
+            st.caption(f"{profiler.dropped:,} calls beyond the first {profiler.max_events:,} were aggregated but not logged.")
+
+        st.download_button("Structured log (JSONL)", profiler.json_lines(), file_name="profile.jsonl",
+                           mime="application/json", key="_profiler_jsonl")
+        st.download_button("Flame graph (folded stacks)", profiler.folded("run" if scope == "This rerun" else "session"),
+                           file_name="profile.folded", mime="text/plain", key="_profiler_folded")
+        st.download_button("Chrome trace", json.dumps(profiler.chrome_trace()), file_name="profile.trace.json",
+                           mime="application/json", key="_profiler_trace")